@@ -10,7 +10,15 @@ from flask_migrate import Migrate
 from models import db
 from config import DevelopmentConfig
 from limiter import limiter
+from cache import cache
 from flask_cors import CORS
+from models.soft_delete import register_soft_delete_filter
+from utils.table_versions import register_version_listeners
+from utils.analytics_cache import register_cache_invalidation
+from utils.db_routing import register_read_routing
+from utils.query_budget import register_query_budgets
+from utils.index_advisor import register_index_advisor
+from commands import register_commands
 
 # Add project root to sys.path
 project_root = os.path.dirname(__file__)
@@ -67,6 +75,13 @@ def create_app(config_class=DevelopmentConfig):
     db.init_app(app)
     Migrate(app, db)  # Database migration
     limiter.init_app(app)
+    register_soft_delete_filter()  # Hide soft-deleted rows from ORM reads unless include_deleted is set
+    register_version_listeners()  # Track per-table write versions for cache invalidation
+    cache.init_app(app)  # Analytics result cache (backend from CACHE_TYPE)
+    register_cache_invalidation()  # Rotate analytics cache tokens on table writes
+    register_read_routing(app)  # Keep writing clients on the primary for READ_YOUR_WRITES_SECONDS
+    register_query_budgets()  # Cancel analytics statements that exceed ANALYTICS_QUERY_BUDGETS
+    register_index_advisor()  # Record query shapes while INDEX_ADVISOR_ENABLED is set
 
     # ---------------------------
     # Logging Configuration
@@ -100,6 +115,11 @@ def create_app(config_class=DevelopmentConfig):
     app.register_blueprint(analytics_bp, url_prefix='/analytics')  # Analytics routes
     app.register_blueprint(user_bp, url_prefix='/auth')  # User routes
 
+    # ---------------------------
+    # CLI Commands
+    # ---------------------------
+    register_commands(app)
+
     # ---------------------------
     # Routes and Error Handlers
     # ---------------------------
@@ -0,0 +1,146 @@
+"""
+Concurrency benchmark for stock reservation on order creation.
+
+Many threads place orders for the same product at once. The run checks that
+stock never goes negative (no oversell) and that the final stock equals the
+starting stock minus every successfully ordered unit (no lost updates).
+
+Usage:
+    python -m benchmarks.stock_concurrency [--threads 16] [--orders 50] [--stock 500]
+
+Set BENCH_DATABASE_URL to benchmark a real server (e.g. MySQL); by default a
+temporary SQLite file is used. The benchmark drops and recreates every table,
+so BENCH_DATABASE_URL must be a scratch database and the run must be
+confirmed with --i-know-this-drops-tables.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from app import create_app
+from config import TestingConfig
+from models import db, Customer, Product, Order
+from services.order_service import OrderService
+
+
+def _bench_config(database_url):
+    """Builds a config class pointing at the benchmark database."""
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 30}} if database_url.startswith('sqlite') else {}
+    return BenchmarkConfig
+
+
+def run_benchmark(threads=16, orders_per_thread=50, stock=500, quantity=1, database_url=None, drop_tables=False):
+    """
+    Places orders concurrently and verifies stock invariants.
+
+    Args:
+        threads (int): Concurrent worker threads.
+        orders_per_thread (int): Orders each thread attempts.
+        stock (int): Starting stock of the contested product.
+        quantity (int): Units per order.
+        database_url (str): Database to run against (default: temporary SQLite file).
+        drop_tables (bool): Confirms every table in `database_url` may be dropped.
+
+    Returns:
+        dict: Counts, final stock, elapsed seconds and invariant results.
+
+    Raises:
+        ValueError: If `database_url` is given without `drop_tables`.
+    """
+    if database_url is not None and not drop_tables:
+        raise ValueError(
+            "The benchmark drops and recreates every table in the target database. "
+            "Point it at a scratch database and pass --i-know-this-drops-tables."
+        )
+
+    tmp_dir = None
+    if database_url is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmp_dir.name, 'stock_bench.db')}"
+
+    app = create_app(_bench_config(database_url))
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        customer = Customer(name="Bench", email="bench@example.com", phone="5550001000")
+        product = Product(name="Contested", price=1.0, stock_quantity=stock)
+        db.session.add_all([customer, product])
+        db.session.commit()
+        customer_id, product_id = customer.id, product.id
+
+    created, rejected, failed = [0], [0], []
+    lock = threading.Lock()
+    start_gate = threading.Barrier(threads)
+
+    def worker():
+        with app.app_context():
+            start_gate.wait()
+            for _ in range(orders_per_thread):
+                try:
+                    OrderService.create_order(customer_id, product_id, quantity)
+                    outcome = created
+                except ValueError as e:
+                    if "Insufficient stock" not in str(e):
+                        with lock:
+                            failed.append(str(e))
+                        continue
+                    outcome = rejected
+                with lock:
+                    outcome[0] += 1
+            db.session.remove()
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        final_stock = db.session.get(Product, product_id).stock_quantity
+        order_rows = Order.query.filter_by(product_id=product_id).count()
+        ordered_units = order_rows * quantity
+        db.session.remove()
+        db.engine.dispose()
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+    attempts = threads * orders_per_thread
+    return {
+        "attempts": attempts,
+        "created": created[0],
+        "rejected": rejected[0],
+        "errors": failed,
+        "final_stock": final_stock,
+        "elapsed": elapsed,
+        "orders_per_second": attempts / elapsed if elapsed else 0,
+        "no_oversell": final_stock >= 0,
+        "no_lost_updates": final_stock == stock - ordered_units and order_rows == created[0],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--orders', type=int, default=50, help="Orders attempted per thread")
+    parser.add_argument('--stock', type=int, default=500)
+    parser.add_argument('--quantity', type=int, default=1)
+    parser.add_argument('--i-know-this-drops-tables', dest='drop_tables', action='store_true',
+                        help="Allow dropping every table in BENCH_DATABASE_URL")
+    args = parser.parse_args()
+
+    try:
+        result = run_benchmark(args.threads, args.orders, args.stock, args.quantity,
+                               database_url=os.getenv('BENCH_DATABASE_URL'), drop_tables=args.drop_tables)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"attempts={result['attempts']} created={result['created']} rejected={result['rejected']} "
+          f"errors={len(result['errors'])} final_stock={result['final_stock']}")
+    print(f"elapsed={result['elapsed']:.2f}s throughput={result['orders_per_second']:.0f} orders/s")
+    print(f"no_oversell={result['no_oversell']} no_lost_updates={result['no_lost_updates']}")
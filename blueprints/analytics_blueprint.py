@@ -1,10 +1,19 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app, g
 from queries.analytics_queries import (
     analyze_employee_performance,
     top_selling_products,
     customer_lifetime_value,
-    evaluate_production_efficiency
+    evaluate_production_efficiency,
+    production_series,
+    series_bucket_starts,
+    SERIES_BUCKETS
 )
+from queries.aggregate_queries import aggregate, statement_cache_info, FACTS, AggregateError
+from utils.analytics_cache import cache_stats
+from utils.parallel import run_in_parallel
+from utils.db_routing import prefer_replica
+from utils.query_budget import query_budget, QueryBudgetExceeded
 from utils.utils import error_response, role_required
 from limiter import limiter
 import logging
@@ -13,6 +22,139 @@ import logging
 analytics_bp = Blueprint('analytics', __name__)
 
 
+# ---------------------------
+# Read Routing
+# ---------------------------
+@analytics_bp.before_request
+def route_reads_to_replica():
+    """Analytics only reads, so it runs on the replica bind when one is configured."""
+    prefer_replica()
+
+
+# ---------------------------
+# Staleness Policy and Data Age
+# ---------------------------
+@analytics_bp.before_request
+def parse_max_stale():
+    """
+    Reads the optional `max_stale` query parameter shared by all analytics routes.
+
+    max_stale (int): Seconds-old data the caller accepts. When the cached result
+    is out of date but younger than this, it is returned immediately and refreshed
+    in the background (default: ANALYTICS_MAX_STALE; 0 always waits for fresh data).
+    """
+    g.pop('analytics_data_age', None)  # Start each request with a clean data-age record
+    g.pop('analytics_cache_status', None)
+    g.pop('analytics_max_stale', None)
+
+    value = request.args.get('max_stale')
+    if value is None:
+        return None
+    limit = current_app.config.get('ANALYTICS_MAX_STALE_LIMIT', 3600)
+    try:
+        max_stale = int(value)
+    except ValueError:
+        return error_response("max_stale must be an integer number of seconds.", 400)
+    if max_stale < 0 or max_stale > limit:
+        return error_response(f"max_stale must be between 0 and {limit}.", 400)
+    g.analytics_max_stale = max_stale
+    return None
+
+
+@analytics_bp.after_request
+def add_data_age_headers(response):
+    """Reports how old the returned analytics data is and whether it came from cache."""
+    if 'analytics_data_age' in g:
+        response.headers['X-Data-Age'] = str(g.analytics_data_age)
+        response.headers['X-Cache'] = g.analytics_cache_status
+    return response
+
+
+# ---------------------------
+# Query Budgets
+# ---------------------------
+def _over_budget(error):
+    """503 for a query cancelled by its budget; the client may retry after the budget's length."""
+    response, status = error_response(str(error), 503)
+    response.headers['Retry-After'] = str(max(1, -(-error.timeout_ms // 1000)))
+    return response, status
+
+
+def _budgeted(payload, budget, truncated):
+    """Marks a payload whose data was cut at the budget's max_rows as a partial result."""
+    if truncated:
+        payload.update({"status": "partial", "truncated": True, "max_rows": budget.max_rows})
+    else:
+        payload["status"] = "success"
+    return payload
+
+
+def _budgeted_task(name, run):
+    """Wraps a dashboard query so it runs under its own budget with its rows capped."""
+    def task():
+        with query_budget(name) as budget:
+            section = run(budget)
+        if isinstance(section.get("data"), list):
+            section["data"], truncated = budget.truncate(section["data"])
+            if truncated:
+                section.update({"truncated": True, "max_rows": budget.max_rows})
+        return section
+    return task
+
+
+# ---------------------------
+# Parameter Parsing (shared by single routes and the dashboard)
+# ---------------------------
+def _date_window_args():
+    """Parses the optional since/until window. Raises ValueError on bad input."""
+    window = {}
+    for name in ('since', 'until'):
+        value = request.args.get(name, default=None, type=str)
+        if value:
+            try:
+                window[name] = datetime.strptime(value, "%Y-%m-%d").date()
+            except ValueError:
+                raise ValueError(f"Invalid {name} date. Use YYYY-MM-DD.")
+    if 'since' in window and 'until' in window and window['since'] > window['until']:
+        raise ValueError("since must not be after until.")
+    return window
+
+
+def _top_products_args():
+    """Parses limit/since/until for top products. Raises ValueError on bad input."""
+    limit = request.args.get('limit', default=10, type=int)
+    if limit < 1 or limit > 100:
+        raise ValueError("Limit must be between 1 and 100.")
+    return dict(limit=limit, **_date_window_args())
+
+
+def _employee_performance_args(limit_param='limit'):
+    """Parses limit/since/until for employee performance. Raises ValueError on bad input."""
+    limit = request.args.get(limit_param, default=100, type=int)
+    if limit < 1 or limit > 10000:
+        raise ValueError("Limit must be between 1 and 10000.")
+    return dict(limit=limit, **_date_window_args())
+
+
+def _threshold_arg():
+    """Parses the lifetime value threshold. Raises ValueError on bad input."""
+    threshold = request.args.get('threshold', default=1000, type=float)
+    if threshold < 0:
+        raise ValueError("Threshold must be a positive value.")
+    return threshold
+
+
+def _production_date_arg():
+    """Parses the required production date. Raises ValueError on bad input."""
+    date = request.args.get('date', default=None, type=str)
+    if not date:
+        raise ValueError("Date is required (YYYY-MM-DD).")
+    try:
+        return datetime.strptime(date, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+
+
 # ---------------------------
 # Route 1: Analyze Employee Performance
 # ---------------------------
@@ -21,14 +163,34 @@ analytics_bp = Blueprint('analytics', __name__)
 @role_required('admin')  # Requires admin or higher role
 def employee_performance():
     """
-    Analyze employee performance by calculating the total quantity of products each employee has produced.
+    Rank employees by the total quantity they produced, optionally within a date window.
+
+    Production is grouped by employee id (not name, so namesakes stay apart)
+    using the (employee_id, date_produced) index. Ties share a rank, and every
+    employee tied at the cut-off is returned. Unattributed records are excluded.
+    Archived production is read only when the window reaches archived dates.
+
+    Query Parameters:
+        - limit (int): Ranks to return (default: 100, max: 10000).
+        - since (str): Earliest production date, inclusive (YYYY-MM-DD).
+        - until (str): Latest production date, inclusive (YYYY-MM-DD).
 
     Returns:
-        JSON response with aggregated data grouped by employee name.
+        JSON response with ranked employees and window totals; 'partial' when cut at
+        the endpoint's max_rows budget, 503 when its time budget runs out.
     """
     try:
-        data = analyze_employee_performance()
-        return jsonify({"data": data, "status": "success"}), 200
+        args = _employee_performance_args()
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    try:
+        with query_budget('employee_performance') as budget:
+            data, totals = analyze_employee_performance(**args, max_rows=budget.row_limit())
+        data, truncated = budget.truncate(data)
+        return jsonify(_budgeted({"data": data, "totals": totals}, budget, truncated)), 200
+    except QueryBudgetExceeded as e:
+        return _over_budget(e)
     except Exception as e:
         logging.error(f"Error analyzing employee performance: {str(e)}")
         return error_response(str(e), 500)
@@ -42,14 +204,37 @@ def employee_performance():
 @role_required('admin')  # Requires admin or higher role
 def top_products():
     """
-    Fetch top-selling products based on total quantity ordered.
+    Fetch the top-selling products by total quantity ordered within a date window.
+
+    Query Parameters:
+        - limit (int): Number of ranks to return, 1-100 (default: 10). Products tied
+          at the last rank are all included.
+        - since (str): First day of the window, inclusive (YYYY-MM-DD) (default: all time).
+        - until (str): Last day of the window, inclusive (YYYY-MM-DD) (default: no upper bound).
 
     Returns:
-        JSON response sorted by total quantity in descending order.
+        JSON response ranked by total quantity (ties share a rank), with window totals
+        across all products; 'partial' when cut at the endpoint's max_rows budget, 503
+        when its time budget runs out.
     """
     try:
-        data = top_selling_products()
-        return jsonify({"data": data, "status": "success"}), 200
+        try:
+            args = _top_products_args()
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        with query_budget('top_products') as budget:
+            data, totals = top_selling_products(**args, max_rows=budget.row_limit())
+        data, truncated = budget.truncate(data)
+        return jsonify(_budgeted({
+            "data": data,
+            "totals": totals,
+            "limit": args["limit"],
+            "since": request.args.get('since'),
+            "until": request.args.get('until')
+        }, budget, truncated)), 200
+    except QueryBudgetExceeded as e:
+        return _over_budget(e)
     except Exception as e:
         logging.error(f"Error fetching top-selling products: {str(e)}")
         return error_response(str(e), 500)
@@ -69,16 +254,22 @@ def lifetime_value():
         - threshold (float): Minimum total order value to filter customers (default: 1000).
 
     Returns:
-        JSON response filtered by threshold.
+        JSON response filtered by threshold, highest value first; 'partial' when cut at
+        the endpoint's max_rows budget, 503 when its time budget runs out.
     """
     try:
         # Validate threshold input
-        threshold = request.args.get('threshold', default=1000, type=float)
-        if threshold < 0:
-            return error_response("Threshold must be a positive value.", 400)
+        try:
+            threshold = _threshold_arg()
+        except ValueError as e:
+            return error_response(str(e), 400)
 
-        data = customer_lifetime_value(threshold=threshold)
-        return jsonify({"data": data, "status": "success"}), 200
+        with query_budget('customer_lifetime_value') as budget:
+            data = customer_lifetime_value(threshold=threshold, max_rows=budget.row_limit())
+        data, truncated = budget.truncate(data)
+        return jsonify(_budgeted({"data": data}, budget, truncated)), 200
+    except QueryBudgetExceeded as e:
+        return _over_budget(e)
     except Exception as e:
         logging.error(f"Error calculating customer lifetime value: {str(e)}")
         return error_response(str(e), 500)
@@ -102,12 +293,244 @@ def production_efficiency():
     """
     try:
         # Validate and parse date input
-        date = request.args.get('date', default=None, type=str)
-        if not date:
-            return error_response("Date is required (YYYY-MM-DD).", 400)
+        try:
+            production_date = _production_date_arg()
+        except ValueError as e:
+            return error_response(str(e), 400)
 
-        data = evaluate_production_efficiency(date)
+        with query_budget('production_efficiency'):
+            data = evaluate_production_efficiency(production_date)
         return jsonify({"data": data, "status": "success"}), 200
+    except QueryBudgetExceeded as e:
+        return _over_budget(e)
     except Exception as e:
         logging.error(f"Error evaluating production efficiency: {str(e)}")
         return error_response(str(e), 500)
+
+
+# ---------------------------
+# Route 5: Production Time Series
+# ---------------------------
+@analytics_bp.route('/production-series', methods=['GET'])
+@limiter.limit("10 per minute")
+@role_required('admin')  # Requires admin or higher role
+def production_series_route():
+    """
+    Return dense, bucketed production series for a date range in one response.
+
+    Query Parameters:
+        - from (str): First day, inclusive (YYYY-MM-DD) (required).
+        - to (str): Last day, inclusive (YYYY-MM-DD) (required).
+        - bucket (str): 'day', 'week' (Monday start) or 'month' (default: 'day').
+        - product_id (int): Restrict to one product (default: every product produced in range).
+
+    Returns:
+        Column-oriented JSON: `buckets` lists bucket start dates; `values[i]` is the
+        zero-filled series for `product_ids[i]`/`products[i]`; `totals` sums all products.
+    """
+    try:
+        bounds = {}
+        for name in ('from', 'to'):
+            value = request.args.get(name, default=None, type=str)
+            if not value:
+                return error_response(f"'{name}' is required (YYYY-MM-DD).", 400)
+            try:
+                bounds[name] = datetime.strptime(value, "%Y-%m-%d").date()
+            except ValueError:
+                return error_response(f"Invalid '{name}' date. Use YYYY-MM-DD.", 400)
+        if bounds['from'] > bounds['to']:
+            return error_response("'from' must not be after 'to'.", 400)
+
+        bucket = request.args.get('bucket', default='day', type=str)
+        if bucket not in SERIES_BUCKETS:
+            return error_response(f"Invalid bucket. Allowed: {list(SERIES_BUCKETS)}", 400)
+
+        max_buckets = current_app.config.get('ANALYTICS_SERIES_MAX_BUCKETS', 1000)
+        if len(series_bucket_starts(bounds['from'], bounds['to'], bucket)) > max_buckets:
+            return error_response(f"Range too large: at most {max_buckets} {bucket} buckets.", 400)
+
+        product_id = request.args.get('product_id', default=None, type=int)
+        with query_budget('production_series'):
+            data = production_series(bounds['from'], bounds['to'], bucket=bucket, product_id=product_id)
+        return jsonify({
+            "data": data,
+            "from": bounds['from'].isoformat(),
+            "to": bounds['to'].isoformat(),
+            "status": "success"
+        }), 200
+    except QueryBudgetExceeded as e:
+        return _over_budget(e)
+    except Exception as e:
+        logging.error(f"Error building production series: {str(e)}")
+        return error_response(str(e), 500)
+
+
+# ---------------------------
+# Route 6: Dashboard (several analytics queries in parallel)
+# ---------------------------
+DASHBOARD_QUERIES = ('employee_performance', 'top_products', 'customer_lifetime_value', 'production_efficiency')
+
+
+@analytics_bp.route('/dashboard', methods=['GET'])
+@limiter.limit("10 per minute")
+@role_required('admin')  # Requires admin or higher role
+def dashboard():
+    """
+    Run several analytics queries concurrently and return one combined payload.
+
+    Queries run on a bounded thread pool (ANALYTICS_DASHBOARD_WORKERS), each with
+    its own app context and DB session, so wall time tracks the slowest query
+    rather than the sum. Results go through the analytics cache as usual.
+
+    Query Parameters:
+        - queries (str): Comma-separated subset of 'employee_performance', 'top_products',
+          'customer_lifetime_value', 'production_efficiency' (default: all; production_efficiency
+          only when `date` is given).
+        - limit, since, until: As for /analytics/top-products.
+        - employee_limit: As `limit` for /analytics/employee-performance (the window is shared).
+        - threshold: As for /analytics/customer-lifetime-value.
+        - date: As for /analytics/production-efficiency.
+
+    Returns:
+        JSON response keyed by query name; each section holds its data (or an error,
+        e.g. when it ran out of its query budget) and its elapsed time in milliseconds.
+    """
+    try:
+        requested = request.args.get('queries')
+        if requested:
+            names = tuple(dict.fromkeys(name.strip() for name in requested.split(',') if name.strip()))
+            invalid = [name for name in names if name not in DASHBOARD_QUERIES]
+            if invalid:
+                return error_response(f"Invalid queries: {invalid}. Allowed: {list(DASHBOARD_QUERIES)}", 400)
+        else:
+            names = tuple(name for name in DASHBOARD_QUERIES
+                          if name != 'production_efficiency' or request.args.get('date'))
+
+        # Parse every parameter up front so bad input fails before any query runs
+        tasks = {}
+        try:
+            if 'employee_performance' in names:
+                employee_args = _employee_performance_args('employee_limit')
+                tasks['employee_performance'] = _budgeted_task('employee_performance', lambda budget: dict(
+                    zip(("data", "totals"), analyze_employee_performance(**employee_args, max_rows=budget.row_limit()))
+                ))
+            if 'top_products' in names:
+                top_args = _top_products_args()
+                tasks['top_products'] = _budgeted_task('top_products', lambda budget: dict(
+                    zip(("data", "totals"), top_selling_products(**top_args, max_rows=budget.row_limit()))
+                ))
+            if 'customer_lifetime_value' in names:
+                threshold = _threshold_arg()
+                tasks['customer_lifetime_value'] = _budgeted_task('customer_lifetime_value', lambda budget: {
+                    "data": customer_lifetime_value(threshold=threshold, max_rows=budget.row_limit())
+                })
+            if 'production_efficiency' in names:
+                production_date = _production_date_arg()
+                tasks['production_efficiency'] = _budgeted_task('production_efficiency', lambda budget: {
+                    "data": evaluate_production_efficiency(production_date)
+                })
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        outcomes = run_in_parallel(tasks)
+        sections = {}
+        for name, outcome in outcomes.items():
+            section = outcome.get("result") or {}
+            if "error" in outcome:
+                section = {"error": outcome["error"]}
+            section["elapsed_ms"] = outcome["elapsed_ms"]
+            sections[name] = section
+
+        failed = any("error" in outcome for outcome in outcomes.values())
+        return jsonify({"data": sections, "status": "partial" if failed else "success"}), 200
+    except Exception as e:
+        logging.error(f"Error building analytics dashboard: {str(e)}")
+        return error_response(str(e), 500)
+
+
+# ---------------------------
+# Route 7: Ad-hoc Aggregation
+# ---------------------------
+def _list_arg(name):
+    """Splits a comma-separated query parameter into its non-empty items."""
+    return [item.strip() for item in request.args.get(name, default='', type=str).split(',') if item.strip()]
+
+
+@analytics_bp.route('/aggregate', methods=['GET'])
+@limiter.limit("10 per minute")
+@role_required('admin')  # Requires admin or higher role
+def aggregate_route():
+    """
+    Group orders or production by whitelisted dimensions and compute whitelisted measures.
+
+    Each request compiles to one parameterized GROUP BY, reused for every
+    request of the same shape. Requests that could produce more than
+    ANALYTICS_AGGREGATE_MAX_GROUPS groups are rejected. Archived rows are
+    included only when the window reaches archived dates.
+
+    Query Parameters:
+        - fact (str): 'orders' or 'production' (required).
+        - dimensions (str): Comma-separated 'product', 'customer' (orders),
+          'employee' (production), 'day' or 'month'. Empty for grand totals.
+        - measures (str): Comma-separated 'func:column' with func in sum/count/avg/min/max,
+          column in quantity/total_price (orders) or quantity_produced (production);
+          bare 'count' counts rows (default: count).
+        - since, until (str): Inclusive date window (YYYY-MM-DD).
+        - product_id, customer_id, employee_id (str): Comma-separated ids to include.
+
+    Returns:
+        JSON response with one row per group.
+    """
+    try:
+        fact = request.args.get('fact', default=None, type=str)
+        if fact not in FACTS:
+            raise ValueError(f"fact is required. Allowed: {list(FACTS)}")
+        filters = _date_window_args()
+        for name in FACTS[fact]["id_filters"]:
+            values = _list_arg(name)
+            if values:
+                try:
+                    filters[name] = [int(value) for value in values]
+                except ValueError:
+                    raise ValueError(f"{name} must be a comma-separated list of integers.")
+        dimensions, measures = _list_arg('dimensions'), _list_arg('measures')
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    try:
+        with query_budget('aggregate'):
+            rows = aggregate(fact, dimensions, measures or None, filters)
+        return jsonify({"data": rows, "groups": len(rows), "status": "success"}), 200
+    except AggregateError as e:
+        return error_response(str(e), 400)
+    except QueryBudgetExceeded as e:
+        return _over_budget(e)
+    except Exception as e:
+        logging.error(f"Error running aggregation: {str(e)}")
+        return error_response(str(e), 500)
+
+
+# ---------------------------
+# Route 8: Analytics Cache Statistics
+# ---------------------------
+@analytics_bp.route('/cache-stats', methods=['GET'])
+@limiter.limit("10 per minute")
+@role_required('admin')  # Requires admin or higher role
+def analytics_cache_stats():
+    """
+    Report analytics cache effectiveness for this process.
+
+    Returns:
+        JSON response with hit/miss/coalesced counters per query function (coalesced
+        calls waited on an identical in-flight query), overall totals, the number of
+        computations currently in flight, the configured cache backend and the
+        aggregation statement cache (shapes kept, hits, misses).
+    """
+    try:
+        data = cache_stats()
+        data["backend"] = current_app.config.get('CACHE_TYPE')
+        data["aggregate_statements"] = statement_cache_info()
+        return jsonify({"data": data, "status": "success"}), 200
+    except Exception as e:
+        logging.error(f"Error reading analytics cache stats: {str(e)}")
+        return error_response(str(e), 500)
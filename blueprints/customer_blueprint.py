@@ -1,8 +1,12 @@
 from flask import Blueprint, request, jsonify
 from services.customer_service import CustomerService
+from services.order_service import OrderService
 from schemas.customer_schema import customer_schema, customers_schema
-from utils.utils import error_response, role_required
+from schemas.order_schema import orders_schema
+from utils.utils import error_response, role_required, parse_expand
 from limiter import limiter
+from utils.pagination import pagination_args, paginated_response, PaginationError
+from utils.db_routing import replica_reads
 
 # Create Blueprint
 customer_bp = Blueprint('customers', __name__)
@@ -40,6 +44,7 @@ def create_customer():
 @customer_bp.route('', methods=['GET'])
 @limiter.limit("10 per minute")  # Rate limiting
 @role_required('admin')  # Restrict to admin role
+@replica_reads  # Read-only: served from the replica when configured
 def get_customers():
     """
     Retrieves paginated customers with optional sorting and metadata.
@@ -50,51 +55,37 @@ def get_customers():
     - sort_by (str): Field to sort by ('name', 'email', 'phone') (default: 'name')
     - sort_order (str): Sort order ('asc', 'desc') (default: 'asc')
     - include_meta (bool): Include metadata (default: true)
+    - pagination (str): 'offset', 'cursor' or 'after_id' (default: 'offset')
+    - cursor (str): Opaque `next_cursor` from the previous page; implies cursor mode
+    - after_id (int): Last id seen; implies after_id mode
+    - meta (str): 'exact' (cached count) or 'approximate' (table statistics) totals (default: 'exact')
+    - expand (str): 'order_summary' adds order count and lifetime value per customer
+
+    Orders are never embedded; use GET /customers/<id>/orders for order history.
     """
     try:
-        # Pagination parameters
-        page = request.args.get('page', default=1, type=int)
-        per_page = request.args.get('per_page', default=10, type=int)
-
-        # Sorting parameters
-        sort_by = request.args.get('sort_by', default='name', type=str)
-        sort_order = request.args.get('sort_order', default='asc', type=str)
-
-        # Metadata toggle
-        include_meta = request.args.get('include_meta', default='true', type=str).lower() == 'true'
-
-        # Validate bounds
-        if page < 1 or per_page < 1 or per_page > 100:
-            return error_response("Invalid pagination parameters.", 400)
+        # Shared pagination parameters (offset, cursor or after_id mode)
+        args = pagination_args(default_sort_by='name')
 
         # Validate sorting fields
-        if sort_by not in SORTABLE_FIELDS:
-            return error_response(f"Invalid sort_by field. Allowed: {SORTABLE_FIELDS}", 400)
-
-        # Fetch paginated customers
-        data = CustomerService.get_paginated_customers(
-            page=page,
-            per_page=per_page,
-            sort_by=sort_by,
-            sort_order=sort_order,
-            include_meta=include_meta
-        )
-
-        # Prepare JSON response
-        response = {
-            "customers": customers_schema.dump(data["items"])
-        }
+        if args["sort_by"] not in SORTABLE_FIELDS:
+            return error_response(f"Invalid sort_by field. Allowed: {SORTABLE_FIELDS}")
 
-        # Add metadata if enabled
-        if include_meta:
-            response.update({
-                "total": data["total"],
-                "pages": data["pages"],
-                "page": data["page"],
-                "per_page": data["per_page"]
-            })
+        # Computed extras
+        try:
+            expand = parse_expand(request.args.get('expand'), CustomerService.EXPANDABLE_FIELDS)
+        except ValueError as e:
+            return error_response(str(e))
 
+        # Fetch paginated customers
+        data = CustomerService.get_paginated_customers(**args, expand=expand)
+        response = paginated_response("customers", customers_schema, data)
+        if 'order_summary' in expand:
+            for customer in response["customers"]:
+                customer["order_summary"] = data["order_summaries"][customer["id"]]
         return jsonify(response), 200
+    except PaginationError as e:
+        return error_response(str(e))
     except Exception as e:
         return error_response(str(e), 500)
 
@@ -106,14 +97,63 @@ def get_customers():
 @limiter.limit("10 per minute")
 @role_required('admin')  # Restrict to admin role
 def get_customer(customer_id):
-    """Fetches a customer by ID."""
+    """
+    Fetches a customer by ID.
+
+    Query Parameters:
+    - expand (str): 'order_summary' adds order count and lifetime value
+    """
+    try:
+        expand = parse_expand(request.args.get('expand'), CustomerService.EXPANDABLE_FIELDS)
+    except ValueError as e:
+        return error_response(str(e))
+
     try:
         customer = CustomerService.get_customer_by_id(customer_id)
-        return jsonify(customer_schema.dump(customer)), 200
+        response = customer_schema.dump(customer)
+        if 'order_summary' in expand:
+            response["order_summary"] = CustomerService.get_order_summaries([customer.id])[customer.id]
+        return jsonify(response), 200
     except Exception as e:
         return error_response(str(e), 404)
 
 
+# ---------------------------
+# Get a Customer's Orders
+# ---------------------------
+@customer_bp.route('/<int:customer_id>/orders', methods=['GET'])
+@limiter.limit("10 per minute")  # Rate limiting
+@role_required('admin')  # Restrict to admin role
+@replica_reads  # Read-only: served from the replica when configured
+def get_customer_orders(customer_id):
+    """
+    Retrieves one customer's orders, paginated like GET /orders.
+
+    Query Parameters:
+    - page, per_page, sort_by ('created_at', 'quantity', 'total_price'), sort_order, include_meta
+    - pagination (str): 'offset', 'cursor' or 'after_id' (default: 'offset')
+    - cursor (str): Opaque `next_cursor` from the previous page; implies cursor mode
+    - after_id (int): Last id seen; implies after_id mode
+    - meta (str): 'exact' (cached count) or 'approximate' (table statistics) totals (default: 'exact')
+    """
+    try:
+        CustomerService.get_customer_by_id(customer_id)
+    except Exception as e:
+        return error_response(str(e), 404)
+
+    try:
+        # Shared pagination parameters (offset, cursor or after_id mode)
+        args = pagination_args(default_sort_by='created_at')
+
+        # Fetch the customer's orders
+        data = OrderService.get_paginated_orders(**args, customer_id=customer_id)
+        return jsonify(paginated_response("orders", orders_schema, data)), 200
+    except PaginationError as e:
+        return error_response(str(e))
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
 # ---------------------------
 # Update Customer
 # ---------------------------
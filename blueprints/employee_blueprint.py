@@ -3,6 +3,8 @@ from services.employee_service import EmployeeService
 from schemas.employee_schema import employee_schema, employees_schema
 from utils.utils import error_response, role_required
 from limiter import limiter
+from utils.pagination import pagination_args, paginated_response, PaginationError
+from utils.db_routing import replica_reads
 
 # Create Blueprint
 employee_bp = Blueprint('employees', __name__)
@@ -53,6 +55,7 @@ def create_employee():
 @employee_bp.route('', methods=['GET'])
 @limiter.limit("10 per minute")  # Rate limiting for protection
 @role_required('admin')  # Restrict to admin role
+@replica_reads  # Read-only: served from the replica when configured
 def get_employees():
     """
     Retrieves paginated employees with optional sorting and metadata.
@@ -63,51 +66,28 @@ def get_employees():
     - sort_by (str): Sorting field ('name', 'position', 'email', 'phone') (default: 'name')
     - sort_order (str): Sorting order ('asc' or 'desc') (default: 'asc')
     - include_meta (bool): Include metadata (default: true)
+    - pagination (str): 'offset', 'cursor' or 'after_id' (default: 'offset')
+    - cursor (str): Opaque `next_cursor` from the previous page; implies cursor mode
+    - after_id (int): Last id seen; implies after_id mode
+    - meta (str): 'exact' (cached count) or 'approximate' (table statistics) totals (default: 'exact')
 
     Returns:
     - 200: Paginated employee data.
     - 500: Server error during query.
     """
     try:
-        # Pagination parameters
-        page = request.args.get('page', default=1, type=int)
-        per_page = request.args.get('per_page', default=10, type=int)
-
-        # Sorting parameters
-        sort_by = request.args.get('sort_by', default='name', type=str)
-        sort_order = request.args.get('sort_order', default='asc', type=str)
-
-        # Metadata toggle
-        include_meta = request.args.get('include_meta', default='true', type=str).lower() == 'true'
-
-        # Validate pagination
-        if page < 1 or per_page < 1 or per_page > 100:
-            return error_response("Invalid pagination parameters.")
+        # Shared pagination parameters (offset, cursor or after_id mode)
+        args = pagination_args(default_sort_by='name')
 
         # Validate sorting fields
-        if sort_by not in SORTABLE_FIELDS:
+        if args["sort_by"] not in SORTABLE_FIELDS:
             return error_response(f"Invalid sort_by field. Allowed: {SORTABLE_FIELDS}")
 
         # Fetch paginated employees
-        data = EmployeeService.get_paginated_employees(
-            page=page,
-            per_page=per_page,
-            sort_by=sort_by,
-            sort_order=sort_order,
-            include_meta=include_meta
-        )
-
-        # Prepare JSON response
-        response = {"employees": employees_schema.dump(data["items"])}
-        if include_meta:
-            response.update({
-                "total": data["total"],
-                "pages": data["pages"],
-                "page": data["page"],
-                "per_page": data["per_page"]
-            })
-
-        return jsonify(response), 200
+        data = EmployeeService.get_paginated_employees(**args)
+        return jsonify(paginated_response("employees", employees_schema, data)), 200
+    except PaginationError as e:
+        return error_response(str(e))
     except Exception as e:
         return error_response(str(e), 500)
 
@@ -1,8 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+from marshmallow import ValidationError
 from services.order_service import OrderService
-from schemas.order_schema import order_schema, orders_schema
-from utils.utils import error_response, role_required
+from schemas.order_schema import order_schema, orders_schema, expanded_order_schema, EXPANDABLE_FIELDS
+from utils.utils import error_response, role_required, parse_expand
 from limiter import limiter
+from utils.pagination import pagination_args, paginated_response, PaginationError
+from utils.export import EXPORT_FORMATS, export_response
+from utils.db_routing import replica_reads
 
 # Create Blueprint
 order_bp = Blueprint('orders', __name__)
@@ -45,12 +49,60 @@ def create_order():
         return error_response(str(e))
 
 
+# ---------------------------
+# Create Orders in Bulk
+# ---------------------------
+@order_bp.route('/bulk', methods=['POST'])
+@limiter.limit("30 per minute")
+@role_required('user')  # Allow 'user' role to create orders
+def create_orders_bulk():
+    """
+    Creates many orders in one transaction.
+
+    Request Body:
+    - JSON array of {customer_id, product_id, quantity} (max: BULK_ORDER_MAX_ITEMS).
+
+    Invalid items are reported and skipped; all valid items are inserted together.
+
+    Returns:
+    - 201: All orders created; per-item results ({"index", "status", "total_price", ...}).
+    - 207: Some orders failed; per-item results include "errors" for failed items.
+    - 400: Body is not a list, is empty or is too large.
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, list) or not data:
+            return error_response("Request body must be a non-empty JSON array of orders.")
+
+        max_items = current_app.config.get('BULK_ORDER_MAX_ITEMS', 1000)
+        if len(data) > max_items:
+            return error_response(f"Too many orders. Maximum per request: {max_items}.")
+
+        # Validate every item with the order schema, keeping per-item errors
+        try:
+            loaded, errors = orders_schema.load(data), {}
+        except ValidationError as e:
+            loaded, errors = e.valid_data, e.messages
+
+        valid = [(index, item) for index, item in enumerate(loaded) if index not in errors]
+        results = OrderService.create_orders_bulk(valid) if valid else []
+        results.extend({"index": index, "status": "error", "errors": messages} for index, messages in errors.items())
+        results.sort(key=lambda result: result["index"])
+
+        created = sum(1 for result in results if result["status"] == "created")
+        failed = len(results) - created
+        return jsonify({"results": results, "created": created, "failed": failed}), 207 if failed else 201
+    except Exception as e:
+        return error_response(str(e))
+
+
 # ---------------------------
 # Get Paginated Orders
 # ---------------------------
 @order_bp.route('', methods=['GET'])
 @limiter.limit("10 per minute")
 @role_required('admin')  # Admin-only access
+@replica_reads  # Read-only: served from the replica when configured
 def get_orders():
     """
     Retrieves paginated orders with optional sorting and metadata.
@@ -61,50 +113,35 @@ def get_orders():
     - sort_by (str): Field to sort by ('created_at', 'quantity', 'total_price') (default: 'created_at').
     - sort_order (str): Sorting order ('asc' or 'desc') (default: 'asc').
     - include_meta (bool): Include metadata (default: true).
+    - pagination (str): 'offset', 'cursor' or 'after_id' (default: 'offset').
+    - cursor (str): Opaque `next_cursor` from the previous page; implies cursor mode.
+    - after_id (int): Last id seen; implies after_id mode.
+    - meta (str): 'exact' (cached count) or 'approximate' (table statistics) totals (default: 'exact').
+    - expand (str): Comma-separated relationships to embed ('customer', 'product').
 
     Returns:
     - 200: Paginated orders with metadata.
     - 500: Server error.
     """
     try:
-        # Pagination parameters
-        page = request.args.get('page', default=1, type=int)
-        per_page = request.args.get('per_page', default=10, type=int)
-
-        # Sorting parameters
-        sort_by = request.args.get('sort_by', default='created_at', type=str)
-        sort_order = request.args.get('sort_order', default='asc', type=str)
-
-        # Metadata toggle
-        include_meta = request.args.get('include_meta', default='true', type=str).lower() == 'true'
+        # Shared pagination parameters (offset, cursor or after_id mode)
+        args = pagination_args(default_sort_by='created_at')
 
-        # Validate inputs
-        if page < 1 or per_page < 1 or per_page > 100:
-            return error_response("Invalid pagination parameters.")
+        # Relationships to embed, batch-loaded per page
+        try:
+            expand = parse_expand(request.args.get('expand'), EXPANDABLE_FIELDS)
+        except ValueError as e:
+            return error_response(str(e))
 
-        if sort_by not in SORTABLE_FIELDS:
+        # Validate sorting fields
+        if args["sort_by"] not in SORTABLE_FIELDS:
             return error_response(f"Invalid sort_by field. Allowed: {SORTABLE_FIELDS}")
 
         # Fetch paginated orders
-        data = OrderService.get_paginated_orders(
-            page=page,
-            per_page=per_page,
-            sort_by=sort_by,
-            sort_order=sort_order,
-            include_meta=include_meta
-        )
-
-        # Prepare JSON response
-        response = {"orders": orders_schema.dump(data["items"])}
-        if include_meta:
-            response.update({
-                "total": data["total"],
-                "pages": data["pages"],
-                "page": data["page"],
-                "per_page": data["per_page"]
-            })
-
-        return jsonify(response), 200
+        data = OrderService.get_paginated_orders(**args, expand=expand)
+        return jsonify(paginated_response("orders", expanded_order_schema(expand, many=True), data)), 200
+    except PaginationError as e:
+        return error_response(str(e))
     except Exception as e:
         return error_response(str(e), 500)
 
@@ -122,13 +159,22 @@ def get_order(order_id):
     Path Parameters:
     - order_id (int): Order ID.
 
+    Query Parameters:
+    - expand (str): Comma-separated relationships to embed ('customer', 'product').
+
     Returns:
     - 200: Order data.
+    - 400: Invalid expand value.
     - 404: Order not found.
     """
     try:
-        order = OrderService.get_order_by_id(order_id)
-        return jsonify(order_schema.dump(order)), 200
+        expand = parse_expand(request.args.get('expand'), EXPANDABLE_FIELDS)
+    except ValueError as e:
+        return error_response(str(e))
+
+    try:
+        order = OrderService.get_order_by_id(order_id, expand=expand)
+        return jsonify(expanded_order_schema(expand).dump(order)), 200
     except Exception as e:
         return error_response(str(e), 404)
 
@@ -187,3 +233,42 @@ def delete_order(order_id):
         return jsonify({"message": "Order deleted successfully"}), 200
     except Exception as e:
         return error_response(str(e), 404)
+
+
+# ---------------------------
+# Export Orders
+# ---------------------------
+@order_bp.route('/export', methods=['GET'])
+@limiter.limit("5 per minute")
+@role_required('admin')  # Admin-only access
+@replica_reads  # Read-only: served from the replica when configured
+def export_orders():
+    """
+    Streams all orders as NDJSON or CSV without paging (archived orders included
+    when date_from reaches them or is omitted).
+
+    Query Parameters:
+    - format (str): 'ndjson' or 'csv' (default: 'ndjson').
+    - sort_by (str): Field to sort by ('created_at', 'quantity', 'total_price') (default: 'created_at').
+    - sort_order (str): Sorting order ('asc' or 'desc') (default: 'asc').
+    - date_from (str): Earliest creation date, inclusive (YYYY-MM-DD).
+    - date_to (str): Latest creation date, inclusive (YYYY-MM-DD).
+
+    Returns:
+    - 200: Streamed export.
+    - 400: Invalid parameters.
+    """
+    try:
+        export_format = request.args.get('format', default='ndjson', type=str).lower()
+        if export_format not in EXPORT_FORMATS:
+            return error_response(f"Invalid format. Allowed: {list(EXPORT_FORMATS)}")
+
+        columns, rows = OrderService.stream_orders(
+            sort_by=request.args.get('sort_by', default='created_at', type=str),
+            sort_order=request.args.get('sort_order', default='asc', type=str),
+            date_from=request.args.get('date_from', default=None, type=str),
+            date_to=request.args.get('date_to', default=None, type=str)
+        )
+        return export_response(rows, columns, export_format, 'orders')
+    except Exception as e:
+        return error_response(str(e))
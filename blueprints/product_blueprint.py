@@ -3,6 +3,8 @@ from services.product_service import ProductService
 from schemas.product_schema import product_schema, products_schema
 from utils.utils import error_response, role_required
 from limiter import limiter
+from utils.pagination import pagination_args, paginated_response, PaginationError
+from utils.db_routing import replica_reads
 
 # Create Blueprint
 product_bp = Blueprint('products', __name__)
@@ -24,7 +26,8 @@ def create_product():
 
         product = ProductService.create_product(
             name=validated_data['name'],
-            price=validated_data['price']
+            price=validated_data['price'],
+            stock_quantity=validated_data['stock_quantity']
         )
         return jsonify(product_schema.dump(product)), 201
     except Exception as e:
@@ -37,6 +40,7 @@ def create_product():
 @product_bp.route('', methods=['GET'])
 @limiter.limit("10 per minute")
 @role_required('admin')  # Admin-only access to view all products
+@replica_reads  # Read-only: served from the replica when configured
 def get_products():
     """
     Retrieves paginated products with optional sorting and metadata.
@@ -47,49 +51,24 @@ def get_products():
     - sort_by (str): Field to sort by ('name', 'price') (default: 'name')
     - sort_order (str): Sort order ('asc', 'desc') (default: 'asc')
     - include_meta (bool): Include metadata (default: true)
+    - pagination (str): 'offset', 'cursor' or 'after_id' (default: 'offset')
+    - cursor (str): Opaque `next_cursor` from the previous page; implies cursor mode
+    - after_id (int): Last id seen; implies after_id mode
+    - meta (str): 'exact' (cached count) or 'approximate' (table statistics) totals (default: 'exact')
     """
     try:
-        # Pagination parameters
-        page = request.args.get('page', default=1, type=int)
-        per_page = request.args.get('per_page', default=10, type=int)
+        # Shared pagination parameters (offset, cursor or after_id mode)
+        args = pagination_args(default_sort_by='name')
 
-        # Sorting parameters
-        sort_by = request.args.get('sort_by', default='name', type=str)
-        sort_order = request.args.get('sort_order', default='asc', type=str)
-
-        # Metadata toggle
-        include_meta = request.args.get('include_meta', default='true', type=str).lower() == 'true'
-
-        # Input validation
-        if page < 1 or per_page < 1 or per_page > 100:
-            return error_response("Invalid pagination parameters.", 400)
-
-        if sort_by not in SORTABLE_FIELDS:
-            return error_response(f"Invalid sort_by field. Allowed: {SORTABLE_FIELDS}", 400)
+        # Validate sorting fields
+        if args["sort_by"] not in SORTABLE_FIELDS:
+            return error_response(f"Invalid sort_by field. Allowed: {SORTABLE_FIELDS}")
 
         # Fetch paginated products
-        data = ProductService.get_paginated_products(
-            page=page,
-            per_page=per_page,
-            sort_by=sort_by,
-            sort_order=sort_order,
-            include_meta=include_meta
-        )
-
-        # Prepare JSON response
-        response = {
-            "products": products_schema.dump(data["items"])
-        }
-
-        if include_meta:
-            response.update({
-                "total": data["total"],
-                "pages": data["pages"],
-                "page": data["page"],
-                "per_page": data["per_page"]
-            })
-
-        return jsonify(response), 200
+        data = ProductService.get_paginated_products(**args)
+        return jsonify(paginated_response("products", products_schema, data)), 200
+    except PaginationError as e:
+        return error_response(str(e))
     except Exception as e:
         return error_response(str(e), 500)
 
@@ -1,8 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from services.production_service import ProductionService
 from schemas.production_schema import production_schema, productions_schema
 from limiter import limiter
+from utils.pagination import pagination_args, paginated_response, PaginationError
+from utils.export import EXPORT_FORMATS, export_response
+from utils.ingest import resolve_ingest_format, iter_records
 from utils.utils import error_response, role_required  # Import role-based access and error handling
+from utils.db_routing import replica_reads
 
 # Create Blueprint
 production_bp = Blueprint('production', __name__)
@@ -23,19 +27,77 @@ def create_production():
         production = ProductionService.create_production(
             product_id=validated_data['product_id'],
             quantity_produced=validated_data['quantity_produced'],
-            date_produced=validated_data['date_produced']
+            date_produced=validated_data['date_produced'],
+            employee_id=validated_data.get('employee_id')
         )
         return jsonify(production_schema.dump(production)), 201
     except Exception as e:
         return error_response(str(e))
 
 
+# ---------------------------
+# Bulk Upload Production Records
+# ---------------------------
+@production_bp.route('/bulk', methods=['POST'])
+@limiter.limit("5 per minute")
+@role_required('admin')  # Only admin can create production records
+def create_productions_bulk():
+    """
+    Ingests production records uploaded as CSV or NDJSON.
+
+    The body is parsed line by line while it is read, validated with the
+    production schema's field rules, and inserted in chunks of
+    BULK_PRODUCTION_CHUNK_SIZE rows (one commit per chunk).
+
+    Request Body:
+    - CSV with a header row, or NDJSON (one JSON object per line), with
+      product_id, quantity_produced, date_produced (YYYY-MM-DD) and an
+      optional employee_id.
+
+    Query Parameters:
+    - format (str): 'csv' or 'ndjson'; defaults to the Content-Type
+      (text/csv or application/x-ndjson).
+
+    Returns:
+    - 201: Every record inserted; per-chunk summary.
+    - 207: Some records rejected; chunk summaries sample the rejected lines.
+    - 400: Unsupported format or empty upload.
+    """
+    try:
+        ingest_format = resolve_ingest_format(request.args.get('format'), request.mimetype)
+    except ValueError as e:
+        return error_response(str(e))
+
+    def validated(records):
+        for line, record, error in records:
+            if error:
+                yield line, None, {"_line": [error]}
+            else:
+                data, errors = production_schema.load_row(record)
+                yield line, data, errors
+
+    try:
+        chunks = ProductionService.ingest_productions(
+            validated(iter_records(request.stream, ingest_format)),
+            chunk_size=current_app.config.get('BULK_PRODUCTION_CHUNK_SIZE', 1000)
+        )
+        if not chunks:
+            return error_response("Upload contains no records.")
+
+        inserted = sum(chunk["inserted"] for chunk in chunks)
+        rejected = sum(chunk["rejected"] for chunk in chunks)
+        return jsonify({"chunks": chunks, "inserted": inserted, "rejected": rejected}), 207 if rejected else 201
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
 # ---------------------------
 # Get Paginated Production Records
 # ---------------------------
 @production_bp.route('', methods=['GET'])
 @limiter.limit("10 per minute")
 @role_required('admin')  # Only admin can view production records
+@replica_reads  # Read-only: served from the replica when configured
 def get_productions():
     """
     Retrieves paginated production records.
@@ -46,38 +108,23 @@ def get_productions():
     - sort_by (str): Field to sort by ('date_produced', 'quantity_produced') (default: 'date_produced').
     - sort_order (str): Sort order ('asc', 'desc') (default: 'asc').
     - include_meta (bool): Include metadata (default: true).
+    - pagination (str): 'offset', 'cursor' or 'after_id' (default: 'offset').
+    - cursor (str): Opaque `next_cursor` from the previous page; implies cursor mode.
+    - after_id (int): Last id seen; implies after_id mode.
+    - meta (str): 'exact' (cached count) or 'approximate' (table statistics) totals (default: 'exact').
 
     Example:
     GET /production?page=2&per_page=5&sort_by=quantity_produced&sort_order=desc
     """
     try:
-        # Query parameters
-        page = request.args.get('page', default=1, type=int)
-        per_page = request.args.get('per_page', default=10, type=int)
-        sort_by = request.args.get('sort_by', default='date_produced', type=str)
-        sort_order = request.args.get('sort_order', default='asc', type=str)
-        include_meta = request.args.get('include_meta', default='true', type=str).lower() == 'true'
-
-        # Fetch paginated records
-        data = ProductionService.get_paginated_productions(
-            page=page,
-            per_page=per_page,
-            sort_by=sort_by,
-            sort_order=sort_order,
-            include_meta=include_meta
-        )
+        # Shared pagination parameters (offset, cursor or after_id mode)
+        args = pagination_args(default_sort_by='date_produced')
 
-        # Build response
-        response = {"productions": productions_schema.dump(data["items"])}
-        if include_meta:
-            response.update({
-                "total": data["total"],
-                "pages": data["pages"],
-                "page": data["page"],
-                "per_page": data["per_page"]
-            })
-
-        return jsonify(response), 200
+        # Fetch paginated productions
+        data = ProductionService.get_paginated_productions(**args)
+        return jsonify(paginated_response("productions", productions_schema, data)), 200
+    except PaginationError as e:
+        return error_response(str(e))
     except Exception as e:
         return error_response(str(e), 500)
 
@@ -112,7 +159,8 @@ def update_production(production_id):
         production = ProductionService.update_production(
             production_id,
             quantity_produced=validated_data.get('quantity_produced'),
-            date_produced=validated_data.get('date_produced')
+            date_produced=validated_data.get('date_produced'),
+            employee_id=validated_data.get('employee_id')
         )
         return jsonify(production_schema.dump(production)), 200
     except Exception as e:
@@ -132,3 +180,42 @@ def delete_production(production_id):
         return jsonify({"message": "Production record deleted successfully"}), 200
     except Exception as e:
         return error_response(str(e), 404)
+
+
+# ---------------------------
+# Export Production Records
+# ---------------------------
+@production_bp.route('/export', methods=['GET'])
+@limiter.limit("5 per minute")
+@role_required('admin')  # Admin-only access
+@replica_reads  # Read-only: served from the replica when configured
+def export_productions():
+    """
+    Streams all production records as NDJSON or CSV without paging (archived records
+    included when date_from reaches them or is omitted).
+
+    Query Parameters:
+    - format (str): 'ndjson' or 'csv' (default: 'ndjson').
+    - sort_by (str): Field to sort by ('date_produced', 'quantity_produced') (default: 'date_produced').
+    - sort_order (str): Sorting order ('asc' or 'desc') (default: 'asc').
+    - date_from (str): Earliest production date, inclusive (YYYY-MM-DD).
+    - date_to (str): Latest production date, inclusive (YYYY-MM-DD).
+
+    Returns:
+    - 200: Streamed export.
+    - 400: Invalid parameters.
+    """
+    try:
+        export_format = request.args.get('format', default='ndjson', type=str).lower()
+        if export_format not in EXPORT_FORMATS:
+            return error_response(f"Invalid format. Allowed: {list(EXPORT_FORMATS)}")
+
+        columns, rows = ProductionService.stream_productions(
+            sort_by=request.args.get('sort_by', default='date_produced', type=str),
+            sort_order=request.args.get('sort_order', default='asc', type=str),
+            date_from=request.args.get('date_from', default=None, type=str),
+            date_to=request.args.get('date_to', default=None, type=str)
+        )
+        return export_response(rows, columns, export_format, 'production')
+    except Exception as e:
+        return error_response(str(e))
@@ -3,6 +3,7 @@ from models.user import User
 from schemas.user_schema import user_schema, users_schema
 from utils.utils import encode_token, decode_token, role_required, error_response
 from limiter import limiter
+from utils.pagination import pagination_args, paginated_response
 from sqlalchemy.exc import IntegrityError
 
 # Create Blueprint
@@ -120,31 +121,23 @@ def delete_user(user_id):
 @limiter.limit("10 per minute")
 @role_required('admin')
 def list_users():
-    """Lists all users (admin-level access)."""
+    """
+    Lists all users (admin-level access).
+
+    Query Parameters:
+    - page, per_page, sort_by ('username', 'role', 'created_at'), sort_order, include_meta
+    - pagination (str): 'offset', 'cursor' or 'after_id' (default: 'offset')
+    - cursor (str): Opaque `next_cursor` from the previous page; implies cursor mode
+    - after_id (int): Last id seen; implies after_id mode
+    - meta (str): 'exact' (cached count) or 'approximate' (table statistics) totals (default: 'exact')
+    """
     try:
         from services.user_service import UserService  # Delayed import
-        # Pagination query params
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        sort_by = request.args.get('sort_by', 'username', type=str)
-        sort_order = request.args.get('sort_order', 'asc', type=str)
+        # Shared pagination parameters (offset, cursor or after_id mode)
+        args = pagination_args(default_sort_by='username')
 
         # Fetch paginated users via service
-        data = UserService.get_paginated_users(
-            page=page,
-            per_page=per_page,
-            sort_by=sort_by,
-            sort_order=sort_order,
-            include_meta=True
-        )
-
-        response = {
-            "users": users_schema.dump(data["items"]),
-            "total": data["total"],
-            "pages": data["pages"],
-            "page": data["page"],
-            "per_page": data["per_page"]
-        }
-        return jsonify(response), 200
+        data = UserService.get_paginated_users(**args)
+        return jsonify(paginated_response("users", users_schema, data)), 200
     except Exception as e:
         return error_response(str(e))
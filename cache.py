@@ -0,0 +1,4 @@
+from flask_caching import Cache
+
+# Initialize the Cache globally (backend chosen by CACHE_TYPE in config)
+cache = Cache()
@@ -0,0 +1,119 @@
+import click
+from flask.cli import with_appcontext
+
+
+# ---------------------------
+# Maintenance Commands
+# ---------------------------
+@click.command('reconcile-stock')
+@click.option('--batch-size', default=1000, show_default=True, help='Products recomputed per transaction.')
+@click.option('--dry-run/--apply', default=True, show_default=True, help='Report drift, or correct it.')
+@with_appcontext
+def reconcile_stock_command(batch_size, dry_run):
+    """Recompute product stock from opening stock, production and order history."""
+    from services.product_service import ProductService  # Delayed import
+
+    result = ProductService.reconcile_stock(batch_size=batch_size, dry_run=dry_run)
+    for item in result["corrections"]:
+        click.echo(f"product {item['product_id']}: {item['old']} -> {item['new']}")
+    action = "would correct" if dry_run else "corrected"
+    click.echo(f"Checked {result['checked']} products, {action} {result['drifted']}.")
+    if result["skipped"]:
+        click.echo(f"Skipped {result['skipped']} products with no recorded opening stock.")
+
+
+@click.command('backfill-production-rollup')
+@click.option('--batch-size', default=1000, show_default=True, help='Products rebuilt per transaction.')
+@with_appcontext
+def backfill_production_rollup_command(batch_size):
+    """Rebuild the daily production rollup from production history."""
+    from services.production_service import ProductionService  # Delayed import
+
+    result = ProductionService.backfill_daily_rollup(batch_size=batch_size)
+    click.echo(f"Rebuilt rollup for {result['products']} products ({result['rows']} rows).")
+
+
+@click.command('rebuild-customer-stats')
+@click.option('--batch-size', default=1000, show_default=True, help='Customers rebuilt per transaction.')
+@with_appcontext
+def rebuild_customer_stats_command(batch_size):
+    """Rebuild the customer_stats read model from order history."""
+    from services.customer_service import CustomerService  # Delayed import
+
+    result = CustomerService.rebuild_customer_stats(batch_size=batch_size)
+    click.echo(f"Rebuilt stats for {result['customers']} customers ({result['rows']} rows).")
+
+
+@click.command('backfill-sales-rollup')
+@click.option('--batch-size', default=1000, show_default=True, help='Products rebuilt per transaction.')
+@with_appcontext
+def backfill_sales_rollup_command(batch_size):
+    """Rebuild the daily product sales rollup from order history."""
+    from services.product_service import ProductService  # Delayed import
+
+    result = ProductService.backfill_sales_rollup(batch_size=batch_size)
+    click.echo(f"Rebuilt sales rollup for {result['products']} products ({result['rows']} rows).")
+
+
+@click.command('archive-history')
+@click.option('--table', type=click.Choice(['orders', 'production', 'all']), default='all', show_default=True,
+              help='Hot table(s) to archive.')
+@click.option('--retention-days', type=int, default=None,
+              help='Keep rows younger than this many days (default: ARCHIVE_RETENTION_DAYS).')
+@click.option('--batch-size', type=int, default=None, help='Rows moved per transaction (default: ARCHIVE_BATCH_SIZE).')
+@click.option('--pause', type=float, default=None,
+              help='Minimum seconds between batches (default: ARCHIVE_PAUSE_SECONDS).')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches per table.')
+@with_appcontext
+def archive_history_command(table, retention_days, batch_size, pause, max_batches):
+    """Move orders and production older than the retention window into the archive tables."""
+    from services.archive_service import ArchiveService  # Delayed import
+
+    jobs = {'orders': ArchiveService.archive_orders, 'production': ArchiveService.archive_productions}
+    for name, job in jobs.items():
+        if table in (name, 'all'):
+            result = job(retention_days=retention_days, batch_size=batch_size, pause_seconds=pause,
+                         max_batches=max_batches)
+            status = "done" if result["done"] else "more rows remain"
+            click.echo(f"Archived {result['moved']} {result['table']} rows older than {result['cutoff']} "
+                       f"in {result['batches']} batches ({status}).")
+
+
+@click.command('index-advisor')
+@click.option('--shapes-file', default=None, help='Recorded query shapes (default: INDEX_ADVISOR_FILE).')
+@click.option('--verbose', is_flag=True, help='Also list every full scan, not only the suggested indexes.')
+@with_appcontext
+def index_advisor_command(shapes_file, verbose):
+    """EXPLAIN recorded query shapes and suggest indexes for full table scans."""
+    import os
+    from flask import current_app
+    from utils.index_advisor import load_shapes, advise  # Delayed import
+
+    shapes_file = shapes_file or current_app.config['INDEX_ADVISOR_FILE']
+    if not os.path.exists(shapes_file):
+        raise click.ClickException(
+            f"No recorded shapes at {shapes_file}. Run the app with INDEX_ADVISOR_ENABLED=true first."
+        )
+
+    report = advise(load_shapes(shapes_file))
+    for finding in report["findings"]:
+        if verbose or finding["suggestion"]:
+            click.echo(f"[{finding['table']}] {finding['plan']}: {finding['statement']}")
+            click.echo(f"    -> {finding['suggestion'] or 'no indexable predicate'}")
+    for error in report["errors"]:
+        click.echo(f"EXPLAIN failed: {error['error']}: {error['statement']}", err=True)
+    click.echo(f"Analyzed {report['analyzed']} query shapes; {len(report['findings'])} full scans.")
+    if report["suggestions"]:
+        click.echo("Suggested indexes:")
+        for statement in report["suggestions"].values():
+            click.echo(f"  {statement};")
+
+
+def register_commands(app):
+    """Registers the maintenance CLI commands on the app."""
+    app.cli.add_command(reconcile_stock_command)
+    app.cli.add_command(backfill_production_rollup_command)
+    app.cli.add_command(rebuild_customer_stats_command)
+    app.cli.add_command(backfill_sales_rollup_command)
+    app.cli.add_command(archive_history_command)
+    app.cli.add_command(index_advisor_command)
@@ -1,7 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
+from utils.db_routing import RoutingSession
 
-# Initialize the database object
-db = SQLAlchemy()
+# Initialize the database object (reads can be routed to a replica bind)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+from .soft_delete import SoftDeleteMixin, with_deleted
 
 # Import models AFTER db initialization to avoid circular imports
 from .employee import Employee
@@ -10,8 +13,14 @@ from .order import Order
 from .customer import Customer
 from .production import Production
 from .user import User
+from .production_daily_rollup import ProductionDailyRollup
+from .customer_stats import CustomerStats
+from .product_sales_daily_rollup import ProductSalesDailyRollup
+from .order_archive import OrderArchive
+from .production_archive import ProductionArchive
 # Control explicit exports
-__all__ = ["db", "Employee", "Product", "Order", "Customer", "Production", "User"]
+__all__ = ["db", "Employee", "Product", "Order", "Customer", "Production", "User", "ProductionDailyRollup", "CustomerStats",
+           "ProductSalesDailyRollup", "OrderArchive", "ProductionArchive", "SoftDeleteMixin", "with_deleted"]
 
 # Optional logging for debugging purposes
 import logging
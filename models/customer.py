@@ -1,9 +1,14 @@
 from models import db
+from models.soft_delete import SoftDeleteMixin, live_rows_index
 from sqlalchemy.sql import func
 
 
-class Customer(db.Model):
+class Customer(SoftDeleteMixin, db.Model):
     __tablename__ = 'customers'
+    __table_args__ = (
+        # Default listing sort (id breaks ties); live rows only
+        *live_rows_index('ix_customers_live_name_id', 'name', 'id'),
+    )
 
     # Columns
     id = db.Column(db.Integer, primary_key=True)
@@ -12,10 +17,10 @@ class Customer(db.Model):
     phone = db.Column(db.String(20), unique=True, nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp())
-    deleted_at = db.Column(db.DateTime, nullable=True)
 
-    # Relationships
-    orders = db.relationship('Order', back_populates='customer', lazy='joined')
+    # Relationships (loaded on demand; order history can be large, so reads
+    # use the paginated /customers/<id>/orders sub-resource or SQL summaries)
+    orders = db.relationship('Order', back_populates='customer', lazy='select')
 
     # ---------------------------
     # Soft Deletion Methods
@@ -0,0 +1,40 @@
+from models import db
+
+
+class CustomerStats(db.Model):
+    """
+    Per-customer order aggregates, kept in step with `orders` inside the same
+    transaction as every order write.
+
+    Indexed on lifetime_value so threshold queries are an index range scan.
+    """
+    __tablename__ = 'customer_stats'
+
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    lifetime_value = db.Column(db.Float, nullable=False, default=0.0, index=True)
+    first_order_at = db.Column(db.DateTime, nullable=True)
+    last_order_at = db.Column(db.DateTime, nullable=True)
+
+    # Relationships
+    customer = db.relationship('Customer')
+
+    # ---------------------------
+    # JSON Serialization
+    # ---------------------------
+    def to_dict(self):
+        """Converts the model instance into a JSON-serializable dictionary."""
+        return {
+            "customer_id": self.customer_id,
+            "order_count": self.order_count,
+            "lifetime_value": self.lifetime_value,
+            "first_order_at": self.first_order_at.isoformat() if self.first_order_at else None,
+            "last_order_at": self.last_order_at.isoformat() if self.last_order_at else None,
+        }
+
+    # ---------------------------
+    # String Representation
+    # ---------------------------
+    def __repr__(self):
+        """Defines how the object is represented as a string."""
+        return f"<CustomerStats {self.customer_id}: {self.order_count} orders, ${self.lifetime_value}>"
@@ -1,10 +1,15 @@
 from models import db
+from models.soft_delete import SoftDeleteMixin, live_rows_index
 from sqlalchemy.sql import func
 from datetime import datetime
 
 
-class Employee(db.Model):
+class Employee(SoftDeleteMixin, db.Model):
     __tablename__ = 'employees'
+    __table_args__ = (
+        # Default listing sort (id breaks ties); live rows only
+        *live_rows_index('ix_employees_live_name_id', 'name', 'id'),
+    )
 
     # Columns
     id = db.Column(db.Integer, primary_key=True)
@@ -14,10 +19,10 @@ class Employee(db.Model):
     phone = db.Column(db.String(20), unique=True, nullable=False, index=True)  # Indexed for fast lookups
     created_at = db.Column(db.DateTime, default=func.current_timestamp())  # Timestamp for creation
     updated_at = db.Column(db.DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp())  # Timestamp for updates
-    deleted_at = db.Column(db.DateTime, nullable=True)  # Soft delete marker
 
     # Relationships (Optional for scalability)
     # orders = db.relationship('Order', backref='employee', lazy='dynamic')
+    productions = db.relationship('Production', back_populates='employee', lazy='dynamic')
 
     # ---------------------------
     # Soft Deletion
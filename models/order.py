@@ -1,10 +1,21 @@
 from models import db
+from models.soft_delete import SoftDeleteMixin, live_rows_index
 from sqlalchemy.sql import func
 from datetime import datetime
 
 
-class Order(db.Model):
+class Order(SoftDeleteMixin, db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        # Per-customer history reads and customer_stats first/last order recomputation
+        db.Index('ix_orders_customer_id_created_at', 'customer_id', 'created_at'),
+        # Per-product sums (stock reconciliation, sales rollup backfill) and product filters over a window
+        db.Index('ix_orders_product_id_created_at', 'product_id', 'created_at'),
+        # Listing sort and keyset pagination on created_at (id breaks ties), export date windows; live rows only
+        *live_rows_index('ix_orders_live_created_at_id', 'created_at', 'id'),
+        # Never reuse ids: archived rows keep theirs, so a recycled id would collide in the archive
+        {'sqlite_autoincrement': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
@@ -13,7 +24,6 @@ class Order(db.Model):
     total_price = db.Column(db.Float, nullable=False)
     created_at = db.Column(db.DateTime, default=func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp())
-    deleted_at = db.Column(db.DateTime, nullable=True)
 
     # Relationships
     customer = db.relationship('Customer', back_populates='orders', overlaps="customer_orders")
@@ -23,24 +33,45 @@ class Order(db.Model):
     # Soft Deletion
     # ---------------------------
     def soft_delete(self):
-        """Marks the order as deleted without removing it."""
+        """Marks the order as deleted without removing it and takes it out of the read models."""
+        from services.customer_service import CustomerService  # Delayed import
+        from services.order_service import OrderService
+
+        if self.deleted_at is not None:
+            return
         self.deleted_at = datetime.utcnow()  # Use client-side timestamp
+        OrderService._record_deltas([
+            (self.customer_id, self.product_id, self.created_at, -1, -self.quantity, -self.total_price)
+        ])
+        db.session.flush()
+        CustomerService.refresh_order_bounds([self.customer_id])
         db.session.commit()
 
     # ---------------------------
     # Restore Deleted Order
     # ---------------------------
     def restore(self):
-        """Restores a soft-deleted order."""
+        """Restores a soft-deleted order and counts it in the read models again."""
+        from services.order_service import OrderService  # Delayed import
+
+        if self.deleted_at is None:
+            return
         self.deleted_at = None
+        OrderService._record_deltas([
+            (self.customer_id, self.product_id, self.created_at, 1, self.quantity, self.total_price)
+        ], inserted=True)
         db.session.commit()
 
     # ---------------------------
     # JSON Serialization
     # ---------------------------
-    def to_dict(self):
-        """Converts the model instance into a JSON-serializable dictionary."""
-        return {
+    def to_dict(self, expand=()):
+        """
+        Converts the model instance into a JSON-serializable dictionary.
+
+        Relationships are only read (and lazily loaded) when named in `expand`.
+        """
+        data = {
             "id": self.id,
             "customer_id": self.customer_id,
             "product_id": self.product_id,
@@ -49,17 +80,20 @@ class Order(db.Model):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "deleted_at": self.deleted_at.isoformat() if self.deleted_at else None,
-            "customer": {
+        }
+        if 'customer' in expand:
+            data["customer"] = {
                 "id": self.customer.id,
                 "name": self.customer.name,
                 "email": self.customer.email
-            } if self.customer else None,
-            "product": {
+            } if self.customer else None
+        if 'product' in expand:
+            data["product"] = {
                 "id": self.product.id,
                 "name": self.product.name,
                 "price": self.product.price
             } if self.product else None
-        }
+        return data
 
     # ---------------------------
     # String Representation
@@ -0,0 +1,37 @@
+from models import db
+from models.soft_delete import SoftDeleteMixin
+from sqlalchemy.sql import func
+
+
+class OrderArchive(SoftDeleteMixin, db.Model):
+    """
+    Orders older than the retention window, moved out of `orders` by
+    `ArchiveService.archive_orders`. Rows keep their original id and columns.
+
+    Read through `utils.archive.archive_source(Order, since)`, which only adds
+    this table when the requested window reaches archived dates.
+    """
+    __tablename__ = 'orders_archive'
+    __table_args__ = (
+        # Date windows (exports, aggregates) and the archived-through horizon (MAX(created_at))
+        db.Index('ix_orders_archive_created_at_id', 'created_at', 'id'),
+        # Per-customer and per-product sums when read models are rebuilt
+        db.Index('ix_orders_archive_customer_id_created_at', 'customer_id', 'created_at'),
+        db.Index('ix_orders_archive_product_id_created_at', 'product_id', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Id the order had in `orders`
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    total_price = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False, default=func.current_timestamp())
+
+    # ---------------------------
+    # String Representation
+    # ---------------------------
+    def __repr__(self):
+        """Defines how the object is represented as a string."""
+        return f"<OrderArchive {self.id} - ${self.total_price}>"
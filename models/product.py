@@ -1,17 +1,29 @@
 from models import db
+from models.soft_delete import SoftDeleteMixin, live_rows_index
 from sqlalchemy.sql import func
 from datetime import datetime
 
-class Product(db.Model):
+
+def _stock_at_creation(context):
+    """Column default: the stock a product is inserted with."""
+    return context.get_current_parameters().get('stock_quantity')
+
+
+class Product(SoftDeleteMixin, db.Model):
     __tablename__ = 'products'
+    __table_args__ = (
+        # Default listing sort (id breaks ties); live rows only
+        *live_rows_index('ix_products_live_name_id', 'name', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, index=True)
     price = db.Column(db.Float, nullable=False)
     stock_quantity = db.Column(db.Integer, nullable=False)  # Add stock_quantity column
+    # Stock not explained by production or orders (opening stock); NULL for products that predate it
+    opening_stock = db.Column(db.Integer, nullable=True, default=_stock_at_creation)
     created_at = db.Column(db.DateTime, default=func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp())
-    deleted_at = db.Column(db.DateTime, nullable=True)
 
     # Relationships
     orders = db.relationship('Order', back_populates='product', overlaps="product_orders")
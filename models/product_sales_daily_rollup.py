@@ -0,0 +1,37 @@
+from models import db
+
+
+class ProductSalesDailyRollup(db.Model):
+    """
+    Units sold and revenue per product per day, kept in step with `orders`
+    inside the same transaction as every order write.
+
+    The key leads with `day` so windowed reads touch only the days in range.
+    """
+    __tablename__ = 'product_sales_daily_rollup'
+
+    day = db.Column(db.Date, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    quantity_sold = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)  # Rows with count 0 are inert
+
+    # ---------------------------
+    # JSON Serialization
+    # ---------------------------
+    def to_dict(self):
+        """Converts the model instance into a JSON-serializable dictionary."""
+        return {
+            "day": self.day.strftime("%Y-%m-%d"),
+            "product_id": self.product_id,
+            "quantity_sold": self.quantity_sold,
+            "revenue": self.revenue,
+            "order_count": self.order_count,
+        }
+
+    # ---------------------------
+    # String Representation
+    # ---------------------------
+    def __repr__(self):
+        """Defines how the object is represented as a string."""
+        return f"<ProductSalesDailyRollup {self.day} - {self.product_id}: {self.quantity_sold}>"
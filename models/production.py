@@ -1,21 +1,33 @@
 from models import db
+from models.soft_delete import SoftDeleteMixin, live_rows_index
 from sqlalchemy.sql import func
 from datetime import datetime
 
 
-class Production(db.Model):
+class Production(SoftDeleteMixin, db.Model):
     __tablename__ = 'production'
+    __table_args__ = (
+        # Per-employee aggregates over a date window
+        db.Index('ix_production_employee_id_date_produced', 'employee_id', 'date_produced'),
+        # Per-product sums (stock reconciliation, daily rollup backfill) and product filters over a window
+        db.Index('ix_production_product_id_date_produced', 'product_id', 'date_produced'),
+        # Listing sort and keyset pagination on date_produced (id breaks ties), export date windows; live rows only
+        *live_rows_index('ix_production_live_date_produced_id', 'date_produced', 'id'),
+        # Never reuse ids: archived rows keep theirs, so a recycled id would collide in the archive
+        {'sqlite_autoincrement': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    employee_id = db.Column(db.Integer, db.ForeignKey('employees.id'), nullable=True)  # Null for unattributed records
     quantity_produced = db.Column(db.Integer, nullable=False)
     date_produced = db.Column(db.Date, nullable=False)
     created_at = db.Column(db.DateTime, default=func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp())
-    deleted_at = db.Column(db.DateTime, nullable=True)
 
     # Relationships
     product = db.relationship('Product', back_populates='productions', overlaps="product_productions")
+    employee = db.relationship('Employee', back_populates='productions')
 
     def __repr__(self):
         return f"<Production {self.product_id} - {self.quantity_produced}>"
@@ -24,16 +36,26 @@ class Production(db.Model):
     # Soft Deletion
     # ---------------------------
     def soft_delete(self):
-        """Marks the production record as deleted without removing it."""
+        """Marks the production record as deleted without removing it and takes it out of the daily rollup."""
+        from services.production_service import ProductionService  # Delayed import
+
+        if self.deleted_at is not None:
+            return
         self.deleted_at = datetime.utcnow()  # Use client-side timestamp
+        ProductionService._roll_up([(self.product_id, self.date_produced, -self.quantity_produced, -1)])
         db.session.commit()
 
     # ---------------------------
     # Restore Deleted Production
     # ---------------------------
     def restore(self):
-        """Restores a soft-deleted production record."""
+        """Restores a soft-deleted production record and counts it in the daily rollup again."""
+        from services.production_service import ProductionService  # Delayed import
+
+        if self.deleted_at is None:
+            return
         self.deleted_at = None
+        ProductionService._roll_up([(self.product_id, self.date_produced, self.quantity_produced, 1)])
         db.session.commit()
 
     # ---------------------------
@@ -45,6 +67,7 @@ class Production(db.Model):
             "id": self.id,
             "product_id": self.product_id,
             "product_name": self.product.name if self.product else None,
+            "employee_id": self.employee_id,
             "quantity_produced": self.quantity_produced,
             "date_produced": self.date_produced.strftime("%Y-%m-%d"),
             "created_at": self.created_at.isoformat() if self.created_at else None,
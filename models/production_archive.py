@@ -0,0 +1,38 @@
+from models import db
+from models.soft_delete import SoftDeleteMixin
+from sqlalchemy.sql import func
+
+
+class ProductionArchive(SoftDeleteMixin, db.Model):
+    """
+    Production records older than the retention window, moved out of
+    `production` by `ArchiveService.archive_productions`. Rows keep their
+    original id and columns.
+
+    Read through `utils.archive.archive_source(Production, since)`, which only
+    adds this table when the requested window reaches archived dates.
+    """
+    __tablename__ = 'production_archive'
+    __table_args__ = (
+        # Date windows (exports, aggregates) and the archived-through horizon (MAX(date_produced))
+        db.Index('ix_production_archive_date_produced_id', 'date_produced', 'id'),
+        # Per-product and per-employee sums when read models are rebuilt or employees ranked
+        db.Index('ix_production_archive_product_id_date_produced', 'product_id', 'date_produced'),
+        db.Index('ix_production_archive_employee_id_date_produced', 'employee_id', 'date_produced'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Id the record had in `production`
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    employee_id = db.Column(db.Integer, db.ForeignKey('employees.id'), nullable=True)
+    quantity_produced = db.Column(db.Integer, nullable=False)
+    date_produced = db.Column(db.Date, nullable=False)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False, default=func.current_timestamp())
+
+    # ---------------------------
+    # String Representation
+    # ---------------------------
+    def __repr__(self):
+        """Defines how the object is represented as a string."""
+        return f"<ProductionArchive {self.id} - {self.quantity_produced} units>"
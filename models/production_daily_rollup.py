@@ -0,0 +1,35 @@
+from models import db
+
+
+class ProductionDailyRollup(db.Model):
+    """
+    Units produced per product per day, kept in step with `production` inside
+    the same transaction as every production write.
+
+    The key leads with `day` so per-day reads are a primary-key range scan.
+    """
+    __tablename__ = 'production_daily_rollup'
+
+    day = db.Column(db.Date, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    quantity_produced = db.Column(db.Integer, nullable=False, default=0)
+    record_count = db.Column(db.Integer, nullable=False, default=0)  # Rows with count 0 are inert
+
+    # ---------------------------
+    # JSON Serialization
+    # ---------------------------
+    def to_dict(self):
+        """Converts the model instance into a JSON-serializable dictionary."""
+        return {
+            "day": self.day.strftime("%Y-%m-%d"),
+            "product_id": self.product_id,
+            "quantity_produced": self.quantity_produced,
+            "record_count": self.record_count,
+        }
+
+    # ---------------------------
+    # String Representation
+    # ---------------------------
+    def __repr__(self):
+        """Defines how the object is represented as a string."""
+        return f"<ProductionDailyRollup {self.day} - {self.product_id}: {self.quantity_produced}>"
@@ -0,0 +1,78 @@
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session, with_loader_criteria
+from models import db
+
+# Execution option that turns the soft-delete filter off for one query or statement
+INCLUDE_DELETED = 'include_deleted'
+
+# Dialects with partial (filtered) indexes
+PARTIAL_INDEX_DIALECTS = ('postgresql', 'sqlite')
+
+# Partial-index predicate shared by every live-rows index
+_LIVE = text('deleted_at IS NULL')
+
+
+class SoftDeleteMixin:
+    """
+    Marks models whose soft-deleted rows (deleted_at set) are hidden from ORM reads.
+
+    Opt out per query with `with_deleted(query)` or the `include_deleted`
+    execution option.
+    """
+
+    deleted_at = db.Column(db.DateTime, nullable=True)  # Soft deletion timestamp (NULL: live row)
+
+
+# ---------------------------
+# Live-Row Indexes
+# ---------------------------
+def live_rows_index(name, *columns):
+    """
+    Builds the indexes that serve reads of live rows ordered or filtered by `columns`.
+
+    PostgreSQL and SQLite get a partial index (WHERE deleted_at IS NULL), so
+    deleted history is not indexed at all. Databases without partial indexes
+    get an index led by deleted_at instead, which keeps live rows (NULL)
+    together at the start of the index.
+
+    Returns:
+        tuple: Index objects for `__table_args__` (each emitted only on its dialects).
+    """
+    partial = db.Index(name, *columns, postgresql_where=_LIVE, sqlite_where=_LIVE)
+    leading = db.Index(f"{name}_by_deleted_at", 'deleted_at', *columns)
+    return (
+        partial.ddl_if(dialect=PARTIAL_INDEX_DIALECTS),
+        leading.ddl_if(callable_=lambda ddl, target, bind, dialect, **kw: dialect.name not in PARTIAL_INDEX_DIALECTS),
+    )
+
+
+# ---------------------------
+# Default Filter
+# ---------------------------
+def with_deleted(query):
+    """Returns the query with soft-deleted rows included."""
+    return query.execution_options(**{INCLUDE_DELETED: True})
+
+
+def _exclude_deleted(execute_state):
+    """
+    Session listener: adds `deleted_at IS NULL` for every soft-deletable entity in an ORM SELECT.
+
+    The criteria also propagate to lazy and eager relationship loads issued
+    for the result, and cover aliases and joined entities.
+    """
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get(INCLUDE_DELETED, False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(SoftDeleteMixin, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+        )
+
+
+def register_soft_delete_filter():
+    """Hides soft-deleted rows from ORM reads on every session."""
+    if not event.contains(Session, 'do_orm_execute', _exclude_deleted):
+        event.listen(Session, 'do_orm_execute', _exclude_deleted)
@@ -1,4 +1,5 @@
 from models import db
+from models.soft_delete import SoftDeleteMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy.sql import func
 
@@ -10,7 +11,7 @@ ROLE_HIERARCHY = {
 }
 
 
-class User(db.Model):
+class User(SoftDeleteMixin, db.Model):
     __tablename__ = 'users'
 
     # Columns
@@ -21,7 +22,6 @@ class User(db.Model):
     is_active = db.Column(db.Boolean, default=True)  # Soft delete status
     created_at = db.Column(db.DateTime, server_default=func.now())
     updated_at = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now())
-    deleted_at = db.Column(db.DateTime, nullable=True)  # Soft deletion timestamp
 
     # ---------------------------
     # Password Management
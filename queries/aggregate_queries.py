@@ -0,0 +1,336 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, func, bindparam, literal_column
+from utils.analytics_cache import cached_analytics
+from utils.count_cache import estimated_count
+from utils.archive import ARCHIVES, combined_source, needs_archive
+from models import db, Order, Production, Product, Customer, Employee
+
+
+class AggregateError(ValueError):
+    """Raised for invalid aggregation requests, including ones with too many groups."""
+
+
+# ---------------------------
+# Whitelist
+# ---------------------------
+# Entity dimensions: fact column, model used for names and cardinality, output key
+ENTITY_DIMENSIONS = {
+    'product': (Product, 'product_id'),
+    'customer': (Customer, 'customer_id'),
+    'employee': (Employee, 'employee_id'),
+}
+
+TIME_DIMENSIONS = ('day', 'month')
+
+AGGREGATE_FUNCTIONS = {
+    'sum': func.sum,
+    'count': func.count,
+    'avg': func.avg,
+    'min': func.min,
+    'max': func.max,
+}
+
+# What each fact table can be grouped by, measured on, and filtered with
+FACTS = {
+    'orders': {
+        "model": Order,
+        "date_column": Order.created_at,  # DateTime: windows are [since, until + 1 day)
+        "dimensions": ('product', 'customer', 'day', 'month'),
+        "measures": ('quantity', 'total_price'),
+        "id_filters": ('product_id', 'customer_id'),
+    },
+    'production': {
+        "model": Production,
+        "date_column": Production.date_produced,  # Date: windows are [since, until]
+        "dimensions": ('product', 'employee', 'day', 'month'),
+        "measures": ('quantity_produced',),
+        "id_filters": ('product_id', 'employee_id'),
+    },
+}
+
+# Compiled-statement cache: shape -> Select (LRU)
+_statements = OrderedDict()
+_statements_lock = threading.Lock()
+_statement_stats = {"hits": 0, "misses": 0}
+
+
+# ---------------------------
+# Request Normalization
+# ---------------------------
+def _parse_measure(spec, fact):
+    """Parses 'func:column' (or bare 'count' for rows) into a (func, column) pair."""
+    name, _, column = spec.partition(':')
+    if name not in AGGREGATE_FUNCTIONS:
+        raise AggregateError(f"Invalid measure '{spec}'. Functions: {list(AGGREGATE_FUNCTIONS)}")
+    if not column:
+        if name != 'count':
+            raise AggregateError(f"Measure '{spec}' needs a column, e.g. '{name}:{FACTS[fact]['measures'][0]}'.")
+        return name, None
+    if column not in FACTS[fact]["measures"]:
+        raise AggregateError(f"Invalid measure column '{column}' for {fact}. Allowed: {list(FACTS[fact]['measures'])}")
+    return name, column
+
+
+def normalize_request(fact, dimensions, measures, filters):
+    """
+    Validates an aggregation request against the whitelist and puts it in canonical form.
+
+    Args:
+        fact (str): 'orders' or 'production'.
+        dimensions (list): Dimension names.
+        measures (list): Measure specs such as 'sum:quantity' or 'count'.
+        filters (dict): Optional since/until dates and lists of ids per id filter.
+
+    Returns:
+        tuple: (dimensions, measures, filters) as hashable, order-stable values.
+
+    Raises:
+        AggregateError: If anything is outside the whitelist.
+    """
+    if fact not in FACTS:
+        raise AggregateError(f"Invalid fact. Allowed: {list(FACTS)}")
+    spec = FACTS[fact]
+
+    dimensions = tuple(dict.fromkeys(dimensions))
+    invalid = [name for name in dimensions if name not in spec["dimensions"]]
+    if invalid:
+        raise AggregateError(f"Invalid dimensions for {fact}: {invalid}. Allowed: {list(spec['dimensions'])}")
+    if 'day' in dimensions and 'month' in dimensions:
+        raise AggregateError("Group by either day or month, not both.")
+
+    measures = tuple(dict.fromkeys(_parse_measure(measure, fact) for measure in measures or ('count',)))
+
+    normalized = []
+    for name, value in sorted((filters or {}).items()):
+        if name in ('since', 'until'):
+            normalized.append((name, value))
+        elif name in spec["id_filters"]:
+            normalized.append((name, tuple(sorted(set(value)))))
+        else:
+            raise AggregateError(f"Invalid filter '{name}' for {fact}. Allowed: {['since', 'until'] + list(spec['id_filters'])}")
+    window = dict(normalized)
+    if window.get('since') and window.get('until') and window['since'] > window['until']:
+        raise AggregateError("since must not be after until.")
+    return dimensions, measures, tuple(normalized)
+
+
+# ---------------------------
+# Statement Building (cached by shape)
+# ---------------------------
+def _month_expression(column, dialect):
+    """'YYYY-MM' of a date/datetime column in the current dialect."""
+    if dialect == 'sqlite':
+        return func.strftime(literal_column("'%Y-%m'"), column)
+    if dialect in ('mysql', 'mariadb'):
+        return func.date_format(column, literal_column("'%Y-%m'"))
+    return func.to_char(column, literal_column("'YYYY-MM'"))  # PostgreSQL, Oracle
+
+
+def _dimension_expression(fact, source, name, dialect):
+    """Column expression grouped on for one dimension."""
+    if name in ENTITY_DIMENSIONS:
+        return getattr(source, ENTITY_DIMENSIONS[name][1])
+    column = getattr(source, FACTS[fact]["date_column"].key)
+    if name == 'day':
+        return func.date(column) if fact == 'orders' else column
+    return _month_expression(column, dialect)
+
+
+def _build_statement(fact, dimensions, measures, filter_names, dialect, archived=False):
+    """
+    Builds one GROUP BY statement for a request shape; filter values are bind parameters.
+
+    Literals that must match between SELECT and GROUP BY (date formats) are
+    rendered inline, so every filter value stays a parameter and the same
+    statement serves every request with this shape. With `archived`, the
+    statement reads the fact's hot and archived rows together.
+    """
+    spec = FACTS[fact]
+    model = combined_source(spec["model"]) if archived else spec["model"]
+    date_column = getattr(model, spec["date_column"].key)
+    keys = [_dimension_expression(fact, model, name, dialect).label(name) for name in dimensions]
+    values = [
+        (AGGREGATE_FUNCTIONS[name](getattr(model, column)) if column else func.count()).label(
+            f"{name}_{column}" if column else name
+        )
+        for name, column in measures
+    ]
+
+    stmt = select(*keys, *values).select_from(model)
+    for name in filter_names:
+        if name == 'since':
+            stmt = stmt.where(date_column >= bindparam('since'))
+        elif name == 'until':
+            stmt = stmt.where(date_column < bindparam('until'))  # Exclusive upper bound
+        else:
+            stmt = stmt.where(getattr(model, name).in_(bindparam(name, expanding=True)))
+    if 'employee' in dimensions:
+        stmt = stmt.where(model.employee_id.isnot(None))  # Unattributed records have no group
+    if keys:
+        stmt = stmt.group_by(*keys).order_by(*keys)
+    return stmt.limit(bindparam('group_limit'))
+
+
+def _statement(fact, dimensions, measures, filter_names, archived=False):
+    """Returns the statement for a shape, building it once per shape (LRU, ANALYTICS_AGGREGATE_STATEMENT_CACHE)."""
+    dialect = db.session.get_bind().dialect.name
+    shape = (fact, dimensions, measures, filter_names, dialect, archived)
+    with _statements_lock:
+        stmt = _statements.get(shape)
+        if stmt is not None:
+            _statements.move_to_end(shape)
+            _statement_stats["hits"] += 1
+            return stmt
+        _statement_stats["misses"] += 1
+
+    stmt = _build_statement(fact, dimensions, measures, filter_names, dialect, archived)
+    with _statements_lock:
+        _statements[shape] = stmt
+        while len(_statements) > current_app.config.get('ANALYTICS_AGGREGATE_STATEMENT_CACHE', 128):
+            _statements.popitem(last=False)
+    return stmt
+
+
+def statement_cache_info():
+    """Returns the compiled-statement cache size and hit/miss counters."""
+    with _statements_lock:
+        return dict(_statement_stats, size=len(_statements))
+
+
+# ---------------------------
+# Cardinality Guard
+# ---------------------------
+def estimate_groups(fact, dimensions, filters):
+    """
+    Upper-bounds the number of groups a request can produce, without running it.
+
+    Each entity dimension contributes its id filter size or its table's
+    (estimated) row count; a time dimension contributes the days or months in
+    the window when both ends are given. The product is capped by the fact
+    table's row count (plus the archive's when the window reaches archived rows).
+    """
+    filters = dict(filters)
+    estimate = 1
+    for name in dimensions:
+        if name in ENTITY_DIMENSIONS:
+            model, field = ENTITY_DIMENSIONS[name]
+            if field in filters:
+                estimate *= len(filters[field])
+            else:
+                estimate *= estimated_count(model.query, model.__tablename__)[0]
+        elif filters.get('since') and filters.get('until'):
+            since, until = filters['since'], filters['until']
+            if name == 'day':
+                estimate *= (until - since).days + 1
+            else:
+                estimate *= (until.year - since.year) * 12 + until.month - since.month + 1
+    model = FACTS[fact]["model"]
+    rows = estimated_count(model.query, model.__tablename__)[0]
+    if needs_archive(model, filters.get('since')):
+        archive = ARCHIVES[model][0]
+        rows += estimated_count(archive.query, archive.__tablename__)[0]
+    return min(estimate, rows)
+
+
+# ---------------------------
+# Execution
+# ---------------------------
+def _format_key(value):
+    """Dates (or dialect strings for them) as ISO strings."""
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def _aggregate(fact, dimensions, measures, filters):
+    """Runs a normalized request and shapes its rows; see `aggregate`."""
+    max_groups = current_app.config.get('ANALYTICS_AGGREGATE_MAX_GROUPS', 10000)
+    params = {"group_limit": max_groups + 1}  # One extra row detects overflow
+    for name, value in filters:
+        if name == 'since':
+            params['since'] = datetime.combine(value, datetime.min.time()) if fact == 'orders' else value
+        elif name == 'until':
+            until = value + timedelta(days=1)
+            params['until'] = datetime.combine(until, datetime.min.time()) if fact == 'orders' else until
+        else:
+            params[name] = list(value)
+
+    archived = needs_archive(FACTS[fact]["model"], dict(filters).get('since'))  # Union the archive only when needed
+    stmt = _statement(fact, dimensions, measures, tuple(name for name, _ in filters), archived)
+    result = db.session.execute(stmt, params).mappings().all()
+    if len(result) > max_groups:
+        raise AggregateError(f"Aggregation produces more than {max_groups} groups; add filters or coarser dimensions.")
+
+    # Names for entity dimensions, one IN query per entity
+    names = {}
+    for name in dimensions:
+        if name in ENTITY_DIMENSIONS:
+            model, field = ENTITY_DIMENSIONS[name]
+            ids = list({row[name] for row in result})
+            names[name] = dict(db.session.query(model.id, model.name).filter(model.id.in_(ids)).all()) if ids else {}
+
+    rows = []
+    for row in result:
+        item = {}
+        for name in dimensions:
+            if name in ENTITY_DIMENSIONS:
+                item[ENTITY_DIMENSIONS[name][1]] = row[name]
+                item[name] = names[name].get(row[name])
+            else:
+                item[name] = _format_key(row[name])
+        for name, column in measures:
+            label = f"{name}_{column}" if column else name
+            value = row[label]
+            item[label] = float(value) if name == 'avg' and value is not None else value
+        rows.append(item)
+    return rows
+
+
+@cached_analytics('orders', 'orders_archive', 'products', 'customers')
+def aggregate_orders(dimensions, measures, filters):
+    return _aggregate('orders', dimensions, measures, filters)
+
+
+@cached_analytics('production', 'production_archive', 'products', 'employees')
+def aggregate_production(dimensions, measures, filters):
+    return _aggregate('production', dimensions, measures, filters)
+
+
+def aggregate(fact, dimensions, measures=None, filters=None):
+    """
+    Answers an ad-hoc GROUP BY question over orders or production.
+
+    The request is validated against the whitelist and normalized (so
+    equivalent requests share a cache entry), checked against
+    ANALYTICS_AGGREGATE_MAX_GROUPS before running, then compiled to a single
+    parameterized statement that is reused for every request of the same shape.
+    Results go through the analytics cache.
+
+    Args:
+        fact (str): 'orders' or 'production'.
+        dimensions (list): Any of 'product', 'customer' (orders), 'employee'
+            (production), and one of 'day' or 'month'.
+        measures (list): 'func:column' specs with func in sum/count/avg/min/max
+            and column in quantity/total_price (orders) or quantity_produced
+            (production); bare 'count' counts rows (default).
+        filters (dict): Optional 'since'/'until' dates (inclusive) and lists of
+            ids for 'product_id', 'customer_id' (orders) or 'employee_id' (production).
+
+    Returns:
+        list: One dict per group with the dimension keys (entities carry id and
+            name) and one key per measure (e.g. 'sum_quantity', 'count').
+
+    Raises:
+        AggregateError: Invalid request, or too many groups.
+    """
+    dimensions, measures, filters = normalize_request(fact, dimensions, measures, filters)
+    max_groups = current_app.config.get('ANALYTICS_AGGREGATE_MAX_GROUPS', 10000)
+    estimate = estimate_groups(fact, dimensions, filters)
+    if estimate > max_groups:
+        raise AggregateError(
+            f"Aggregation could produce up to {estimate} groups (limit {max_groups}); "
+            f"add filters, a date window or coarser dimensions."
+        )
+    runner = aggregate_orders if fact == 'orders' else aggregate_production
+    return runner(dimensions, measures, filters)
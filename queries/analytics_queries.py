@@ -1,49 +1,210 @@
-from sqlalchemy import func, desc
-from models import db, Employee, Order, Product, Customer, Production
+from sqlalchemy import func
+from collections import Counter
+from datetime import timedelta
+from utils.analytics_cache import cached_analytics
+from utils.archive import archive_source
+from models import (
+    db, Employee, Product, Customer, Production,
+    ProductionDailyRollup, CustomerStats, ProductSalesDailyRollup
+)
 
 
 # Task 1: Analyze Employee Performance
-def analyze_employee_performance():
-    result = db.session.query(
-        Employee.name,
-        func.sum(Production.quantity_produced).label('total_quantity')
-    ).join(Production, Employee.id == Production.product_id) \
-        .group_by(Employee.name) \
-        .all()
-    return [{"employee": row[0], "total_quantity": row[1]} for row in result]
+# Groups production by employee_id over the (employee_id, date_produced) index, then ranks
+# and looks up names only for the aggregated rows; archived production is read only when
+# the window reaches it
+@cached_analytics('employees', 'production', 'production_archive')
+def analyze_employee_performance(limit=None, since=None, until=None, max_rows=None):
+    source = archive_source(Production, since)
+    window = db.session.query(
+        source.employee_id.label('employee_id'),
+        func.sum(source.quantity_produced).label('total_quantity'),
+        func.count(source.id).label('record_count')
+    ).filter(source.employee_id.isnot(None))
+    if since:
+        window = window.filter(source.date_produced >= since)
+    if until:
+        window = window.filter(source.date_produced <= until)
+    per_employee = window.group_by(source.employee_id).subquery()
+
+    # Rank with ties (1, 2, 2, 4) and carry window-wide totals on every row
+    ranked = db.session.query(
+        per_employee.c.employee_id,
+        per_employee.c.total_quantity,
+        per_employee.c.record_count,
+        func.rank().over(order_by=per_employee.c.total_quantity.desc()).label('rank'),
+        func.sum(per_employee.c.total_quantity).over().label('window_quantity'),
+        func.count().over().label('window_employees')
+    ).subquery()
+
+    query = db.session.query(ranked, Employee.name).join(Employee, Employee.id == ranked.c.employee_id)
+    if limit:
+        query = query.filter(ranked.c.rank <= limit)  # Keeps every employee tied at the cut-off
+    query = query.order_by(ranked.c.rank, ranked.c.employee_id)
+    if max_rows:
+        query = query.limit(max_rows)  # Row budget: stop reading ranked rows early
+    result = query.all()
+
+    ranks = Counter(row.rank for row in result)
+    data = [{
+        "rank": row.rank,
+        "tied": ranks[row.rank] > 1,
+        "employee_id": row.employee_id,
+        "employee": row.name,
+        "total_quantity": row.total_quantity,
+        "record_count": row.record_count
+    } for row in result]
+    first = result[0] if result else None
+    totals = {
+        "total_quantity": first.window_quantity if first else 0,
+        "employees": first.window_employees if first else 0
+    }
+    return data, totals
 
 
 # Task 2: Identify Top-Selling Products
-def top_selling_products():
-    result = db.session.query(
-        Product.name,
-        func.sum(Order.quantity).label('total_sold')
-    ).join(Order, Product.id == Order.product_id) \
-        .group_by(Product.name) \
-        .order_by(desc('total_sold')) \
-        .all()
-    return [{"product": row[0], "total_sold": row[1]} for row in result]
+# Ranks per-product totals from the daily sales rollup, reading only the days in the window;
+# soft-deleted products are dropped before ranking, so ranks and totals cover listed products only
+@cached_analytics('orders', 'products', 'product_sales_daily_rollup')
+def top_selling_products(limit=None, since=None, until=None, max_rows=None):
+    window = db.session.query(
+        ProductSalesDailyRollup.product_id.label('product_id'),
+        func.sum(ProductSalesDailyRollup.quantity_sold).label('total_sold'),
+        func.sum(ProductSalesDailyRollup.revenue).label('revenue')
+    ).join(Product, Product.id == ProductSalesDailyRollup.product_id) \
+        .filter(Product.deleted_at.is_(None))
+    if since:
+        window = window.filter(ProductSalesDailyRollup.day >= since)
+    if until:
+        window = window.filter(ProductSalesDailyRollup.day <= until)
+    per_product = window.group_by(ProductSalesDailyRollup.product_id) \
+        .having(func.sum(ProductSalesDailyRollup.order_count) > 0) \
+        .subquery()
+
+    # Rank with ties (1, 2, 2, 4) and carry window-wide totals on every row
+    ranked = db.session.query(
+        per_product.c.product_id,
+        per_product.c.total_sold,
+        per_product.c.revenue,
+        func.rank().over(order_by=per_product.c.total_sold.desc()).label('rank'),
+        func.sum(per_product.c.total_sold).over().label('window_sold'),
+        func.sum(per_product.c.revenue).over().label('window_revenue'),
+        func.count().over().label('window_products')
+    ).subquery()
+
+    query = db.session.query(ranked, Product.name).join(Product, Product.id == ranked.c.product_id)
+    if limit:
+        query = query.filter(ranked.c.rank <= limit)  # Keeps every product tied at the cut-off
+    query = query.order_by(ranked.c.rank, Product.name)
+    if max_rows:
+        query = query.limit(max_rows)  # Row budget: stop reading ranked rows early
+    result = query.all()
+
+    ranks = Counter(row.rank for row in result)
+    data = [{
+        "rank": row.rank,
+        "tied": ranks[row.rank] > 1,
+        "product_id": row.product_id,
+        "product": row.name,
+        "total_sold": row.total_sold,
+        "revenue": row.revenue
+    } for row in result]
+    first = result[0] if result else None
+    totals = {
+        "total_sold": first.window_sold if first else 0,
+        "revenue": first.window_revenue if first else 0.0,
+        "products": first.window_products if first else 0
+    }
+    return data, totals
 
 
 # Task 3: Determine Customer Lifetime Value
-def customer_lifetime_value(threshold=1000):
-    result = db.session.query(
+# Range scan on the customer_stats lifetime_value index instead of re-summing orders
+@cached_analytics('orders', 'customers', 'customer_stats')
+def customer_lifetime_value(threshold=1000, max_rows=None):
+    query = db.session.query(
         Customer.name,
-        func.sum(Order.total_price).label('lifetime_value')
-    ).join(Order, Customer.id == Order.customer_id) \
-        .group_by(Customer.name) \
-        .having(func.sum(Order.total_price) >= threshold) \
-        .all()
+        CustomerStats.lifetime_value
+    ).join(CustomerStats, Customer.id == CustomerStats.customer_id) \
+        .filter(CustomerStats.lifetime_value >= threshold) \
+        .filter(CustomerStats.order_count > 0) \
+        .order_by(CustomerStats.lifetime_value.desc())
+    if max_rows:
+        query = query.limit(max_rows)  # Stops the index scan early for low thresholds
+    result = query.all()
     return [{"customer": row[0], "lifetime_value": row[1]} for row in result]
 
 
 # Task 4: Evaluate Production Efficiency
+# Reads the daily rollup (one row per product for the day) instead of raw production rows
+@cached_analytics('production', 'products', 'production_daily_rollup')
 def evaluate_production_efficiency(production_date):
     result = db.session.query(
         Product.name,
-        func.sum(Production.quantity_produced).label('total_produced')
-    ).join(Production, Product.id == Production.product_id) \
-        .filter(Production.date_produced == production_date) \
+        func.sum(ProductionDailyRollup.quantity_produced).label('total_produced')
+    ).join(ProductionDailyRollup, Product.id == ProductionDailyRollup.product_id) \
+        .filter(ProductionDailyRollup.day == production_date) \
+        .filter(ProductionDailyRollup.record_count > 0) \
         .group_by(Product.name) \
         .all()
     return [{"product": row[0], "total_produced": row[1]} for row in result]
+
+
+# Task 5: Production Time Series
+# Bucket start for each supported granularity (weeks start on Monday)
+SERIES_BUCKETS = {
+    'day': lambda day: day,
+    'week': lambda day: day - timedelta(days=day.weekday()),
+    'month': lambda day: day.replace(day=1)
+}
+
+
+def series_bucket_starts(date_from, date_to, bucket):
+    """Lists every bucket start covering date_from..date_to, inclusive."""
+    start = SERIES_BUCKETS[bucket](date_from)
+    starts = []
+    while start <= date_to:
+        starts.append(start)
+        if bucket == 'day':
+            start += timedelta(days=1)
+        elif bucket == 'week':
+            start += timedelta(days=7)
+        else:
+            start = (start + timedelta(days=32)).replace(day=1)
+    return starts
+
+
+# One primary-key range read of the daily rollup, bucketed and zero-filled in Python
+@cached_analytics('production', 'products', 'production_daily_rollup')
+def production_series(date_from, date_to, bucket='day', product_id=None):
+    query = db.session.query(
+        ProductionDailyRollup.day,
+        ProductionDailyRollup.product_id,
+        ProductionDailyRollup.quantity_produced
+    ).filter(ProductionDailyRollup.day >= date_from) \
+        .filter(ProductionDailyRollup.day <= date_to) \
+        .filter(ProductionDailyRollup.record_count > 0)
+    if product_id is not None:
+        query = query.filter(ProductionDailyRollup.product_id == product_id)
+
+    starts = series_bucket_starts(date_from, date_to, bucket)
+    position = {start: index for index, start in enumerate(starts)}
+    to_bucket = SERIES_BUCKETS[bucket]
+
+    values = {}
+    if product_id is not None:
+        values[product_id] = [0] * len(starts)  # Requested product is always present
+    for day, row_product_id, quantity in query.all():
+        series = values.setdefault(row_product_id, [0] * len(starts))
+        series[position[to_bucket(day)]] += quantity
+
+    names = dict(db.session.query(Product.id, Product.name).filter(Product.id.in_(list(values))).all()) if values else {}
+    product_ids = sorted(values)
+    return {
+        "bucket": bucket,
+        "buckets": [start.isoformat() for start in starts],
+        "product_ids": product_ids,
+        "products": [names.get(id_) for id_ in product_ids],
+        "values": [values[id_] for id_ in product_ids],
+        "totals": [sum(column) for column in zip(*(values[id_] for id_ in product_ids))] or [0] * len(starts)
+    }
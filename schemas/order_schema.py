@@ -1,5 +1,22 @@
 from marshmallow import Schema, fields, validate, post_dump
 
+# Relationships that can be requested with ?expand=
+EXPANDABLE_FIELDS = ('customer', 'product')
+
+
+class OrderCustomerSchema(Schema):
+    """Customer summary embedded in expanded orders."""
+    id = fields.Int()
+    name = fields.Str()
+    email = fields.Str()
+
+
+class OrderProductSchema(Schema):
+    """Product summary embedded in expanded orders."""
+    id = fields.Int()
+    name = fields.Str()
+    price = fields.Float()
+
 
 class OrderSchema(Schema):
     # ---------------------------
@@ -31,6 +48,10 @@ class OrderSchema(Schema):
     updated_at = fields.DateTime(dump_only=True)  # Tracks updates
     deleted_at = fields.DateTime(dump_only=True)  # For soft delete handling
 
+    # Expandable relationships (only dumped when requested via ?expand=)
+    customer = fields.Nested(OrderCustomerSchema, dump_only=True)
+    product = fields.Nested(OrderProductSchema, dump_only=True)
+
     # ---------------------------
     # Meta Configuration
     # ---------------------------
@@ -49,5 +70,14 @@ class OrderSchema(Schema):
 # ---------------------------
 # Example Usage
 # ---------------------------
-order_schema = OrderSchema()
-orders_schema = OrderSchema(many=True)
+# Default schemas never dump relationships, so they never trigger lazy loads
+order_schema = OrderSchema(exclude=EXPANDABLE_FIELDS)
+orders_schema = OrderSchema(many=True, exclude=EXPANDABLE_FIELDS)
+
+
+def expanded_order_schema(expand, many=False):
+    """Returns an order schema that dumps only the requested relationships."""
+    if not expand:
+        return orders_schema if many else order_schema
+    excluded = tuple(field for field in EXPANDABLE_FIELDS if field not in expand)
+    return OrderSchema(many=many, exclude=excluded)
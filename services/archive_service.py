@@ -0,0 +1,128 @@
+import logging
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, select, func
+from models import db, Order, Production
+from utils.archive import ARCHIVES
+from utils.table_versions import mark_tables_changed
+
+
+class ArchiveService:
+    # ---------------------------
+    # Archive Orders
+    # ---------------------------
+    @staticmethod
+    def archive_orders(retention_days=None, batch_size=None, pause_seconds=None, max_batches=None):
+        """
+        Moves orders created before the retention window into orders_archive.
+
+        Read models (customer_stats, sales rollup) are left as they are: they
+        keep covering archived history.
+
+        Args:
+            retention_days (int): Age in days after which orders move (default: ARCHIVE_RETENTION_DAYS).
+            batch_size (int): Orders moved per transaction (default: ARCHIVE_BATCH_SIZE).
+            pause_seconds (float): Minimum pause between batches (default: ARCHIVE_PAUSE_SECONDS).
+            max_batches (int): Stop after this many batches (default: run until done).
+
+        Returns:
+            dict: {"table", "cutoff", "moved", "batches", "done"}.
+
+        Raises:
+            ValueError: If a batch fails (earlier batches stay committed).
+        """
+        retention_days = retention_days or current_app.config['ARCHIVE_RETENTION_DAYS']
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        return ArchiveService._archive(Order, cutoff, batch_size, pause_seconds, max_batches)
+
+    # ---------------------------
+    # Archive Production
+    # ---------------------------
+    @staticmethod
+    def archive_productions(retention_days=None, batch_size=None, pause_seconds=None, max_batches=None):
+        """
+        Moves production records dated before the retention window into production_archive.
+
+        The production daily rollup is left as it is: it keeps covering archived history.
+
+        Args:
+            retention_days (int): Age in days after which records move (default: ARCHIVE_RETENTION_DAYS).
+            batch_size (int): Records moved per transaction (default: ARCHIVE_BATCH_SIZE).
+            pause_seconds (float): Minimum pause between batches (default: ARCHIVE_PAUSE_SECONDS).
+            max_batches (int): Stop after this many batches (default: run until done).
+
+        Returns:
+            dict: {"table", "cutoff", "moved", "batches", "done"}.
+
+        Raises:
+            ValueError: If a batch fails (earlier batches stay committed).
+        """
+        retention_days = retention_days or current_app.config['ARCHIVE_RETENTION_DAYS']
+        cutoff = datetime.utcnow().date() - timedelta(days=retention_days)
+        return ArchiveService._archive(Production, cutoff, batch_size, pause_seconds, max_batches)
+
+    # ---------------------------
+    # Batched Move
+    # ---------------------------
+    @staticmethod
+    def _archive(model, cutoff, batch_size=None, pause_seconds=None, max_batches=None):
+        """
+        Moves rows older than `cutoff` from a hot table to its archive in small transactions.
+
+        Walks the primary key once: each batch picks the next `batch_size` old
+        ids after the last one moved, copies them with INSERT ... SELECT,
+        deletes them and commits, so locks cover one small id range at a time.
+        Soft-deleted rows move too and stay soft-deleted in the archive.
+        The row holding the current highest id never moves, so databases that
+        derive the next id from MAX(id) cannot hand an archived id out again.
+
+        Between batches the job sleeps for at least as long as the batch took
+        (and never less than `pause_seconds`), so it uses at most half of the
+        database's time and backs off on its own when the database is busy.
+        """
+        config = current_app.config
+        batch_size = batch_size or config['ARCHIVE_BATCH_SIZE']
+        pause_seconds = config['ARCHIVE_PAUSE_SECONDS'] if pause_seconds is None else pause_seconds
+        archive, date_field = ARCHIVES[model]
+        table, archive_table = model.__table__, archive.__table__
+        names = [column.key for column in table.columns]
+        date_column = table.c[date_field]
+        newest_id = db.session.scalar(select(func.max(table.c.id))) or 0
+
+        moved = batches = last_id = 0
+        done = False
+        while max_batches is None or batches < max_batches:
+            started = time.monotonic()
+            try:
+                ids = db.session.scalars(
+                    select(table.c.id)
+                    .where(table.c.id > last_id, table.c.id < newest_id, date_column < cutoff)
+                    .order_by(table.c.id)
+                    .limit(batch_size)
+                ).all()
+                if not ids:
+                    done = True
+                    break
+                last_id = ids[-1]
+
+                db.session.execute(insert(archive_table).from_select(
+                    names + ['archived_at'],
+                    select(*(table.c[name] for name in names), func.current_timestamp()).where(table.c.id.in_(ids))
+                ))
+                db.session.execute(delete(table).where(table.c.id.in_(ids)))
+                mark_tables_changed(db.session, table.name, archive_table.name)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                raise ValueError(f"Error archiving {table.name}: {str(e)}")
+
+            moved += len(ids)
+            batches += 1
+            logging.info(f"Archived {len(ids)} {table.name} rows (through id {last_id}).")
+            if len(ids) < batch_size:
+                done = True
+                break
+            time.sleep(max(pause_seconds, time.monotonic() - started))
+
+        return {"table": table.name, "cutoff": cutoff.isoformat(), "moved": moved, "batches": batches, "done": done}
@@ -1,10 +1,19 @@
-from models import db, Customer
+from sqlalchemy import func, select, update
+from models import db, Customer, Order, CustomerStats, with_deleted
+from utils.archive import archive_source
+from utils.table_versions import mark_tables_changed
+from utils.upsert import upsert_increments
+from utils.pagination import paginate, PaginationError
+from utils.rebuild import rebuild_in_batches
 
 
 class CustomerService:
     # Allowed sortable fields
     SORTABLE_FIELDS = ['name', 'email', 'phone']
 
+    # Computed extras that can be requested with ?expand=
+    EXPANDABLE_FIELDS = ('order_summary',)
+
     # ---------------------------
     # Create Customer
     # ---------------------------
@@ -30,7 +39,7 @@ class CustomerService:
                 raise ValueError("All fields (name, email, phone) are required.")
 
             # Check for duplicates
-            existing_customer = Customer.query.filter(
+            existing_customer = with_deleted(Customer.query).filter(
                 (Customer.email == email) | (Customer.phone == phone)
             ).first()
             if existing_customer:
@@ -53,7 +62,8 @@ class CustomerService:
     # Paginated Customers
     # ---------------------------
     @staticmethod
-    def get_paginated_customers(page=1, per_page=10, sort_by='name', sort_order='asc', include_meta=True):
+    def get_paginated_customers(page=1, per_page=10, sort_by='name', sort_order='asc', include_meta=True,
+                                mode=None, cursor=None, after_id=None, meta='exact', include_deleted=False, expand=()):
         """
         Retrieves a paginated list of customers with sorting options.
 
@@ -63,46 +73,157 @@ class CustomerService:
             sort_by (str): Field to sort by ('name', 'email', 'phone').
             sort_order (str): Sort order ('asc' or 'desc').
             include_meta (bool): Whether to include metadata in the response.
+            mode (str): 'offset', 'cursor' or 'after_id' (default: 'offset').
+            cursor (str): Opaque cursor from the previous page (cursor mode).
+            after_id (int): Last customer id seen (after_id mode).
+            meta (str): 'exact' (cached count) or 'approximate' (table statistics) totals.
+            include_deleted (bool): Also list soft-deleted rows (default: False).
+            expand (tuple): Computed extras to include ('order_summary').
 
         Returns:
-            dict: Paginated customer data with metadata.
+            dict: Paginated customer data with metadata, plus `order_summaries`
+            keyed by customer id when requested.
 
         Raises:
             ValueError: If any validation or database query fails.
         """
         try:
-            # Validate inputs
-            page = max(1, int(page))  # Ensure page >= 1
-            per_page = min(max(1, int(per_page)), 100)  # Limit 1 <= per_page <= 100
-
-            # Validate sorting fields
-            if sort_by not in CustomerService.SORTABLE_FIELDS:
-                raise ValueError(f"Invalid sort_by field. Allowed fields: {CustomerService.SORTABLE_FIELDS}")
-
-            # Determine sort order
-            sort_column = getattr(Customer, sort_by, Customer.name)  # Default to 'name'
-            if sort_order.lower() == 'desc':
-                sort_column = sort_column.desc()
-
-            # Query customers with pagination and sorting
-            pagination = Customer.query.order_by(sort_column).paginate(
-                page=page, per_page=per_page, error_out=False
+            data = paginate(
+                Customer.query, Customer, CustomerService.SORTABLE_FIELDS,
+                sort_by=sort_by, sort_order=sort_order, page=page, per_page=per_page,
+                include_meta=include_meta, mode=mode, cursor=cursor, after_id=after_id, meta=meta,
+                include_deleted=include_deleted
             )
-
-            # Prepare response
-            response = {"items": pagination.items}
-            if include_meta:
-                response.update({
-                    "total": pagination.total,
-                    "pages": pagination.pages,
-                    "page": pagination.page,
-                    "per_page": pagination.per_page
-                })
-
-            return response
+            if 'order_summary' in expand:
+                data["order_summaries"] = CustomerService.get_order_summaries(
+                    [customer.id for customer in data["items"]]
+                )
+            return data
+        except PaginationError:
+            raise
         except Exception as e:
             raise ValueError(f"Error retrieving paginated customers: {str(e)}")
 
+    # ---------------------------
+    # Order Summaries
+    # ---------------------------
+    @staticmethod
+    def get_order_summaries(customer_ids):
+        """
+        Reads order count and lifetime value for a set of customers.
+
+        Served from the customer_stats read model with one primary-key IN query
+        for the whole page; customers without orders get zeroes.
+
+        Args:
+            customer_ids (list): Customer IDs.
+
+        Returns:
+            dict: {customer_id: {"order_count": int, "lifetime_value": float}}.
+        """
+        summaries = {customer_id: {"order_count": 0, "lifetime_value": 0.0} for customer_id in customer_ids}
+        if not customer_ids:
+            return summaries
+
+        rows = db.session.query(
+            CustomerStats.customer_id,
+            CustomerStats.order_count,
+            CustomerStats.lifetime_value
+        ).filter(CustomerStats.customer_id.in_(customer_ids)).all()
+        for customer_id, order_count, lifetime_value in rows:
+            summaries[customer_id] = {"order_count": order_count, "lifetime_value": float(lifetime_value)}
+        return summaries
+
+    # ---------------------------
+    # Customer Stats Read Model
+    # ---------------------------
+    @staticmethod
+    def apply_order_stats(changes):
+        """
+        Applies order writes to customer_stats in the current transaction.
+
+        Counts and values are added; first/last order times only ever widen, so
+        callers removing orders follow up with `refresh_order_bounds`.
+
+        Args:
+            changes (list): Dicts with customer_id, order_count and lifetime_value
+                deltas, plus first_order_at/last_order_at (or None).
+        """
+        upsert_increments(
+            db.session, CustomerStats.__table__, ['customer_id'], changes,
+            minimums=('first_order_at',), maximums=('last_order_at',)
+        )
+
+    @staticmethod
+    def refresh_order_bounds(customer_ids):
+        """
+        Recomputes first/last order times for customers after orders were removed.
+
+        Soft-deleted orders do not count, as in `rebuild_customer_stats`.
+
+        One UPDATE with correlated MIN/MAX subqueries, each answered from the
+        (customer_id, created_at) index on orders (and on orders_archive once
+        orders have been archived).
+
+        Args:
+            customer_ids (list): Customer IDs whose orders were removed.
+        """
+        if not customer_ids:
+            return
+
+        source = archive_source(Order)
+
+        def bound(aggregate):
+            return select(aggregate(source.created_at)) \
+                .where(source.customer_id == CustomerStats.customer_id, source.deleted_at.is_(None)) \
+                .scalar_subquery()
+
+        db.session.execute(
+            update(CustomerStats)
+            .where(CustomerStats.customer_id.in_(customer_ids))
+            .values(first_order_at=bound(func.min), last_order_at=bound(func.max))
+            .execution_options(synchronize_session=False)
+        )
+        mark_tables_changed(db.session, CustomerStats.__tablename__)
+
+    @staticmethod
+    def rebuild_customer_stats(batch_size=1000):
+        """
+        Rebuilds customer_stats from orders (archived ones included) to repair drift.
+
+        Customers are rebuilt in committed batches (see `rebuild_in_batches`),
+        each with one INSERT ... SELECT ... GROUP BY.
+
+        Args:
+            batch_size (int): Customers rebuilt per transaction.
+
+        Returns:
+            dict: {"customers": customers processed, "rows": stats rows written}.
+
+        Raises:
+            ValueError: If a batch fails (earlier batches stay committed).
+        """
+        source = archive_source(Order)  # Archived orders stay in the stats
+
+        def stats_for(customer_ids):
+            return (
+                select(
+                    source.customer_id.label('customer_id'),
+                    func.count(source.id).label('order_count'),
+                    func.sum(source.total_price).label('lifetime_value'),
+                    func.min(source.created_at).label('first_order_at'),
+                    func.max(source.created_at).label('last_order_at')
+                )
+                .where(source.customer_id.in_(customer_ids), source.deleted_at.is_(None))
+                .group_by(source.customer_id)
+            )
+
+        try:
+            customers, rows = rebuild_in_batches(Customer, CustomerStats.__table__, stats_for, batch_size)
+        except Exception as e:
+            raise ValueError(f"Error rebuilding customer stats: {str(e)}")
+        return {"customers": customers, "rows": rows}
+
     # ---------------------------
     # Get Customer by ID
     # ---------------------------
@@ -157,10 +278,11 @@ class CustomerService:
             if not any([name, email, phone]):
                 raise ValueError("At least one field (name, email, phone) must be provided for update.")
 
-            # Validate duplicates if email or phone is updated
-            if email and Customer.query.filter(Customer.email == email, Customer.id != customer_id).first():
+            # Validate duplicates if email or phone is updated (soft-deleted rows keep their unique values)
+            others = with_deleted(Customer.query).filter(Customer.id != customer_id)
+            if email and others.filter(Customer.email == email).first():
                 raise ValueError("Another customer with this email already exists.")
-            if phone and Customer.query.filter(Customer.phone == phone, Customer.id != customer_id).first():
+            if phone and others.filter(Customer.phone == phone).first():
                 raise ValueError("Another customer with this phone number already exists.")
 
             # Update fields
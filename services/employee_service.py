@@ -1,9 +1,12 @@
-from models import db, Employee
-from sqlalchemy import func
+from models import db, Employee, with_deleted
 import logging
+from utils.pagination import paginate, PaginationError
 
 
 class EmployeeService:
+    # Allowed sortable fields
+    SORTABLE_FIELDS = ['name', 'position', 'email', 'phone']
+
     # ---------------------------
     # Create an employee
     # ---------------------------
@@ -15,7 +18,7 @@ class EmployeeService:
                 raise ValueError("All fields are required.")
 
             # Check for duplicate email or phone
-            existing_employee = Employee.query.filter(
+            existing_employee = with_deleted(Employee.query).filter(
                 (Employee.email == email) | (Employee.phone == phone)
             ).first()
             if existing_employee:
@@ -40,36 +43,17 @@ class EmployeeService:
     # Paginated Employees (ENHANCED)
     # ---------------------------
     @staticmethod
-    def get_paginated_employees(page=1, per_page=10, sort_by='name', sort_order='asc', include_meta=True):
+    def get_paginated_employees(page=1, per_page=10, sort_by='name', sort_order='asc', include_meta=True,
+                                mode=None, cursor=None, after_id=None, meta='exact', include_deleted=False):
         try:
-            # Validate inputs
-            page = max(1, int(page))  # Ensure page >= 1
-            per_page = min(max(1, int(per_page)), 100)  # Limit 1 <= per_page <= 100
-
-            # Sorting options
-            sort_column = getattr(Employee, sort_by, Employee.name)
-            if sort_order.lower() == 'desc':
-                sort_column = sort_column.desc()
-
-            # Query with pagination and sorting
-            pagination = Employee.query.order_by(sort_column).paginate(
-                page=page, per_page=per_page, error_out=False
+            return paginate(
+                Employee.query, Employee, EmployeeService.SORTABLE_FIELDS,
+                sort_by=sort_by, sort_order=sort_order, page=page, per_page=per_page,
+                include_meta=include_meta, mode=mode, cursor=cursor, after_id=after_id, meta=meta,
+                include_deleted=include_deleted
             )
-
-            # Prepare response
-            response = {
-                "items": pagination.items,
-            }
-
-            if include_meta:
-                response.update({
-                    "total": pagination.total,
-                    "pages": pagination.pages,
-                    "page": pagination.page,
-                    "per_page": pagination.per_page
-                })
-
-            return response
+        except PaginationError:
+            raise
         except Exception as e:
             logging.error(f"Error retrieving paginated employees: {str(e)}")
             raise ValueError(f"Error retrieving paginated employees: {str(e)}")
@@ -98,10 +82,11 @@ class EmployeeService:
             if not employee:
                 raise ValueError("Employee not found.")
 
-            # Check for duplicate email or phone during updates
-            if email and Employee.query.filter(Employee.email == email, Employee.id != employee_id).first():
+            # Check for duplicate email or phone during updates (soft-deleted rows keep their unique values)
+            others = with_deleted(Employee.query).filter(Employee.id != employee_id)
+            if email and others.filter(Employee.email == email).first():
                 raise ValueError("Another employee with this email already exists.")
-            if phone and Employee.query.filter(Employee.phone == phone, Employee.id != employee_id).first():
+            if phone and others.filter(Employee.phone == phone).first():
                 raise ValueError("Another employee with this phone number already exists.")
 
             # Update fields if provided
@@ -1,17 +1,96 @@
-from models import db, Order, Product, Customer
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, func
+from sqlalchemy.orm import selectinload
+from models import db, Order, Product, Customer, ProductSalesDailyRollup
+from services.product_service import ProductService
+from services.customer_service import CustomerService
+from utils.pagination import paginate, PaginationError
+from utils.archive import archive_source
+from utils.export import EXPORT_BATCH_SIZE
+from utils.table_versions import mark_tables_changed
+from utils.upsert import upsert_increments
 
 
 class OrderService:
     # Allowed sortable fields
     SORTABLE_FIELDS = ['created_at', 'quantity', 'total_price']
 
+    # Columns written by the streaming export
+    EXPORT_COLUMNS = ['id', 'customer_id', 'product_id', 'quantity', 'total_price', 'created_at', 'updated_at']
+
+    # ---------------------------
+    # Utility: Relationship Loading
+    # ---------------------------
+    @staticmethod
+    def _expand_options(expand):
+        """
+        Builds loader options for the requested relationships.
+
+        Each relationship is fetched with one batched IN query per page
+        (selectin loading) instead of one SELECT per order.
+        """
+        options = []
+        if 'customer' in expand:
+            options.append(selectinload(Order.customer))
+        if 'product' in expand:
+            options.append(selectinload(Order.product))
+        return options
+
+    # ---------------------------
+    # Utility: Read Model Maintenance
+    # ---------------------------
+    @staticmethod
+    def _db_now():
+        """Reads the database clock once, so orders and their read models share a timestamp."""
+        return db.session.scalar(select(func.current_timestamp()))
+
+    @staticmethod
+    def _record_deltas(deltas, inserted=False):
+        """
+        Applies order deltas to customer_stats and the daily product sales rollup
+        in the current transaction.
+
+        Args:
+            deltas (list): (customer_id, product_id, created_at, order count,
+                quantity, total price) tuples; negative values remove.
+            inserted (bool): Whether the deltas are new orders, whose created_at
+                widens the customers' first/last order times.
+        """
+        CustomerService.apply_order_stats([
+            {
+                "customer_id": customer_id,
+                "order_count": count,
+                "lifetime_value": total_price,
+                "first_order_at": created_at if inserted else None,
+                "last_order_at": created_at if inserted else None
+            }
+            for customer_id, _, created_at, count, _, total_price in deltas
+        ])
+        upsert_increments(
+            db.session, ProductSalesDailyRollup.__table__, ['day', 'product_id'],
+            [
+                {
+                    "day": created_at.date(),
+                    "product_id": product_id,
+                    "quantity_sold": quantity,
+                    "revenue": total_price,
+                    "order_count": count
+                }
+                for _, product_id, created_at, count, quantity, total_price in deltas
+                if created_at is not None
+            ]
+        )
+
     # ---------------------------
     # Create Order
     # ---------------------------
     @staticmethod
     def create_order(customer_id, product_id, quantity):
         """
-        Creates a new order with validations.
+        Creates a new order with validations and reserves its stock.
+
+        The stock decrement, the order insert and the customer_stats update
+        commit in the same transaction.
 
         Args:
             customer_id (int): ID of the customer.
@@ -42,14 +121,21 @@ class OrderService:
             # Calculate total price
             total_price = product.price * quantity
 
+            # Reserve stock (conditional decrement, same transaction as the insert)
+            if not ProductService.adjust_stock(product_id, -quantity):
+                raise ValueError("Insufficient stock.")
+
             # Create and save order
+            now = OrderService._db_now()
             new_order = Order(
                 customer_id=customer_id,
                 product_id=product_id,
                 quantity=quantity,
-                total_price=total_price
+                total_price=total_price,
+                created_at=now
             )
             db.session.add(new_order)
+            OrderService._record_deltas([(customer_id, product_id, now, 1, quantity, total_price)], inserted=True)
             db.session.commit()
 
             return new_order
@@ -57,16 +143,112 @@ class OrderService:
             db.session.rollback()
             raise ValueError(f"Error creating order: {str(e)}")
 
+    # ---------------------------
+    # Create Orders in Bulk
+    # ---------------------------
+    @staticmethod
+    def create_orders_bulk(orders):
+        """
+        Creates many orders in one transaction.
+
+        Every referenced customer and product is resolved with one IN query each,
+        prices are computed in Python, and all valid orders are inserted with a
+        single executemany and one commit. Each product's stock is filled in
+        index order, skipping only the orders it can no longer cover, and is then
+        reserved with one conditional UPDATE per product; should that UPDATE find
+        the stock already taken by a concurrent writer, the product's orders fail
+        rather than oversell. Orders referencing unknown customers or products
+        are reported individually and skipped.
+
+        Args:
+            orders (list): (index, data) pairs where data holds customer_id, product_id and quantity.
+
+        Returns:
+            list: Per-item results, each {"index", "status": "created"|"error", ...}.
+
+        Raises:
+            ValueError: If the insert fails (nothing is written).
+        """
+        try:
+            customer_ids = {data['customer_id'] for _, data in orders}
+            product_ids = {data['product_id'] for _, data in orders}
+
+            # Resolve references with one query per table
+            known_customers = set(db.session.scalars(
+                select(Customer.id).where(Customer.id.in_(customer_ids))
+            )) if customer_ids else set()
+            products = {
+                row.id: row for row in db.session.execute(
+                    select(Product.id, Product.price, Product.stock_quantity)
+                    .where(Product.id.in_(product_ids))
+                    .with_for_update()  # Hold the stock rows until the reservation commits
+                )
+            } if product_ids else {}
+
+            results, pending = [], []
+            for index, data in orders:
+                if data['customer_id'] not in known_customers:
+                    results.append({"index": index, "status": "error", "errors": "Customer not found."})
+                elif data['product_id'] not in products:
+                    results.append({"index": index, "status": "error", "errors": "Product not found."})
+                elif data['quantity'] <= 0:
+                    results.append({"index": index, "status": "error", "errors": "Quantity must be greater than zero."})
+                else:
+                    pending.append((index, data))
+
+            # Fill each product's stock in index order, then reserve it with one UPDATE per product
+            demand, filled = {}, []
+            for index, data in pending:
+                product_id = data['product_id']
+                if demand.get(product_id, 0) + data['quantity'] > products[product_id].stock_quantity:
+                    results.append({"index": index, "status": "error", "errors": "Insufficient stock."})
+                    continue
+                demand[product_id] = demand.get(product_id, 0) + data['quantity']
+                filled.append((index, data))
+            reserved = {
+                product_id for product_id, quantity in demand.items()
+                if ProductService.adjust_stock(product_id, -quantity)
+            }
+
+            rows, now = [], OrderService._db_now()
+            for index, data in filled:
+                if data['product_id'] not in reserved:
+                    results.append({"index": index, "status": "error", "errors": "Insufficient stock."})
+                    continue
+                row = {
+                    "customer_id": data['customer_id'],
+                    "product_id": data['product_id'],
+                    "quantity": data['quantity'],
+                    "total_price": products[data['product_id']].price * data['quantity']
+                }
+                rows.append(dict(row, created_at=now))
+                results.append({"index": index, "status": "created", **row})
+
+            if rows:
+                db.session.execute(insert(Order), rows)  # Single executemany
+                mark_tables_changed(db.session, Order.__tablename__)
+                OrderService._record_deltas([
+                    (row['customer_id'], row['product_id'], now, 1, row['quantity'], row['total_price'])
+                    for row in rows
+                ], inserted=True)
+            db.session.commit()
+
+            return results
+        except Exception as e:
+            db.session.rollback()
+            raise ValueError(f"Error creating orders: {str(e)}")
+
     # ---------------------------
     # Get Order by ID
     # ---------------------------
     @staticmethod
-    def get_order_by_id(order_id):
+    def get_order_by_id(order_id, expand=()):
         """
         Fetches an order by ID.
 
         Args:
             order_id (int): ID of the order.
+            expand (tuple): Relationships to load ('customer', 'product').
 
         Returns:
             Order: Retrieved order object.
@@ -75,20 +257,67 @@ class OrderService:
             ValueError: If order is not found or query fails.
         """
         try:
-            order = Order.query.get(order_id)
+            order = Order.query.options(*OrderService._expand_options(expand)).get(order_id)
             if not order:
                 raise ValueError("Order not found.")
             return order
         except Exception as e:
             raise ValueError(f"Error retrieving order: {str(e)}")
 
+    # ---------------------------
+    # Update Order
+    # ---------------------------
+    @staticmethod
+    def update_order(order_id, quantity=None):
+        """
+        Updates an order's quantity, adjusting reserved stock and total price.
+
+        Args:
+            order_id (int): ID of the order.
+            quantity (int): Updated quantity.
+
+        Returns:
+            Order: Updated order object.
+
+        Raises:
+            ValueError: If order is not found, stock is insufficient or update fails.
+        """
+        try:
+            order = Order.query.get(order_id)
+            if not order:
+                raise ValueError("Order not found.")
+
+            if quantity is not None:
+                if quantity <= 0:
+                    raise ValueError("Quantity must be greater than zero.")
+
+                # Reserve or release only the difference
+                delta = quantity - order.quantity
+                if delta and not ProductService.adjust_stock(order.product_id, -delta):
+                    raise ValueError("Insufficient stock.")
+
+                unit_price = order.total_price / order.quantity if order.quantity else 0
+                previous_quantity, previous_total = order.quantity, order.total_price
+                order.quantity = quantity
+                order.total_price = unit_price * quantity
+                OrderService._record_deltas([(
+                    order.customer_id, order.product_id, order.created_at, 0,
+                    quantity - previous_quantity, order.total_price - previous_total
+                )])
+
+            db.session.commit()
+            return order
+        except Exception as e:
+            db.session.rollback()
+            raise ValueError(f"Error updating order: {str(e)}")
+
     # ---------------------------
     # Delete Order
     # ---------------------------
     @staticmethod
     def delete_order(order_id):
         """
-        Deletes an order by ID.
+        Deletes an order by ID and returns its quantity to stock.
 
         Args:
             order_id (int): ID of the order.
@@ -103,7 +332,13 @@ class OrderService:
             order = Order.query.get(order_id)
             if not order:
                 raise ValueError("Order not found.")
+            ProductService.adjust_stock(order.product_id, order.quantity)
+            OrderService._record_deltas([(
+                order.customer_id, order.product_id, order.created_at, -1, -order.quantity, -order.total_price
+            )])
             db.session.delete(order)
+            db.session.flush()
+            CustomerService.refresh_order_bounds([order.customer_id])
             db.session.commit()
             return True
         except Exception as e:
@@ -114,7 +349,9 @@ class OrderService:
     # Get Paginated Orders (Enhanced)
     # ---------------------------
     @staticmethod
-    def get_paginated_orders(page=1, per_page=10, sort_by='created_at', sort_order='asc', include_meta=True):
+    def get_paginated_orders(page=1, per_page=10, sort_by='created_at', sort_order='asc', include_meta=True,
+                             mode=None, cursor=None, after_id=None, meta='exact', include_deleted=False, expand=(),
+                             customer_id=None):
         """
         Retrieves a paginated list of orders with sorting and optional metadata.
 
@@ -124,6 +361,13 @@ class OrderService:
             sort_by (str): Column to sort by ('created_at', 'quantity', 'total_price') (default: 'created_at').
             sort_order (str): Sorting order ('asc' or 'desc') (default: 'asc').
             include_meta (bool): Whether to include metadata (default: True).
+            mode (str): 'offset', 'cursor' or 'after_id' (default: 'offset').
+            cursor (str): Opaque cursor from the previous page (cursor mode).
+            after_id (int): Last order id seen (after_id mode).
+            meta (str): 'exact' (cached count) or 'approximate' (table statistics) totals.
+            include_deleted (bool): Also list soft-deleted rows (default: False).
+            expand (tuple): Relationships to batch-load ('customer', 'product').
+            customer_id (int): Restrict to one customer's orders (default: all customers).
 
         Returns:
             dict: Paginated order data with metadata if requested.
@@ -132,38 +376,76 @@ class OrderService:
             ValueError: If query or input validation fails.
         """
         try:
-            # Input validation
-            page = max(1, int(page))  # Ensure page >= 1
-            per_page = min(max(1, int(per_page)), 100)  # Ensure 1 <= per_page <= 100
-
-            # Validate sort_by field
-            if sort_by not in OrderService.SORTABLE_FIELDS:
-                raise ValueError(f"Invalid sort_by field. Allowed: {OrderService.SORTABLE_FIELDS}")
-
-            # Determine sort direction
-            sort_column = getattr(Order, sort_by)
-            if sort_order.lower() == 'desc':
-                sort_column = sort_column.desc()
-
-            # Perform query with sorting
-            pagination = Order.query.order_by(sort_column).paginate(
-                page=page, per_page=per_page, error_out=False
+            query = Order.query.options(*OrderService._expand_options(expand))
+            if customer_id is not None:
+                query = query.filter(Order.customer_id == customer_id)
+            return paginate(
+                query, Order, OrderService.SORTABLE_FIELDS,
+                sort_by=sort_by, sort_order=sort_order, page=page, per_page=per_page,
+                include_meta=include_meta, mode=mode, cursor=cursor, after_id=after_id, meta=meta,
+                include_deleted=include_deleted
             )
+        except PaginationError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error retrieving paginated orders: {str(e)}")
 
-            # Prepare response
-            response = {
-                "items": pagination.items
-            }
+    # ---------------------------
+    # Stream Orders for Export
+    # ---------------------------
+    @staticmethod
+    def stream_orders(sort_by='created_at', sort_order='asc', date_from=None, date_to=None):
+        """
+        Streams orders as plain row tuples through a server-side cursor.
 
-            # Include metadata if requested
-            if include_meta:
-                response.update({
-                    "total": pagination.total,
-                    "pages": pagination.pages,
-                    "page": pagination.page,
-                    "per_page": pagination.per_page
-                })
+        Inputs are validated before the first row is read so that errors surface
+        before the response starts streaming. Archived orders are included when
+        the date window reaches them.
 
-            return response
-        except Exception as e:
-            raise ValueError(f"Error retrieving paginated orders: {str(e)}")
+        Args:
+            sort_by (str): Column to sort by ('created_at', 'quantity', 'total_price') (default: 'created_at').
+            sort_order (str): Sorting order ('asc' or 'desc') (default: 'asc').
+            date_from (str): Earliest creation date, inclusive (YYYY-MM-DD).
+            date_to (str): Latest creation date, inclusive (YYYY-MM-DD).
+
+        Returns:
+            tuple: (column names, iterator of row tuples).
+
+        Raises:
+            ValueError: If input validation fails.
+        """
+        if sort_by not in OrderService.SORTABLE_FIELDS:
+            raise ValueError(f"Invalid sort_by field. Allowed: {OrderService.SORTABLE_FIELDS}")
+        sort_order = (sort_order or 'asc').lower()
+        if sort_order not in ('asc', 'desc'):
+            raise ValueError("Invalid sort_order. Allowed: ['asc', 'desc']")
+
+        try:
+            start = datetime.strptime(date_from, "%Y-%m-%d") if date_from else None
+            end = datetime.strptime(date_to, "%Y-%m-%d") + timedelta(days=1) if date_to else None
+        except ValueError:
+            raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+
+        source = archive_source(Order, start)
+        columns = [getattr(source, name) for name in OrderService.EXPORT_COLUMNS]
+        sort_column = getattr(source, sort_by)
+        if sort_order == 'desc':
+            order_by = (sort_column.desc(), source.id.desc())
+        else:
+            order_by = (sort_column.asc(), source.id.asc())
+
+        stmt = select(*columns).order_by(*order_by)
+        if start:
+            stmt = stmt.where(source.created_at >= start)
+        if end:
+            stmt = stmt.where(source.created_at < end)
+
+        def rows():
+            result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            try:
+                for row in result:
+                    yield tuple(row)
+            finally:
+                result.close()
+
+        return OrderService.EXPORT_COLUMNS, rows()
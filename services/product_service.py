@@ -1,4 +1,9 @@
-from models import db, Product
+from sqlalchemy import select, update, func
+from models import db, Product, Production, Order, ProductSalesDailyRollup
+from utils.archive import archive_source
+from utils.table_versions import mark_tables_changed
+from utils.pagination import paginate, PaginationError
+from utils.rebuild import rebuild_in_batches
 
 
 class ProductService:
@@ -9,13 +14,14 @@ class ProductService:
     # Create a product
     # ---------------------------
     @staticmethod
-    def create_product(name, price):
+    def create_product(name, price, stock_quantity=0):
         """
         Creates a new product.
 
         Args:
             name (str): Name of the product.
             price (float): Price of the product.
+            stock_quantity (int): Opening stock (default: 0).
 
         Returns:
             Product: Created product object.
@@ -29,7 +35,7 @@ class ProductService:
                 raise ValueError("Invalid product data. Name and valid price are required.")
 
             # Create a new product
-            new_product = Product(name=name, price=price)
+            new_product = Product(name=name, price=price, stock_quantity=stock_quantity)
             db.session.add(new_product)
             db.session.commit()
             return new_product
@@ -41,7 +47,8 @@ class ProductService:
     # Get paginated products (NEW)
     # ---------------------------
     @staticmethod
-    def get_paginated_products(page=1, per_page=10, sort_by='name', sort_order='asc', include_meta=True):
+    def get_paginated_products(page=1, per_page=10, sort_by='name', sort_order='asc', include_meta=True,
+                               mode=None, cursor=None, after_id=None, meta='exact', include_deleted=False):
         """
         Retrieves a paginated list of products with sorting and optional metadata.
 
@@ -51,6 +58,11 @@ class ProductService:
             sort_by (str): Column to sort by ('name', 'price') (default: 'name').
             sort_order (str): Sorting order ('asc' or 'desc') (default: 'asc').
             include_meta (bool): Include metadata in the response (default: True).
+            mode (str): 'offset', 'cursor' or 'after_id' (default: 'offset').
+            cursor (str): Opaque cursor from the previous page (cursor mode).
+            after_id (int): Last product id seen (after_id mode).
+            meta (str): 'exact' (cached count) or 'approximate' (table statistics) totals.
+            include_deleted (bool): Also list soft-deleted rows (default: False).
 
         Returns:
             dict: Paginated product data with metadata if requested.
@@ -59,35 +71,14 @@ class ProductService:
             ValueError: If query or input validation fails.
         """
         try:
-            # Input validation
-            page = max(1, int(page))  # Ensure page >= 1
-            per_page = min(max(1, int(per_page)), 100)  # Limit 1 <= per_page <= 100
-
-            # Validate sorting field
-            if sort_by not in ProductService.SORTABLE_FIELDS:
-                raise ValueError(f"Invalid sort_by field. Allowed: {ProductService.SORTABLE_FIELDS}")
-
-            # Determine sort order
-            sort_column = getattr(Product, sort_by)
-            if sort_order.lower() == 'desc':
-                sort_column = sort_column.desc()
-
-            # Query with pagination and sorting
-            pagination = Product.query.order_by(sort_column).paginate(
-                page=page, per_page=per_page, error_out=False
+            return paginate(
+                Product.query, Product, ProductService.SORTABLE_FIELDS,
+                sort_by=sort_by, sort_order=sort_order, page=page, per_page=per_page,
+                include_meta=include_meta, mode=mode, cursor=cursor, after_id=after_id, meta=meta,
+                include_deleted=include_deleted
             )
-
-            # Prepare response
-            response = {"items": pagination.items}
-            if include_meta:
-                response.update({
-                    "total": pagination.total,
-                    "pages": pagination.pages,
-                    "page": pagination.page,
-                    "per_page": pagination.per_page
-                })
-
-            return response
+        except PaginationError:
+            raise
         except Exception as e:
             raise ValueError(f"Error retrieving paginated products: {str(e)}")
 
@@ -181,3 +172,157 @@ class ProductService:
         except Exception as e:
             db.session.rollback()
             raise ValueError(f"Error deleting product: {str(e)}")
+
+    # ---------------------------
+    # Adjust stock atomically
+    # ---------------------------
+    @staticmethod
+    def adjust_stock(product_id, delta):
+        """
+        Atomically adds `delta` units (negative to remove) to a product's stock.
+
+        The check and the change happen in one conditional UPDATE inside the
+        caller's transaction, so concurrent writers can neither drive stock
+        below zero nor overwrite each other's changes. The caller commits.
+
+        Args:
+            product_id (int): ID of the product.
+            delta (int): Units to add (positive) or remove (negative).
+
+        Returns:
+            bool: True if applied, False if the product is missing or stock would go negative.
+        """
+        stmt = update(Product).where(Product.id == product_id)
+        if delta < 0:
+            stmt = stmt.where(Product.stock_quantity >= -delta)
+        result = db.session.execute(
+            stmt.values(stock_quantity=Product.stock_quantity + delta)
+            .execution_options(synchronize_session=False)
+        )
+        mark_tables_changed(db.session, Product.__tablename__)
+        return result.rowcount == 1
+
+    # ---------------------------
+    # Reconcile stock
+    # ---------------------------
+    @staticmethod
+    def reconcile_stock(batch_size=1000, dry_run=True):
+        """
+        Recomputes every product's stock as opening stock plus produced units minus ordered units.
+
+        Products are processed in id-ordered batches. Each batch reads its
+        production and order totals with one grouped query per table, then
+        writes only the drifted rows in one executemany and commits, so locks
+        are held briefly.
+        Soft-deleted products, orders and production runs are counted, since
+        soft deletion does not move stock, and so are archived ones.
+        Products without a recorded opening stock cannot be recomputed; they
+        are counted as skipped and left untouched.
+
+        Args:
+            batch_size (int): Products per batch (default: 1000).
+            dry_run (bool): Report drift without writing (default: True).
+
+        Returns:
+            dict: {"checked": int, "skipped": int, "drifted": int,
+                   "corrections": [{"product_id", "old", "new"}, ...]}.
+
+        Raises:
+            ValueError: If reconciliation fails.
+        """
+        try:
+            productions, orders = archive_source(Production), archive_source(Order)
+            checked, skipped, corrections, last_id = 0, 0, [], 0
+            while True:
+                batch = db.session.execute(
+                    select(Product.id, Product.stock_quantity, Product.opening_stock)
+                    .where(Product.id > last_id)
+                    .order_by(Product.id)
+                    .limit(batch_size)
+                    .execution_options(include_deleted=True)
+                ).all()
+                if not batch:
+                    break
+                ids = [row.id for row in batch]
+                last_id = ids[-1]
+
+                produced = dict(db.session.execute(
+                    select(productions.product_id, func.sum(productions.quantity_produced))
+                    .where(productions.product_id.in_(ids))
+                    .group_by(productions.product_id)
+                    .execution_options(include_deleted=True)
+                ).all())
+                ordered = dict(db.session.execute(
+                    select(orders.product_id, func.sum(orders.quantity))
+                    .where(orders.product_id.in_(ids))
+                    .group_by(orders.product_id)
+                    .execution_options(include_deleted=True)
+                ).all())
+
+                drifted = []
+                for product_id, current, opening in batch:
+                    if opening is None:
+                        skipped += 1
+                        continue
+                    expected = opening + int(produced.get(product_id) or 0) - int(ordered.get(product_id) or 0)
+                    if current != expected:
+                        drifted.append({"product_id": product_id, "old": current, "new": expected})
+
+                if drifted and not dry_run:
+                    db.session.execute(
+                        update(Product).execution_options(synchronize_session=False),
+                        [{"id": item["product_id"], "stock_quantity": item["new"]} for item in drifted]
+                    )
+                    mark_tables_changed(db.session, Product.__tablename__)
+                db.session.commit()
+
+                checked += len(batch)
+                corrections.extend(drifted)
+
+            return {"checked": checked, "skipped": skipped, "drifted": len(corrections), "corrections": corrections}
+        except Exception as e:
+            db.session.rollback()
+            raise ValueError(f"Error reconciling stock: {str(e)}")
+
+    # ---------------------------
+    # Backfill Daily Sales Rollup
+    # ---------------------------
+    @staticmethod
+    def backfill_sales_rollup(batch_size=1000):
+        """
+        Rebuilds the daily product sales rollup from orders (archived ones included).
+
+        Products are rebuilt in committed batches (see `rebuild_in_batches`),
+        each with one INSERT ... SELECT ... GROUP BY day.
+
+        Args:
+            batch_size (int): Products rebuilt per transaction.
+
+        Returns:
+            dict: {"products": products processed, "rows": rollup rows written}.
+
+        Raises:
+            ValueError: If a batch fails (earlier batches stay committed).
+        """
+        source = archive_source(Order)  # Archived orders stay in the rollup
+
+        def sales_for(product_ids):
+            day = func.date(source.created_at)
+            return (
+                select(
+                    day.label('day'),
+                    source.product_id.label('product_id'),
+                    func.sum(source.quantity).label('quantity_sold'),
+                    func.sum(source.total_price).label('revenue'),
+                    func.count(source.id).label('order_count')
+                )
+                .where(source.product_id.in_(product_ids), source.created_at.isnot(None))
+                .where(source.deleted_at.is_(None))
+                .group_by(day, source.product_id)
+            )
+
+        try:
+            products, rows = rebuild_in_batches(Product, ProductSalesDailyRollup.__table__, sales_for, batch_size)
+        except Exception as e:
+            raise ValueError(f"Error backfilling sales rollup: {str(e)}")
+        return {"products": products, "rows": rows}
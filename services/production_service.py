@@ -1,5 +1,14 @@
-from models import db, Production, Product
-from datetime import datetime
+from models import db, Production, Product, Employee, ProductionDailyRollup
+from datetime import datetime, date
+from sqlalchemy import select, insert, func
+from utils.pagination import paginate, PaginationError
+from utils.archive import archive_source
+from utils.export import EXPORT_BATCH_SIZE
+from utils.ingest import chunked
+from utils.rebuild import rebuild_in_batches
+from utils.table_versions import mark_tables_changed
+from utils.upsert import upsert_increments
+from services.product_service import ProductService
 
 
 # Custom Exception for Error Handling
@@ -9,6 +18,15 @@ class CustomException(Exception):
 
 
 class ProductionService:
+    # Allowed sortable fields
+    SORTABLE_FIELDS = ['date_produced', 'quantity_produced']
+
+    # Columns written by the streaming export
+    EXPORT_COLUMNS = ['id', 'product_id', 'employee_id', 'quantity_produced', 'date_produced', 'created_at', 'updated_at']
+
+    # Rejected lines reported per chunk in bulk ingestion summaries
+    BULK_ERROR_SAMPLE = 10
+
     # ---------------------------
     # Utility: Date Parsing
     # ---------------------------
@@ -22,21 +40,48 @@ class ProductionService:
                 raise CustomException("Invalid date format. Use YYYY-MM-DD.")
         elif isinstance(date_input, datetime):
             return date_input
+        elif isinstance(date_input, date):
+            return datetime.combine(date_input, datetime.min.time())
         else:
             raise CustomException("Invalid date format. Use YYYY-MM-DD.")
 
+    # ---------------------------
+    # Utility: Daily Rollup Maintenance
+    # ---------------------------
+    @staticmethod
+    def _roll_up(changes):
+        """
+        Applies production changes to the daily rollup in the current transaction.
+
+        Args:
+            changes (list): (product_id, day, quantity delta, record count delta) tuples.
+        """
+        upsert_increments(
+            db.session, ProductionDailyRollup.__table__, ['day', 'product_id'],
+            [
+                {
+                    "day": day.date() if isinstance(day, datetime) else day,
+                    "product_id": product_id,
+                    "quantity_produced": quantity,
+                    "record_count": count
+                }
+                for product_id, day, quantity, count in changes
+            ]
+        )
+
     # ---------------------------
     # Create production record
     # ---------------------------
     @staticmethod
-    def create_production(product_id, quantity_produced, date_produced):
+    def create_production(product_id, quantity_produced, date_produced, employee_id=None):
         """
-        Creates a new production record.
+        Creates a new production record and adds its quantity to product stock.
 
         Args:
             product_id (int): ID of the product.
             quantity_produced (int): Quantity produced.
             date_produced (str or datetime): Date produced (YYYY-MM-DD).
+            employee_id (int): ID of the employee who produced it (optional).
 
         Returns:
             Production: Newly created production record.
@@ -50,6 +95,10 @@ class ProductionService:
             if not product:
                 raise CustomException("Product not found.")
 
+            # Validate employee
+            if employee_id is not None and not Employee.query.get(employee_id):
+                raise CustomException("Employee not found.")
+
             # Validate quantity
             if quantity_produced <= 0:
                 raise CustomException("Quantity produced must be greater than zero.")
@@ -60,21 +109,105 @@ class ProductionService:
             # Create production record
             new_production = Production(
                 product_id=product_id,
+                employee_id=employee_id,
                 quantity_produced=quantity_produced,
                 date_produced=date_produced
             )
             db.session.add(new_production)
+
+            # Replenish stock and the daily rollup in the same transaction
+            ProductService.adjust_stock(product_id, quantity_produced)
+            ProductionService._roll_up([(product_id, date_produced, quantity_produced, 1)])
             db.session.commit()
             return new_production
         except Exception as e:
             db.session.rollback()
             raise CustomException(f"Error creating production record: {str(e)}")
 
+    # ---------------------------
+    # Bulk ingestion
+    # ---------------------------
+    @staticmethod
+    def ingest_productions(records, chunk_size=1000):
+        """
+        Inserts a stream of validated production records in chunks.
+
+        Records are consumed lazily. Each chunk resolves product and employee ids
+        it has not seen before with one IN query each (ids are remembered across
+        chunks), inserts
+        its rows with a single executemany, adds the produced quantities to stock
+        with one UPDATE per product, and commits. A failed chunk is rolled back
+        and reported without affecting chunks already committed.
+
+        Args:
+            records (iterable): (line number, data, errors) triples; data holds
+                product_id, quantity_produced, date_produced and optionally
+                employee_id when errors is empty.
+            chunk_size (int): Records per chunk.
+
+        Returns:
+            list: Per-chunk summaries {"chunk", "first_line", "last_line",
+                "inserted", "rejected", "errors"}; "errors" samples rejected lines.
+        """
+        known = {Product: {}, Employee: {None: True}}  # Unattributed records are allowed
+        summaries = []
+        for number, chunk in enumerate(chunked(records, chunk_size), start=1):
+            # Resolve product and employee ids not seen in earlier chunks
+            for model, field in ((Product, 'product_id'), (Employee, 'employee_id')):
+                unseen = {
+                    data.get(field) for _, data, errors in chunk
+                    if not errors and data.get(field) not in known[model]
+                }
+                if unseen:
+                    found = set(db.session.scalars(select(model.id).where(model.id.in_(list(unseen)))))
+                    known[model].update((id_, id_ in found) for id_ in unseen)
+
+            rows, rejected = [], []
+            for line, data, errors in chunk:
+                if not errors and not known[Product][data['product_id']]:
+                    errors = {"product_id": ["Product not found."]}
+                elif not errors and not known[Employee][data.get('employee_id')]:
+                    errors = {"employee_id": ["Employee not found."]}
+                if errors:
+                    rejected.append({"line": line, "errors": errors})
+                else:
+                    rows.append(dict(data, employee_id=data.get('employee_id')))  # Same keys on every row
+
+            summary = {
+                "chunk": number,
+                "first_line": chunk[0][0],
+                "last_line": chunk[-1][0],
+                "inserted": 0,
+                "rejected": len(rejected),
+                "errors": rejected[:ProductionService.BULK_ERROR_SAMPLE]
+            }
+            if rows:
+                try:
+                    db.session.execute(insert(Production), rows)  # Single executemany
+                    produced = {}
+                    for row in rows:
+                        produced[row['product_id']] = produced.get(row['product_id'], 0) + row['quantity_produced']
+                    for product_id, quantity in produced.items():
+                        ProductService.adjust_stock(product_id, quantity)
+                    ProductionService._roll_up([
+                        (row['product_id'], row['date_produced'], row['quantity_produced'], 1) for row in rows
+                    ])
+                    mark_tables_changed(db.session, Production.__tablename__)
+                    db.session.commit()
+                    summary["inserted"] = len(rows)
+                except Exception as e:
+                    db.session.rollback()
+                    summary["rejected"] += len(rows)
+                    summary["error"] = f"Chunk failed: {str(e)}"
+            summaries.append(summary)
+        return summaries
+
     # ---------------------------
     # Paginated Productions
     # ---------------------------
     @staticmethod
-    def get_paginated_productions(page=1, per_page=10, sort_by='date_produced', sort_order='asc', include_meta=True):
+    def get_paginated_productions(page=1, per_page=10, sort_by='date_produced', sort_order='asc', include_meta=True,
+                                  mode=None, cursor=None, after_id=None, meta='exact', include_deleted=False):
         """
         Retrieves paginated production records with sorting.
 
@@ -84,33 +217,24 @@ class ProductionService:
             sort_by (str): Field to sort by ('date_produced', 'quantity_produced').
             sort_order (str): 'asc' or 'desc'.
             include_meta (bool): Include pagination metadata.
+            mode (str): 'offset', 'cursor' or 'after_id' (default: 'offset').
+            cursor (str): Opaque cursor from the previous page (cursor mode).
+            after_id (int): Last production id seen (after_id mode).
+            meta (str): 'exact' (cached count) or 'approximate' (table statistics) totals.
+            include_deleted (bool): Also list soft-deleted rows (default: False).
 
         Returns:
             dict: Paginated results and metadata.
         """
         try:
-            # Validate inputs
-            page = max(1, int(page))
-            per_page = min(max(1, int(per_page)), 100)
-
-            # Sorting
-            sort_field = getattr(Production, sort_by, Production.date_produced)
-            if sort_order.lower() == 'desc':
-                sort_field = sort_field.desc()
-
-            # Paginate
-            pagination = Production.query.order_by(sort_field).paginate(page=page, per_page=per_page, error_out=False)
-
-            # Response
-            response = {"items": pagination.items}
-            if include_meta:
-                response.update({
-                    "total": pagination.total,
-                    "pages": pagination.pages,
-                    "page": pagination.page,
-                    "per_page": pagination.per_page
-                })
-            return response
+            return paginate(
+                Production.query, Production, ProductionService.SORTABLE_FIELDS,
+                sort_by=sort_by, sort_order=sort_order, page=page, per_page=per_page,
+                include_meta=include_meta, mode=mode, cursor=cursor, after_id=after_id, meta=meta,
+                include_deleted=include_deleted
+            )
+        except PaginationError:
+            raise
         except Exception as e:
             raise CustomException(f"Error retrieving paginated production records: {str(e)}")
 
@@ -131,21 +255,39 @@ class ProductionService:
     # Update production record
     # ---------------------------
     @staticmethod
-    def update_production(production_id, quantity_produced=None, date_produced=None):
+    def update_production(production_id, quantity_produced=None, date_produced=None, employee_id=None):
         try:
             production = Production.query.get(production_id)
             if not production:
                 raise CustomException("Production record not found.")
 
-            # Update quantity
+            # Reassign the employee
+            if employee_id is not None:
+                if not Employee.query.get(employee_id):
+                    raise CustomException("Employee not found.")
+                production.employee_id = employee_id
+
+            old_day, old_quantity = production.date_produced, production.quantity_produced
+
+            # Update quantity, applying only the difference to stock
             if quantity_produced is not None:
                 if quantity_produced <= 0:
                     raise CustomException("Quantity produced must be greater than zero.")
+                delta = quantity_produced - production.quantity_produced
+                if delta and not ProductService.adjust_stock(production.product_id, delta):
+                    raise CustomException("Insufficient stock to reduce production quantity.")
                 production.quantity_produced = quantity_produced
 
             # Update date
             if date_produced is not None:
-                production.date_produced = ProductionService.parse_date(date_produced)
+                production.date_produced = ProductionService.parse_date(date_produced).date()
+
+            # Move the record's contribution in the daily rollup
+            if (production.date_produced, production.quantity_produced) != (old_day, old_quantity):
+                ProductionService._roll_up([
+                    (production.product_id, old_day, -old_quantity, -1),
+                    (production.product_id, production.date_produced, production.quantity_produced, 1)
+                ])
 
             db.session.commit()
             return production
@@ -162,9 +304,108 @@ class ProductionService:
             production = Production.query.get(production_id)
             if not production:
                 raise CustomException("Production record not found.")
+
+            # Remove the produced units from stock (fails if already sold)
+            if not ProductService.adjust_stock(production.product_id, -production.quantity_produced):
+                raise CustomException("Insufficient stock to remove production record.")
+            ProductionService._roll_up([
+                (production.product_id, production.date_produced, -production.quantity_produced, -1)
+            ])
             db.session.delete(production)
             db.session.commit()
             return True
         except Exception as e:
             db.session.rollback()
             raise CustomException(f"Error deleting production record: {str(e)}")
+
+    # ---------------------------
+    # Backfill daily rollup
+    # ---------------------------
+    @staticmethod
+    def backfill_daily_rollup(batch_size=1000):
+        """
+        Rebuilds the daily production rollup from raw production history, archived records included.
+
+        Products are rebuilt in committed batches (see `rebuild_in_batches`),
+        each with one INSERT ... SELECT ... GROUP BY.
+
+        Args:
+            batch_size (int): Products rebuilt per transaction.
+
+        Returns:
+            dict: {"products": products processed, "rows": rollup rows written}.
+        """
+        source = archive_source(Production)  # Archived records stay in the rollup
+
+        def production_for(product_ids):
+            return (
+                select(
+                    source.date_produced.label('day'),
+                    source.product_id.label('product_id'),
+                    func.sum(source.quantity_produced).label('quantity_produced'),
+                    func.count(source.id).label('record_count')
+                )
+                .where(source.product_id.in_(product_ids), source.deleted_at.is_(None))
+                .group_by(source.date_produced, source.product_id)
+            )
+
+        try:
+            products, rows = rebuild_in_batches(Product, ProductionDailyRollup.__table__, production_for, batch_size)
+        except Exception as e:
+            raise CustomException(f"Error backfilling production rollup: {str(e)}")
+        return {"products": products, "rows": rows}
+
+    # ---------------------------
+    # Stream production records for export
+    # ---------------------------
+    @staticmethod
+    def stream_productions(sort_by='date_produced', sort_order='asc', date_from=None, date_to=None):
+        """
+        Streams production records as plain row tuples through a server-side cursor.
+
+        Archived records are included when the date window reaches them.
+
+        Args:
+            sort_by (str): Field to sort by ('date_produced', 'quantity_produced').
+            sort_order (str): 'asc' or 'desc'.
+            date_from (str): Earliest production date, inclusive (YYYY-MM-DD).
+            date_to (str): Latest production date, inclusive (YYYY-MM-DD).
+
+        Returns:
+            tuple: (column names, iterator of row tuples).
+
+        Raises:
+            CustomException: If input validation fails.
+        """
+        if sort_by not in ProductionService.SORTABLE_FIELDS:
+            raise CustomException(f"Invalid sort_by field. Allowed: {ProductionService.SORTABLE_FIELDS}")
+        sort_order = (sort_order or 'asc').lower()
+        if sort_order not in ('asc', 'desc'):
+            raise CustomException("Invalid sort_order. Allowed: ['asc', 'desc']")
+
+        start = ProductionService.parse_date(date_from).date() if date_from else None
+        end = ProductionService.parse_date(date_to).date() if date_to else None
+
+        source = archive_source(Production, start)
+        columns = [getattr(source, name) for name in ProductionService.EXPORT_COLUMNS]
+        sort_field = getattr(source, sort_by)
+        if sort_order == 'desc':
+            order_by = (sort_field.desc(), source.id.desc())
+        else:
+            order_by = (sort_field.asc(), source.id.asc())
+
+        stmt = select(*columns).order_by(*order_by)
+        if start:
+            stmt = stmt.where(source.date_produced >= start)
+        if end:
+            stmt = stmt.where(source.date_produced <= end)
+
+        def rows():
+            result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            try:
+                for row in result:
+                    yield tuple(row)
+            finally:
+                result.close()
+
+        return ProductionService.EXPORT_COLUMNS, rows()
@@ -1,144 +1,171 @@
-from dotenv import load_dotenv
-load_dotenv()  # Load environment variables from .env file
-
-import os
-import sys
-import logging
-from logging.handlers import RotatingFileHandler
-from flask import Flask, jsonify, request, current_app
-from flask_migrate import Migrate
-from models import db
-from config import DevelopmentConfig
-from limiter import limiter
-from flask_cors import CORS
-
-# Add project root to sys.path
-project_root = os.path.dirname(__file__)
-sys.path.insert(0, project_root)
-
-# Add the queries folder explicitly
-queries_path = os.path.join(project_root, 'queries')
-sys.path.insert(0, queries_path)
-
-print("Current Working Directory:", os.getcwd())
-print("Python Path:", sys.path)
-
-# Import blueprints
-from blueprints.employee_blueprint import employee_bp
-from blueprints.product_blueprint import product_bp
-from blueprints.order_blueprint import order_bp
-from blueprints.customer_blueprint import customer_bp
-from blueprints.production_blueprint import production_bp
-from blueprints.analytics_blueprint import analytics_bp
-from blueprints.user_blueprint import user_bp  # Import user blueprint
-
-# Logging configuration
-logging.basicConfig(level=logging.DEBUG)
-
-def setup_logging(app):
-    """
-    Configures logging for the app. If in testing or production, it will handle log rotation.
-    """
-    # Ensure the logs directory exists
-    if not os.path.exists('logs'):
-        os.mkdir('logs')
-
-    # File logging configuration
-    file_handler = logging.FileHandler('logs/factory_management.log')
-    file_handler.setLevel(logging.INFO)
-    formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]')
-    file_handler.setFormatter(formatter)
-    app.logger.addHandler(file_handler)
-    
-    # Add console logging for testing or debugging
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-    app.logger.addHandler(console_handler)
-
-    app.logger.setLevel(logging.INFO)
-    app.logger.info('Factory Management System startup')
-
-def create_app(config_class=DevelopmentConfig):
-    """
-    Factory method to create and configure the Flask application.
-
-    Args:
-        config_class: Configuration class to load settings.
-
-    Returns:
-        Flask: Configured Flask application instance.
-    """
-    # Create Flask app instance
-    app = Flask(__name__)
-    app.config.from_object(config_class)
-
-    # CORS configuration
-    CORS(app)  # Allow cross-origin requests for APIs
-
-    # Initialize extensions
-    db.init_app(app)
-    Migrate(app, db)  # Database migration
-    limiter.init_app(app)
-
-    # Set up logging
-    setup_logging(app)
+from models import db, User, with_deleted
+from models.user import ROLE_HIERARCHY
+from utils.pagination import paginate, PaginationError
+
+
+class UserService:
+    # Allowed sortable fields
+    SORTABLE_FIELDS = ['username', 'role', 'created_at']
 
     # ---------------------------
-    # Rate Limiter Configuration
+    # Create User
     # ---------------------------
-    limiter.request_filter(lambda: request.remote_addr == '127.0.0.1')
+    @staticmethod
+    def create_user(username, password, role):
+        """
+        Creates a new user with a hashed password.
+
+        Args:
+            username (str): Unique username.
+            password (str): Plain-text password (hashed before storage).
+            role (str): 'super_admin', 'admin' or 'user'.
+
+        Returns:
+            User: Newly created user object.
+
+        Raises:
+            ValueError: If validation fails or creation error occurs.
+        """
+        try:
+            if role not in ROLE_HIERARCHY:
+                raise ValueError(f"Invalid role. Allowed: {list(ROLE_HIERARCHY)}")
+            if with_deleted(User.query).filter_by(username=username).first():
+                raise ValueError("Username already exists.")
+
+            new_user = User(username=username, role=role)
+            new_user.set_password(password)
+            db.session.add(new_user)
+            db.session.commit()
+            return new_user
+        except Exception as e:
+            db.session.rollback()
+            raise ValueError(f"Error creating user: {str(e)}")
 
     # ---------------------------
-    # Register Blueprints
+    # Get User by ID
     # ---------------------------
-    app.register_blueprint(employee_bp, url_prefix='/employees')
-    app.register_blueprint(product_bp, url_prefix='/products')
-    app.register_blueprint(order_bp, url_prefix='/orders')
-    app.register_blueprint(customer_bp, url_prefix='/customers')
-    app.register_blueprint(production_bp, url_prefix='/production')
-    app.register_blueprint(analytics_bp, url_prefix='/analytics')  # Analytics routes
-    app.register_blueprint(user_bp, url_prefix='/auth')  # User routes
+    @staticmethod
+    def get_user_by_id(user_id):
+        """
+        Fetches a user by ID.
+
+        Args:
+            user_id (int): ID of the user.
+
+        Returns:
+            User: Retrieved user object.
+
+        Raises:
+            ValueError: If user is not found or query fails.
+        """
+        try:
+            user = User.query.get(user_id)
+            if not user:
+                raise ValueError("User not found.")
+            return user
+        except Exception as e:
+            raise ValueError(f"Error retrieving user: {str(e)}")
 
     # ---------------------------
-    # Routes and Error Handlers
+    # Update User
     # ---------------------------
-    @app.route('/')
-    def index():
-        """Default landing page."""
-        return jsonify({"message": "Welcome to the Factory Management System!"}), 200
-
-    @app.route('/health')
-    def health_check():
-        """Health check endpoint."""
-        return jsonify({"status": "healthy"}), 200
+    @staticmethod
+    def update_user(user_id, password=None, role=None):
+        """
+        Updates a user's password and/or role.
+
+        Args:
+            user_id (int): ID of the user.
+            password (str, optional): New password.
+            role (str, optional): New role.
+
+        Returns:
+            User: Updated user object.
+
+        Raises:
+            ValueError: If validation fails or update fails.
+        """
+        try:
+            user = User.query.get(user_id)
+            if not user:
+                raise ValueError("User not found.")
+
+            if role is not None:
+                if role not in ROLE_HIERARCHY:
+                    raise ValueError(f"Invalid role. Allowed: {list(ROLE_HIERARCHY)}")
+                user.role = role
+            if password:
+                user.set_password(password)
+
+            db.session.commit()
+            return user
+        except Exception as e:
+            db.session.rollback()
+            raise ValueError(f"Error updating user: {str(e)}")
 
     # ---------------------------
-    # Error Handlers
+    # Delete User
     # ---------------------------
-    @app.errorhandler(404)
-    def not_found(error):
-        """Handles 404 errors."""
-        return jsonify({"error": "Not Found"}), 404
-
-    @app.errorhandler(500)
-    def internal_server_error(error):
-        """Handles 500 errors."""
-        app.logger.error(f"Server error: {str(error)}")
-        return jsonify({"error": "Internal Server Error"}), 500
-
-    @app.errorhandler(429)
-    def rate_limit_exceeded(error):
-        """Handles rate limit errors."""
-        return jsonify({"error": "Rate limit exceeded"}), 429
+    @staticmethod
+    def delete_user(user_id):
+        """
+        Deletes a user by ID.
+
+        Args:
+            user_id (int): ID of the user.
+
+        Returns:
+            bool: True if the user was deleted.
+
+        Raises:
+            ValueError: If user is not found or delete fails.
+        """
+        try:
+            user = User.query.get(user_id)
+            if not user:
+                raise ValueError("User not found.")
+            db.session.delete(user)
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            raise ValueError(f"Error deleting user: {str(e)}")
 
-    return app
-
-
-if __name__ == '__main__':
-    # Load configuration from environment variable or use default
-    config_class = os.getenv('FLASK_CONFIG', 'config.DevelopmentConfig')
-    app = create_app(config_class=config_class)
-
-    # Run the Flask app
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # ---------------------------
+    # Get Paginated Users
+    # ---------------------------
+    @staticmethod
+    def get_paginated_users(page=1, per_page=10, sort_by='username', sort_order='asc', include_meta=True,
+                            mode=None, cursor=None, after_id=None, meta='exact', include_deleted=False):
+        """
+        Retrieves a paginated list of users with sorting and optional metadata.
+
+        Args:
+            page (int): Page number (default: 1).
+            per_page (int): Records per page (default: 10, max: 100).
+            sort_by (str): Column to sort by ('username', 'role', 'created_at') (default: 'username').
+            sort_order (str): Sorting order ('asc' or 'desc') (default: 'asc').
+            include_meta (bool): Whether to include metadata (default: True).
+            mode (str): 'offset', 'cursor' or 'after_id' (default: 'offset').
+            cursor (str): Opaque cursor from the previous page (cursor mode).
+            after_id (int): Last user id seen (after_id mode).
+            meta (str): 'exact' (cached count) or 'approximate' (table statistics) totals.
+            include_deleted (bool): Also list soft-deleted rows (default: False).
+
+        Returns:
+            dict: Paginated user data with metadata if requested.
+
+        Raises:
+            ValueError: If query or input validation fails.
+        """
+        try:
+            return paginate(
+                User.query, User, UserService.SORTABLE_FIELDS,
+                sort_by=sort_by, sort_order=sort_order, page=page, per_page=per_page,
+                include_meta=include_meta, mode=mode, cursor=cursor, after_id=after_id, meta=meta,
+                include_deleted=include_deleted
+            )
+        except PaginationError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error retrieving paginated users: {str(e)}")
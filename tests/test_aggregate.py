@@ -0,0 +1,96 @@
+import unittest
+from datetime import date, datetime
+from app import create_app
+from config import TestingConfig
+from models import db, Customer, Employee, Order, Product, Production
+from queries.aggregate_queries import aggregate, statement_cache_info, AggregateError
+from utils.utils import encode_token
+
+
+class TestAggregate(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with orders and production across two months."""
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        alice = Customer(name="Alice", email="alice@example.com", phone="5550000001")
+        bob = Customer(name="Bob", email="bob@example.com", phone="5550000002")
+        anvil = Product(name="Anvil", price=2.0, stock_quantity=100)
+        bolt = Product(name="Bolt", price=1.0, stock_quantity=100)
+        sam = Employee(name="Sam", position="Operator", email="sam@example.com", phone="5550000003")
+        db.session.add_all([alice, bob, anvil, bolt, sam])
+        db.session.commit()
+        self.alice, self.bob, self.anvil, self.bolt, self.sam = alice.id, bob.id, anvil.id, bolt.id, sam.id
+
+        for customer_id, product_id, quantity, day in (
+            (self.alice, self.anvil, 2, datetime(2024, 1, 31, 23, 0)),
+            (self.alice, self.bolt, 5, datetime(2024, 2, 1, 9, 0)),
+            (self.bob, self.anvil, 1, datetime(2024, 2, 2, 9, 0)),
+        ):
+            db.session.add(Order(customer_id=customer_id, product_id=product_id, quantity=quantity,
+                                 total_price=quantity * 2.0, created_at=day))
+        db.session.add_all([
+            Production(product_id=self.anvil, employee_id=self.sam, quantity_produced=4, date_produced=date(2024, 2, 1)),
+            Production(product_id=self.bolt, employee_id=None, quantity_produced=3, date_produced=date(2024, 2, 1)),
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_group_by_dimensions_and_measures(self):
+        """Test dimensions, measures and filters compile to one grouped result."""
+        rows = aggregate('orders', ['month', 'product'], ['sum:quantity', 'count', 'avg:total_price'])
+        self.assertEqual(rows, [
+            {"month": "2024-01", "product_id": self.anvil, "product": "Anvil", "sum_quantity": 2, "count": 1,
+             "avg_total_price": 4.0},
+            {"month": "2024-02", "product_id": self.anvil, "product": "Anvil", "sum_quantity": 1, "count": 1,
+             "avg_total_price": 2.0},
+            {"month": "2024-02", "product_id": self.bolt, "product": "Bolt", "sum_quantity": 5, "count": 1,
+             "avg_total_price": 10.0},
+        ])
+
+        rows = aggregate('orders', ['customer'], ['max:quantity'],
+                         {"since": date(2024, 2, 1), "until": date(2024, 2, 1)})
+        self.assertEqual(rows, [{"customer_id": self.alice, "customer": "Alice", "max_quantity": 5}])
+
+        rows = aggregate('production', ['employee', 'day'], ['sum:quantity_produced'])
+        self.assertEqual(rows, [{"employee_id": self.sam, "employee": "Sam", "day": "2024-02-01",
+                                 "sum_quantity_produced": 4}])
+
+    def test_statements_are_reused_by_shape(self):
+        """Test requests differing only in filter values share one statement."""
+        before = statement_cache_info()
+        aggregate('orders', ['product'], ['sum:quantity'], {"customer_id": [self.alice]})
+        aggregate('orders', ['product'], ['sum:quantity'], {"customer_id": [self.bob, self.alice]})
+        after = statement_cache_info()
+        self.assertEqual((after["misses"] - before["misses"], after["hits"] - before["hits"]), (1, 1))
+
+    def test_rejects_unknown_names_and_cardinality_explosions(self):
+        """Test the whitelist and the group guard."""
+        for args in (('orders', ['employee']), ('orders', ['product'], ['sum:price']),
+                     ('shipments', ['day']), ('orders', ['day', 'month'])):
+            with self.assertRaises(AggregateError):
+                aggregate(*args)
+
+        self.app.config['ANALYTICS_AGGREGATE_MAX_GROUPS'] = 2
+        with self.assertRaises(AggregateError):
+            aggregate('orders', ['customer', 'product'])  # Estimated 2 x 2 groups
+        with self.assertRaises(AggregateError):
+            aggregate('orders', ['day'])  # No window to bound the estimate; caught by the row limit
+        self.assertEqual(len(aggregate('orders', ['customer', 'product'], filters={"product_id": [self.anvil]})), 2)
+
+        self.app.config['RATELIMIT_ENABLED'] = False
+        headers = {"Authorization": f"Bearer {encode_token('1', 'admin')}"}
+        response = self.app.test_client().get('/analytics/aggregate?fact=orders&dimensions=customer,product',
+                                              headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from app import create_app
+from config import TestingConfig
+from models import db, Customer, Product
+from services.order_service import OrderService
+from queries import analytics_queries
+from queries.analytics_queries import customer_lifetime_value
+from flask import g
+from cache import cache
+from utils.utils import encode_token
+from utils.analytics_cache import cache_stats, reset_cache_stats, cached_analytics
+
+calls = []
+
+
+@cached_analytics('orders')
+def slow_report(period='day'):
+    """Stand-in for a heavy aggregate that takes a while to run."""
+    calls.append(period)
+    time.sleep(0.2)
+    return {"period": period}
+
+
+class TestAnalyticsCache(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with one customer and one product."""
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        reset_cache_stats()
+
+        customer = Customer(name="Alice", email="alice@example.com", phone="5550000001")
+        product = Product(name="Widget", price=10.0, stock_quantity=100)
+        db.session.add_all([customer, product])
+        db.session.commit()
+        self.customer_id, self.product_id = customer.id, product.id
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def counters(self):
+        return cache_stats()["functions"]["customer_lifetime_value"]
+
+    def test_repeat_call_hits_cache(self):
+        """Test equivalent calls (defaults applied) share one cache entry."""
+        OrderService.create_order(self.customer_id, self.product_id, 5)
+        with patch.object(analytics_queries.db.session, 'query', wraps=analytics_queries.db.session.query) as query:
+            first = customer_lifetime_value(threshold=0)
+            self.assertEqual(customer_lifetime_value(0), first)
+            self.assertEqual(query.call_count, 1)
+        self.assertEqual(self.counters(), {"hits": 1, "misses": 1, "coalesced": 0, "stale": 0, "refreshes": 0})
+
+    def test_write_invalidates_entry(self):
+        """Test an order write on a dependent table forces recomputation."""
+        OrderService.create_order(self.customer_id, self.product_id, 5)
+        self.assertEqual(customer_lifetime_value(threshold=0)[0]["lifetime_value"], 50.0)
+        OrderService.create_order(self.customer_id, self.product_id, 1)
+        self.assertEqual(customer_lifetime_value(threshold=0)[0]["lifetime_value"], 60.0)
+        self.assertEqual(self.counters(), {"hits": 0, "misses": 2, "coalesced": 0, "stale": 0, "refreshes": 0})
+
+    def test_concurrent_identical_calls_coalesce(self):
+        """Test identical concurrent calls share one computation, with or without caching."""
+        for enabled in (True, False):
+            self.app.config['ANALYTICS_CACHE_ENABLED'] = enabled
+            calls.clear()
+            reset_cache_stats()
+            barrier, results = threading.Barrier(8), []
+
+            def call():
+                with self.app.app_context():
+                    barrier.wait()
+                    results.append(slow_report(period='week' if enabled else 'month'))
+
+            threads = [threading.Thread(target=call) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(len(results), 8)
+            counters = cache_stats()["functions"]["slow_report"]
+            self.assertEqual(counters["misses"], 1)
+            self.assertEqual(counters["coalesced"] + counters["hits"], 7)
+            self.assertEqual(cache_stats()["in_flight"], 0)
+
+    def test_stale_while_revalidate(self):
+        """Test an invalidated entry is served stale within max_stale and refreshed in the background."""
+        calls.clear()
+        slow_report(period='year')
+        OrderService.create_order(self.customer_id, self.product_id, 1)  # Invalidates the entry
+
+        g.analytics_max_stale = 60
+        started = time.monotonic()
+        self.assertEqual(slow_report(period='year'), {"period": "year"})
+        self.assertLess(time.monotonic() - started, 0.1)  # Did not wait for the query
+        self.assertEqual(g.analytics_cache_status, 'STALE')
+
+        deadline = time.monotonic() + 5
+        while cache_stats()["refreshing"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(len(calls), 2)  # Initial computation plus one background refresh
+
+        g.pop('analytics_cache_status')
+        slow_report(period='year')
+        self.assertEqual(g.analytics_cache_status, 'HIT')
+        counters = cache_stats()["functions"]["slow_report"]
+        self.assertEqual((counters["stale"], counters["refreshes"]), (1, 1))
+
+        g.analytics_max_stale = 0
+        OrderService.create_order(self.customer_id, self.product_id, 1)
+        slow_report(period='year')
+        self.assertEqual(len(calls), 3)  # No staleness accepted: recomputed inline
+
+    def test_stale_read_falls_back_to_database_when_backend_is_down(self):
+        """Test a max_stale request computes the result when the latest-result lookup fails."""
+        calls.clear()
+        get = cache.get
+
+        def unavailable(key):
+            if key.startswith('analytics-latest'):
+                raise ConnectionError("cache backend unavailable")
+            return get(key)
+
+        g.analytics_max_stale = 60
+        with patch.object(cache, 'get', side_effect=unavailable):
+            self.assertEqual(slow_report(period='decade'), {"period": "decade"})
+        self.assertEqual(calls, ['decade'])
+        self.assertEqual(g.analytics_cache_status, 'MISS')
+
+    def test_dashboard_runs_queries_in_parallel(self):
+        """Test the dashboard's wall time tracks the slowest query, not the sum."""
+        def slow(result):
+            def query(*args, **kwargs):
+                time.sleep(0.3)
+                return result
+            return query
+
+        headers = {"Authorization": f"Bearer {encode_token('1', 'admin')}"}
+        self.app.config['RATELIMIT_ENABLED'] = False
+        with patch('blueprints.analytics_blueprint.analyze_employee_performance', slow(([], {}))), \
+                patch('blueprints.analytics_blueprint.top_selling_products', slow(([], {}))), \
+                patch('blueprints.analytics_blueprint.customer_lifetime_value', slow([])), \
+                patch('blueprints.analytics_blueprint.evaluate_production_efficiency', slow([])):
+            started = time.monotonic()
+            response = self.app.test_client().get('/analytics/dashboard?date=2024-03-01', headers=headers)
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.get_json()["data"]), {
+            'employee_performance', 'top_products', 'customer_lifetime_value', 'production_efficiency'
+        })
+        self.assertLess(elapsed, 0.9)
+
+        response = self.app.test_client().get('/analytics/dashboard?queries=top_products,bogus', headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_shared_backend_invalidates_other_processes(self):
+        """Test a write seen by one app invalidates entries read through another sharing the backend."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            class SharedConfig(TestingConfig):
+                CACHE_TYPE = 'FileSystemCache'
+                CACHE_DIR = cache_dir
+                SQLALCHEMY_DATABASE_URI = f"sqlite:///{cache_dir}/shared.db"
+
+            writer, reader = create_app(SharedConfig), create_app(SharedConfig)
+            with writer.app_context():
+                db.create_all()
+                db.session.add_all([
+                    Customer(name="Bob", email="bob@example.com", phone="5550000002"),
+                    Product(name="Gear", price=1.0, stock_quantity=10)
+                ])
+                db.session.commit()
+                OrderService.create_order(1, 1, 2)
+            with reader.app_context():
+                self.assertEqual(customer_lifetime_value(threshold=0)[0]["lifetime_value"], 2.0)
+                self.assertEqual(customer_lifetime_value(threshold=0)[0]["lifetime_value"], 2.0)  # Cached
+            with writer.app_context():
+                OrderService.create_order(1, 1, 3)
+            with reader.app_context():
+                self.assertEqual(customer_lifetime_value(threshold=0)[0]["lifetime_value"], 5.0)
+                db.session.remove()
+                db.drop_all()
+            with writer.app_context():
+                db.session.remove()
+
+
+if __name__ == "__main__":
+    unittest.main()
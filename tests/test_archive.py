@@ -0,0 +1,133 @@
+import json
+import unittest
+from datetime import date, datetime, timedelta
+from sqlalchemy import select
+from app import create_app
+from config import TestingConfig
+from models import db, Customer, Employee, Product, Production, Order, OrderArchive, CustomerStats, with_deleted
+from services.archive_service import ArchiveService
+from services.customer_service import CustomerService
+from services.product_service import ProductService
+from queries.aggregate_queries import aggregate
+from queries.analytics_queries import analyze_employee_performance
+from utils.archive import combined_source, needs_archive
+from utils.utils import encode_token
+
+OLD = datetime(2020, 1, 15, 12, 0)
+RECENT = datetime.utcnow() - timedelta(days=10)
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with old and recent orders and production."""
+        class ArchiveConfig(TestingConfig):
+            RATELIMIT_ENABLED = False
+            ARCHIVE_PAUSE_SECONDS = 0
+
+        self.app = create_app(ArchiveConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        customer = Customer(name="Alice", email="alice@example.com", phone="5550000001")
+        employee = Employee(name="Bob", position="Operator", email="bob@example.com", phone="5550000002")
+        product = Product(name="Widget", price=2.0, stock_quantity=0)
+        db.session.add_all([customer, employee, product])
+        db.session.commit()
+        db.session.add_all([
+            Order(customer_id=customer.id, product_id=product.id, quantity=1, total_price=2.0, created_at=OLD),
+            Order(customer_id=customer.id, product_id=product.id, quantity=2, total_price=4.0, created_at=OLD),
+            Order(customer_id=customer.id, product_id=product.id, quantity=4, total_price=8.0, created_at=RECENT),
+            Production(product_id=product.id, employee_id=employee.id, quantity_produced=15,
+                       date_produced=OLD.date()),
+            Production(product_id=product.id, employee_id=employee.id, quantity_produced=5,
+                       date_produced=RECENT.date()),
+        ])
+        product.stock_quantity = 13  # Opening stock 0 + 20 produced - 7 ordered
+        db.session.commit()
+        db.session.get(Order, 2).soft_delete()
+        self.headers = {"Authorization": f"Bearer {encode_token('1', 'admin')}"}
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_moves_old_rows_in_batches(self):
+        """Test old rows (soft-deleted ones too) move in small batches and recent rows stay."""
+        self.assertFalse(needs_archive(Order))
+        result = ArchiveService.archive_orders(retention_days=365, batch_size=1)
+        self.assertEqual((result["moved"], result["batches"], result["done"]), (2, 2, True))
+        self.assertEqual([order.id for order in with_deleted(Order.query).all()], [3])
+        self.assertEqual(with_deleted(OrderArchive.query).count(), 2)
+        self.assertEqual(OrderArchive.query.count(), 1)  # The soft-deleted order stays hidden
+
+        result = ArchiveService.archive_productions(retention_days=365, max_batches=1)
+        self.assertEqual((result["moved"], Production.query.count()), (1, 1))
+
+        result = self.app.test_cli_runner().invoke(args=['archive-history', '--retention-days', '365'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Archived 0 orders rows", result.output)
+
+    def test_reads_union_archive_only_when_window_needs_it(self):
+        """Test exports and analytics include archived rows for old or open windows only."""
+        ArchiveService.archive_orders(retention_days=365)
+        ArchiveService.archive_productions(retention_days=365)
+        self.assertTrue(needs_archive(Order, date(2019, 1, 1)))
+        self.assertFalse(needs_archive(Order, RECENT.date()))
+
+        client = self.app.test_client()
+        response = client.get('/orders/export', headers=self.headers)
+        self.assertEqual([json.loads(line)["id"] for line in response.get_data(as_text=True).splitlines()], [1, 3])
+        response = client.get(f'/orders/export?date_from={RECENT.date().isoformat()}', headers=self.headers)
+        self.assertEqual([json.loads(line)["id"] for line in response.get_data(as_text=True).splitlines()], [3])
+
+        data, totals = analyze_employee_performance(since=date(2019, 1, 1))
+        self.assertEqual(totals["total_quantity"], 20)
+        data, totals = analyze_employee_performance(since=RECENT.date())
+        self.assertEqual(totals["total_quantity"], 5)
+
+        rows = aggregate('orders', [], ['sum:quantity'], {'since': date(2019, 1, 1)})
+        self.assertEqual(rows, [{"sum_quantity": 5}])
+
+    def test_read_models_keep_archived_history(self):
+        """Test stock reconciliation and read-model rebuilds still count archived rows."""
+        ArchiveService.archive_orders(retention_days=365)
+        ArchiveService.archive_productions(retention_days=365)
+
+        self.assertEqual(ProductService.reconcile_stock(dry_run=True)["drifted"], 0)
+        CustomerService.rebuild_customer_stats()
+        stats = db.session.get(CustomerStats, 1)
+        self.assertEqual((stats.order_count, stats.lifetime_value, stats.first_order_at), (2, 10.0, OLD))
+
+    def test_archived_ids_are_never_reused(self):
+        """Test archive, insert, archive again leaves every id unique across hot and archived rows."""
+        db.session.add(Order(customer_id=1, product_id=1, quantity=1, total_price=2.0, created_at=OLD))
+        db.session.commit()  # Order 4: old, and the newest id
+
+        result = ArchiveService.archive_orders(retention_days=365)
+        self.assertEqual(result["moved"], 2)  # Order 4 holds the highest id, so it stays for now
+        self.assertEqual([order.id for order in with_deleted(Order.query).order_by(Order.id)], [3, 4])
+
+        order = Order(customer_id=1, product_id=1, quantity=1, total_price=2.0, created_at=RECENT)
+        db.session.add(order)
+        db.session.commit()
+        self.assertEqual(order.id, 5)
+
+        result = ArchiveService.archive_orders(retention_days=365)
+        self.assertEqual(result["moved"], 1)
+        db.session.delete(order)
+        db.session.commit()
+        order = Order(customer_id=1, product_id=1, quantity=1, total_price=2.0, created_at=RECENT)
+        db.session.add(order)
+        db.session.commit()
+        self.assertEqual(order.id, 6)  # AUTOINCREMENT: a deleted newest id is not handed out again
+
+        source = combined_source(Order)
+        ids = db.session.scalars(select(source.id).order_by(source.id).execution_options(include_deleted=True)).all()
+        self.assertEqual(ids, [1, 2, 3, 4, 6])
+
+
+if __name__ == "__main__":
+    unittest.main()
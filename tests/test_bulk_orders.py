@@ -0,0 +1,94 @@
+import unittest
+from sqlalchemy import event, select, func
+from app import create_app
+from config import TestingConfig
+from models import db, Customer, Product, Order
+from utils.utils import encode_token
+
+
+class TestBulkOrders(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with one customer and two products."""
+        class BulkConfig(TestingConfig):
+            RATELIMIT_ENABLED = False
+
+        self.app = create_app(BulkConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        customer = Customer(name="Alice", email="alice@example.com", phone="5550000001")
+        widget = Product(name="Widget", price=2.0, stock_quantity=10)
+        gadget = Product(name="Gadget", price=5.0, stock_quantity=3)
+        db.session.add_all([customer, widget, gadget])
+        db.session.commit()
+        self.customer_id, self.widget_id, self.gadget_id = customer.id, widget.id, gadget.id
+
+        self.client = self.app.test_client()
+        self.headers = {"Authorization": f"Bearer {encode_token('1', 'user')}"}
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def stock(self, product_id):
+        """Reads a product's current stock from the database."""
+        db.session.expire_all()
+        return db.session.get(Product, product_id).stock_quantity
+
+    def test_partial_failures_reserve_stock_once_per_product(self):
+        """Test a mixed batch issues one stock UPDATE per product and only reserves for created orders."""
+        payload = [
+            {"customer_id": self.customer_id, "product_id": self.widget_id, "quantity": 3},
+            {"customer_id": 999, "product_id": self.widget_id, "quantity": 1},           # Unknown customer
+            {"customer_id": self.customer_id, "product_id": 999, "quantity": 1},         # Unknown product
+            {"customer_id": self.customer_id, "product_id": self.gadget_id, "quantity": 2},
+            {"customer_id": self.customer_id, "product_id": self.widget_id, "quantity": 4},
+            {"customer_id": self.customer_id, "product_id": self.gadget_id, "quantity": 2},  # Only 1 gadget left
+            {"customer_id": self.customer_id, "product_id": self.widget_id},              # Fails validation
+        ]
+
+        updates = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('UPDATE PRODUCTS'):
+                updates.append(parameters)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.post('/orders/bulk', json=payload, headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        body = response.get_json()
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((body["created"], body["failed"]), (3, 4))
+        self.assertEqual([result["status"] for result in body["results"]],
+                         ["created", "error", "error", "created", "created", "error", "error"])
+        self.assertEqual(body["results"][1]["errors"], "Customer not found.")
+        self.assertEqual(body["results"][2]["errors"], "Product not found.")
+        self.assertEqual(body["results"][5]["errors"], "Insufficient stock.")
+
+        self.assertEqual(len(updates), 2)  # One conditional UPDATE each for widget and gadget
+        self.assertEqual(self.stock(self.widget_id), 3)  # 10 - (3 + 4)
+        self.assertEqual(self.stock(self.gadget_id), 1)  # 3 - 2; the second gadget order did not fit
+        self.assertEqual(db.session.scalar(select(func.count()).select_from(Order)), 3)
+
+    def test_partly_sufficient_stock_fills_orders_in_index_order(self):
+        """Test stock that covers only some orders fills them in order, skipping just those that do not fit."""
+        payload = [
+            {"customer_id": self.customer_id, "product_id": self.widget_id, "quantity": 6},
+            {"customer_id": self.customer_id, "product_id": self.widget_id, "quantity": 6},
+            {"customer_id": self.customer_id, "product_id": self.widget_id, "quantity": 4},
+            {"customer_id": self.customer_id, "product_id": self.widget_id, "quantity": 1},
+        ]
+        body = self.client.post('/orders/bulk', json=payload, headers=self.headers).get_json()
+        self.assertEqual([result["status"] for result in body["results"]], ["created", "error", "created", "error"])
+        self.assertEqual(body["results"][1]["errors"], "Insufficient stock.")
+        self.assertEqual(self.stock(self.widget_id), 0)  # 10 - (6 + 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import create_app
+from config import TestingConfig
+from models import db, Customer, Product, Order
+from utils.utils import encode_token
+
+
+class TestCustomerOrders(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with one customer who has 12 orders."""
+        class CustomerOrdersConfig(TestingConfig):
+            RATELIMIT_ENABLED = False
+
+        self.app = create_app(CustomerOrdersConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        customer = Customer(name="Alice", email="alice@example.com", phone="5550000001")
+        other = Customer(name="Bob", email="bob@example.com", phone="5550000002")
+        product = Product(name="Widget", price=2.0, stock_quantity=100)
+        db.session.add_all([customer, other, product])
+        db.session.commit()
+        start = datetime(2024, 1, 1)
+        db.session.add_all([
+            Order(customer_id=customer.id, product_id=product.id, quantity=1, total_price=2.0,
+                  created_at=start + timedelta(days=i))
+            for i in range(12)
+        ] + [Order(customer_id=other.id, product_id=product.id, quantity=1, total_price=2.0, created_at=start)])
+        db.session.commit()
+        self.customer_id = customer.id
+        db.session.expunge_all()
+
+        self.client = self.app.test_client()
+        self.headers = {"Authorization": f"Bearer {encode_token('1', 'admin')}"}
+
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self.record)
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        event.remove(db.engine, 'before_cursor_execute', self.record)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def order_reads(self):
+        return [statement for statement in self.statements if 'FROM orders' in statement]
+
+    def test_get_customer_does_not_load_orders(self):
+        """Test a customer read never queries the orders table."""
+        response = self.client.get(f'/customers/{self.customer_id}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["name"], "Alice")
+        self.assertNotIn("orders", response.get_json())
+        self.assertEqual(self.order_reads(), [])
+
+    def test_customer_orders_are_paginated(self):
+        """Test /customers/<id>/orders returns pages of only that customer's orders."""
+        response = self.client.get(f'/customers/{self.customer_id}/orders?per_page=5&page=3', headers=self.headers)
+        body = response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((body["total"], body["pages"], body["page"], body["per_page"]), (12, 3, 3, 5))
+        self.assertEqual([order["id"] for order in body["orders"]], [11, 12])
+
+        seen, cursor = [], None
+        while True:
+            query = f'/customers/{self.customer_id}/orders?pagination=cursor&per_page=5'
+            body = self.client.get(query + (f'&cursor={cursor}' if cursor else ''), headers=self.headers).get_json()
+            self.assertLessEqual(len(body["orders"]), 5)
+            seen.extend(order["id"] for order in body["orders"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, list(range(1, 13)))
+
+        response = self.client.get('/customers/999/orders', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
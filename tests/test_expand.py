@@ -0,0 +1,91 @@
+import unittest
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import create_app
+from config import TestingConfig
+from models import db, Customer, Product, Order
+from utils.count_cache import clear_count_cache
+from utils.utils import encode_token
+
+
+@contextmanager
+def count_selects():
+    """Collects the SELECT statements sent to the database inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+class TestOrderExpand(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with 30 orders, each for its own customer and product."""
+        class ExpandConfig(TestingConfig):
+            RATELIMIT_ENABLED = False
+
+        self.app = create_app(ExpandConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        for i in range(30):
+            customer = Customer(name=f"Customer {i}", email=f"c{i}@example.com", phone=f"55500000{i:02d}")
+            product = Product(name=f"Product {i}", price=1.0 + i, stock_quantity=100)
+            db.session.add_all([customer, product])
+            db.session.flush()
+            db.session.add(Order(customer_id=customer.id, product_id=product.id, quantity=1, total_price=1.0 + i))
+        db.session.commit()
+        db.session.expunge_all()
+
+        self.client = self.app.test_client()
+        self.headers = {"Authorization": f"Bearer {encode_token('1', 'admin')}"}
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def list_orders(self, per_page):
+        """Lists one page of orders with both relationships expanded, counting SELECTs."""
+        clear_count_cache()  # Every page pays for its total
+        with count_selects() as statements:
+            response = self.client.get(f'/orders?expand=customer,product&per_page={per_page}', headers=self.headers)
+        db.session.expunge_all()  # Nothing cached in the identity map between pages
+        return response, statements
+
+    def test_expand_embeds_relationships(self):
+        """Test every expanded order carries its customer and product."""
+        response, _ = self.list_orders(5)
+        self.assertEqual(response.status_code, 200)
+        for order in response.get_json()["orders"]:
+            self.assertEqual(order["customer"]["name"], f"Customer {order['customer_id'] - 1}")
+            self.assertEqual(order["product"]["name"], f"Product {order['product_id'] - 1}")
+
+    def test_expand_issues_bounded_selects(self):
+        """Test the SELECT count does not grow with the page size (no N+1)."""
+        _, small = self.list_orders(5)
+        _, large = self.list_orders(30)
+        self.assertEqual(len(small), len(large))
+        self.assertLessEqual(len(large), 4)  # Orders page, total, one IN query per relationship
+
+        with count_selects() as plain:
+            self.client.get('/orders?per_page=30', headers=self.headers)
+        self.assertFalse([statement for statement in plain if 'FROM customers' in statement])
+
+    def test_invalid_expand_rejected(self):
+        """Test requesting an unknown relationship to expand is rejected."""
+        response = self.client.get('/orders?expand=warehouse', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Invalid expand value", response.get_data(as_text=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
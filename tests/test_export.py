@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+import unittest
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert
+from app import create_app
+from config import TestingConfig
+from models import db, Customer, Product, Order, Production
+from utils.export import EXPORT_BATCH_SIZE
+from utils.utils import encode_token
+
+# More rows than one server-side cursor batch, so several fetches are streamed
+ROWS = EXPORT_BATCH_SIZE * 2 + 7
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with more orders and production records than one export batch."""
+        class ExportConfig(TestingConfig):
+            RATELIMIT_ENABLED = False
+
+        self.app = create_app(ExportConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        customer = Customer(name="Alice", email="alice@example.com", phone="5550000001")
+        product = Product(name="Widget", price=2.0, stock_quantity=100)
+        db.session.add_all([customer, product])
+        db.session.commit()
+
+        start = datetime(2024, 1, 1)
+        db.session.execute(insert(Order), [
+            {"customer_id": customer.id, "product_id": product.id, "quantity": i % 5 + 1,
+             "total_price": (i % 5 + 1) * 2.0, "created_at": start + timedelta(minutes=i)}
+            for i in range(ROWS)
+        ])
+        db.session.execute(insert(Production), [
+            {"product_id": product.id, "quantity_produced": i % 7 + 1,
+             "date_produced": date(2024, 1, 1) + timedelta(days=i % 90)}
+            for i in range(ROWS)
+        ])
+        db.session.commit()
+
+        self.client = self.app.test_client()
+        self.headers = {"Authorization": f"Bearer {encode_token('1', 'admin')}"}
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_orders_ndjson_streams_every_row(self):
+        """Test the NDJSON export has one document per order, in sort order."""
+        response = self.client.get('/orders/export?format=ndjson', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertTrue(response.is_streamed)
+
+        documents = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([document["id"] for document in documents], list(range(1, ROWS + 1)))
+        self.assertEqual(documents[0]["created_at"], "2024-01-01T00:00:00")
+
+    def test_orders_csv_streams_every_row(self):
+        """Test the CSV export has a header and one line per order."""
+        response = self.client.get('/orders/export?format=csv&sort_order=desc', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/csv")
+
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual(rows[0][:2], ["id", "customer_id"])
+        self.assertEqual([int(row[0]) for row in rows[1:]], list(range(ROWS, 0, -1)))
+
+    def test_production_exports_every_row_in_both_formats(self):
+        """Test both production export formats carry every record."""
+        response = self.client.get('/production/export?format=ndjson', headers=self.headers)
+        ids = sorted(json.loads(line)["id"] for line in response.get_data(as_text=True).splitlines())
+        self.assertEqual(ids, list(range(1, ROWS + 1)))
+
+        response = self.client.get('/production/export?format=csv', headers=self.headers)
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual(len(rows), ROWS + 1)
+        self.assertEqual(sorted(int(row[0]) for row in rows[1:]), list(range(1, ROWS + 1)))
+
+    def test_invalid_parameters_rejected(self):
+        """Test unknown formats and sort orders are rejected with a 400 before streaming."""
+        for path in ('/orders/export?sort_order=sideways', '/production/export?sort_order=sideways'):
+            response = self.client.get(path, headers=self.headers)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("Invalid sort_order", response.get_data(as_text=True))
+
+        response = self.client.get('/orders/export?format=xml', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from app import create_app
+from config import TestingConfig
+from models import db, Order
+from utils.index_advisor import load_shapes, advise, reset_recorded_shapes, suggest_index
+
+
+class TestIndexAdvisor(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database that records query shapes to a temporary file."""
+        self.tempdir = tempfile.TemporaryDirectory()
+        shapes_file = os.path.join(self.tempdir.name, 'shapes.jsonl')
+
+        class AdvisorConfig(TestingConfig):
+            INDEX_ADVISOR_ENABLED = True
+            INDEX_ADVISOR_FILE = shapes_file
+
+        self.shapes_file = shapes_file
+        self.app = create_app(AdvisorConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        reset_recorded_shapes()
+
+    def tearDown(self):
+        """Drop the database, pop the app context and remove the shapes file."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        self.tempdir.cleanup()
+
+    def test_records_shapes_and_suggests_indexes(self):
+        """Test indexed filters pass, full scans are reported with a live-rows equality-sort-range index."""
+        Order.query.filter(Order.product_id.in_([1, 2])).order_by(Order.created_at).all()
+        Order.query.filter(Order.product_id.in_([1, 2, 3])).order_by(Order.created_at).all()  # Same shape
+        Order.query.filter(Order.quantity > 5).order_by(Order.total_price).all()
+
+        shapes = load_shapes(self.shapes_file)
+        self.assertEqual(len(shapes), 2)
+
+        report = advise(shapes)
+        self.assertEqual(report["analyzed"], 2)
+        self.assertEqual([finding["table"] for finding in report["findings"]], ["orders"])
+        self.assertEqual(list(report["suggestions"].values()),
+                         ["CREATE INDEX ix_orders_total_price_quantity_live ON orders (total_price, quantity) "
+                          "WHERE deleted_at IS NULL"])
+
+        result = self.app.test_cli_runner().invoke(args=['index-advisor', '--shapes-file', self.shapes_file])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("ix_orders_total_price_quantity_live", result.output)
+
+    def test_suggestion_orders_equality_sort_range(self):
+        """Test join/equality columns lead, then sort columns, then one range column."""
+        statement = ("SELECT orders.id FROM orders JOIN products ON products.id = orders.product_id "
+                     "WHERE orders.created_at >= ? AND orders.customer_id = ? ORDER BY orders.quantity")
+        self.assertEqual(suggest_index(statement, 'orders'), ['product_id', 'customer_id', 'quantity'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+from datetime import datetime
+from app import create_app
+from config import TestingConfig
+from models import db, Customer, Product, Order
+from sqlalchemy import text
+from utils.pagination import paginate, PaginationError
+from utils.count_cache import clear_count_cache, estimated_count
+
+SORTABLE_FIELDS = ['created_at', 'quantity', 'total_price']
+
+
+class TestPaginationEngine(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with a handful of orders."""
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        clear_count_cache()
+
+        customer = Customer(name="Alice", email="alice@example.com", phone="5550000001")
+        product = Product(name="Widget", price=2.5, stock_quantity=100)
+        db.session.add_all([customer, product])
+        db.session.commit()
+
+        # Duplicate sort values on purpose so the id tie-breaker is exercised
+        for i in range(23):
+            quantity = i % 4 + 1
+            db.session.add(Order(
+                customer_id=customer.id,
+                product_id=product.id,
+                quantity=quantity,
+                total_price=quantity * 2.5,
+                created_at=datetime(2024, 1, 1 + i % 5)
+            ))
+        db.session.commit()
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def walk(self, sort_by, sort_order):
+        """Follow next_cursor until exhausted and return the ids seen."""
+        seen, cursor = [], ''
+        while cursor is not None:
+            data = paginate(Order.query, Order, SORTABLE_FIELDS, sort_by, sort_order,
+                            per_page=5, cursor=cursor)
+            seen.extend(order.id for order in data["items"])
+            cursor = data["next_cursor"]
+        return seen
+
+    def test_cursor_mode_visits_every_row_once(self):
+        """Test keyset pages cover all rows exactly once for every sort."""
+        for sort_by in SORTABLE_FIELDS:
+            for sort_order in ('asc', 'desc'):
+                seen = self.walk(sort_by, sort_order)
+                self.assertEqual(sorted(seen), list(range(1, 24)), (sort_by, sort_order))
+
+    def test_cursor_mode_matches_offset_order(self):
+        """Test keyset order equals offset order with id as tie-breaker."""
+        expected = [o.id for o in Order.query.order_by(Order.quantity.desc(), Order.id.desc()).all()]
+        self.assertEqual(self.walk('quantity', 'desc'), expected)
+
+    def test_offset_mode_breaks_ties_by_id(self):
+        """Test offset pages over duplicate sort values visit every row once, in id order within a value."""
+        for sort_order in ('asc', 'desc'):
+            seen = []
+            for page in range(1, 6):
+                data = paginate(Order.query, Order, SORTABLE_FIELDS, 'quantity', sort_order, page=page, per_page=5)
+                seen.extend(order.id for order in data["items"])
+            expected = Order.query.order_by(Order.quantity, Order.id).all() if sort_order == 'asc' else \
+                Order.query.order_by(Order.quantity.desc(), Order.id.desc()).all()
+            self.assertEqual(seen, [order.id for order in expected])
+
+    def test_tampered_cursor_rejected(self):
+        """Test a modified cursor fails signature validation."""
+        data = paginate(Order.query, Order, SORTABLE_FIELDS, 'quantity', per_page=5, mode='cursor')
+        with self.assertRaises(PaginationError):
+            paginate(Order.query, Order, SORTABLE_FIELDS, 'quantity', cursor=data["next_cursor"] + "x")
+
+    def test_cursor_for_other_sort_rejected(self):
+        """Test a cursor cannot be replayed against a different sort."""
+        data = paginate(Order.query, Order, SORTABLE_FIELDS, 'quantity', per_page=5, mode='cursor')
+        with self.assertRaises(PaginationError):
+            paginate(Order.query, Order, SORTABLE_FIELDS, 'total_price', cursor=data["next_cursor"])
+
+    def test_after_id_mode(self):
+        """Test seek-after-id walks by primary key."""
+        data = paginate(Order.query, Order, SORTABLE_FIELDS, 'created_at', per_page=10, after_id=20)
+        self.assertEqual([o.id for o in data["items"]], [21, 22, 23])
+        self.assertIsNone(data["next_after_id"])
+
+    def test_offset_mode_metadata(self):
+        """Test offset mode keeps total/pages metadata for old clients."""
+        data = paginate(Order.query, Order, SORTABLE_FIELDS, 'created_at', page=2, per_page=10)
+        self.assertEqual(data["total"], 23)
+        self.assertEqual(data["pages"], 3)
+        self.assertEqual(len(data["items"]), 10)
+
+    def test_cached_total_invalidated_by_write(self):
+        """Test the cached total is reused until the table is written."""
+        first = paginate(Order.query, Order, SORTABLE_FIELDS, 'created_at')
+        db.session.execute(text("DELETE FROM orders WHERE id = 1"))  # Bypasses version tracking
+        db.session.commit()
+        self.assertEqual(paginate(Order.query, Order, SORTABLE_FIELDS, 'created_at')["total"], first["total"])
+
+        db.session.delete(Order.query.get(2))
+        db.session.commit()
+        self.assertEqual(paginate(Order.query, Order, SORTABLE_FIELDS, 'created_at')["total"], 21)
+
+    def test_approximate_total(self):
+        """Test approximate totals use table statistics when available."""
+        data = paginate(Order.query, Order, SORTABLE_FIELDS, 'created_at', meta='approximate')
+        self.assertEqual(data["total"], 23)
+        self.assertNotIn("total_approximate", data)  # No statistics yet, exact fallback
+
+        db.session.execute(text("ANALYZE"))
+        data = paginate(Order.query, Order, SORTABLE_FIELDS, 'created_at', meta='approximate')
+        self.assertTrue(data["total_approximate"])
+        self.assertEqual(data["total"], 23)
+
+    def test_failed_statistics_probe_keeps_transaction(self):
+        """Test a failing statistics probe is rolled back alone, leaving pending work in the transaction."""
+        db.session.add(Order(customer_id=1, product_id=1, quantity=1, total_price=2.5, created_at=datetime(2024, 2, 1)))
+        db.session.flush()
+        with self.assertLogs('utils.count_cache', level='INFO'):
+            total, is_estimate = estimated_count(Order.query, 'orders')  # No sqlite_stat1 yet
+        self.assertEqual((total, is_estimate), (24, False))
+        db.session.commit()
+        self.assertEqual(Order.query.count(), 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
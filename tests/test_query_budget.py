@@ -0,0 +1,111 @@
+import time
+import unittest
+from unittest.mock import patch
+from sqlalchemy import event, text
+from app import create_app
+from config import TestingConfig
+from models import db, Customer, Product
+from services.order_service import OrderService
+from utils.query_budget import query_budget, QueryBudgetExceeded
+from utils.utils import encode_token
+
+# Counts to a large number one row at a time; takes seconds without a budget
+SLOW_SQL = text(
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :limit) SELECT count(*) FROM n"
+)
+
+
+class TestQueryBudget(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with tight budgets and three customers with orders."""
+        class BudgetConfig(TestingConfig):
+            RATELIMIT_ENABLED = False
+            ANALYTICS_QUERY_BUDGETS = {
+                'default': {'timeout_ms': 200, 'max_rows': None},
+                'customer_lifetime_value': {'timeout_ms': 200, 'max_rows': 2},
+                'top_products': {'max_rows': 1},
+            }
+
+        self.app = create_app(BudgetConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        product = Product(name="Widget", price=1.0, stock_quantity=1000)
+        customers = [Customer(name=f"C{index}", email=f"c{index}@example.com", phone=f"555000000{index}")
+                     for index in range(3)]
+        db.session.add_all([product] + customers)
+        db.session.commit()
+        for quantity, customer in zip((10, 20, 30), customers):
+            OrderService.create_order(customer.id, product.id, quantity)
+        self.headers = {"Authorization": f"Bearer {encode_token('1', 'admin')}"}
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_slow_statement_is_cancelled(self):
+        """Test a statement past its deadline is interrupted, and later statements run unbounded."""
+        started = time.monotonic()
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget('aggregate'):
+                db.session.execute(SLOW_SQL, {"limit": 10 ** 9}).scalar()
+        self.assertLess(time.monotonic() - started, 1)
+
+        self.assertEqual(db.session.execute(SLOW_SQL, {"limit": 10 ** 5}).scalar(), 10 ** 5)
+
+    def test_routes_return_partial_or_503(self):
+        """Test row caps give a partial result and timeouts a 503 with Retry-After."""
+        client = self.app.test_client()
+        response = client.get('/analytics/customer-lifetime-value?threshold=0', headers=self.headers)
+        body = response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((body["status"], body["truncated"], body["max_rows"]), ("partial", True, 2))
+        self.assertEqual([row["customer"] for row in body["data"]], ["C2", "C1"])
+
+        def slow(*args, **kwargs):
+            return db.session.execute(SLOW_SQL, {"limit": 10 ** 9}).scalar()
+
+        with patch('blueprints.analytics_blueprint.evaluate_production_efficiency', slow):
+            response = client.get('/analytics/production-efficiency?date=2024-03-01', headers=self.headers)
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers['Retry-After'], '1')
+
+            response = client.get('/analytics/dashboard?queries=production_efficiency,customer_lifetime_value'
+                                  '&date=2024-03-01&threshold=0', headers=self.headers)
+            body = response.get_json()
+            self.assertEqual(body["status"], "partial")
+            self.assertIn("budget", body["data"]["production_efficiency"]["error"])
+            self.assertTrue(body["data"]["customer_lifetime_value"]["truncated"])
+
+    def test_row_budget_is_pushed_into_sql(self):
+        """Test ranked queries read at most max_rows + 1 rows and report the cut as partial."""
+        other = Product(name="Gadget", price=1.0, stock_quantity=1000)
+        db.session.add(other)
+        db.session.commit()
+        OrderService.create_order(1, other.id, 5)
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if 'rank()' in statement.lower():
+                statements.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.app.test_client().get('/analytics/top-products?limit=10', headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        body = response.get_json()
+        self.assertEqual((body["status"], body["truncated"], body["max_rows"]), ("partial", True, 1))
+        self.assertEqual([row["product"] for row in body["data"]], ["Widget"])
+        statement, parameters = statements[0]
+        self.assertIn("LIMIT", statement)
+        self.assertIn(2, parameters)  # max_rows + 1, so the cut is detectable
+
+
+if __name__ == "__main__":
+    unittest.main()
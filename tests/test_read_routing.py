@@ -0,0 +1,78 @@
+import tempfile
+import time
+import unittest
+from app import create_app
+from config import TestingConfig
+from models import db, Customer, Product
+from utils.utils import encode_token
+
+
+class TestReadRouting(unittest.TestCase):
+    def setUp(self):
+        """Create a primary and a replica SQLite file with the same schema but different rows."""
+        self.tempdir = tempfile.TemporaryDirectory()
+
+        class ReplicaConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{self.tempdir.name}/primary.db"
+            SQLALCHEMY_BINDS = {'replica': f"sqlite:///{self.tempdir.name}/replica.db"}
+            READ_YOUR_WRITES_SECONDS = 1
+            RATELIMIT_ENABLED = False
+
+        self.app = create_app(ReplicaConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        db.metadata.create_all(db.engines['replica'])
+
+        db.session.add_all([
+            Customer(name="Alice", email="alice@example.com", phone="5550000001"),
+            Product(name="Primary Widget", price=10.0, stock_quantity=100),
+        ])
+        db.session.commit()
+        with db.engines['replica'].begin() as connection:  # Replica lags: it has an older product name
+            connection.execute(Product.__table__.insert(), {"id": 1, "name": "Replica Widget", "price": 10.0,
+                                                            "stock_quantity": 100})
+
+        self.client = self.app.test_client()
+        self.headers = {"Authorization": f"Bearer {encode_token('1', 'admin')}"}
+        self.user_headers = {"Authorization": f"Bearer {encode_token('1', 'user')}"}  # Same client, order role
+
+    def tearDown(self):
+        """Drop both databases and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        db.metadata.drop_all(db.engines['replica'])
+        for engine in db.engines.values():
+            engine.dispose()
+        self.app_context.pop()
+        db.metadatas.pop('replica', None)  # Registered on the shared db object by init_app
+        self.tempdir.cleanup()
+
+    def product_names(self):
+        response = self.client.get('/products', headers=self.headers)
+        return [product["name"] for product in response.get_json()["products"]]
+
+    def test_listings_read_replica_until_client_writes(self):
+        """Test listings use the replica, and a writing client sticks to the primary for a while."""
+        self.assertEqual(self.product_names(), ["Replica Widget"])
+
+        response = self.client.post('/orders', headers=self.user_headers,
+                                    json={"customer_id": 1, "product_id": 1, "quantity": 1})
+        self.assertEqual(response.status_code, 201)  # Writes go to the primary
+        self.assertEqual(self.product_names(), ["Primary Widget"])
+
+        other = {"Authorization": f"Bearer {encode_token('2', 'admin')}"}
+        response = self.client.get('/products', headers=other)
+        self.assertEqual([product["name"] for product in response.get_json()["products"]], ["Replica Widget"])
+
+        time.sleep(1.1)
+        self.assertEqual(self.product_names(), ["Replica Widget"])
+
+    def test_single_record_reads_stay_on_primary(self):
+        """Test routes that did not opt in keep reading the primary."""
+        response = self.client.get('/products/1', headers=self.headers)
+        self.assertEqual(response.get_json()["name"], "Primary Widget")
+
+
+if __name__ == "__main__":
+    unittest.main()
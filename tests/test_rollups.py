@@ -0,0 +1,298 @@
+import unittest
+from datetime import date, datetime
+from sqlalchemy import func
+from app import create_app
+from config import TestingConfig
+from models import db, Customer, Employee, Product, Production, ProductionDailyRollup, Order, CustomerStats, ProductSalesDailyRollup
+from services.product_service import ProductService
+from services.production_service import ProductionService
+from services.order_service import OrderService
+from services.customer_service import CustomerService
+from queries.analytics_queries import (
+    evaluate_production_efficiency, customer_lifetime_value, top_selling_products, production_series,
+    analyze_employee_performance
+)
+
+
+class TestProductionDailyRollup(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with two products."""
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        widget = Product(name="Widget", price=2.0, stock_quantity=100)
+        gadget = Product(name="Gadget", price=3.0, stock_quantity=100)
+        db.session.add_all([widget, gadget])
+        db.session.commit()
+        self.widget_id, self.gadget_id = widget.id, gadget.id
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def rollup(self):
+        """Returns live rollup rows as {(day, product_id): quantity}."""
+        rows = ProductionDailyRollup.query.filter(ProductionDailyRollup.record_count > 0).all()
+        return {(row.day, row.product_id): row.quantity_produced for row in rows}
+
+    def raw(self):
+        """Aggregates production history directly, for comparison."""
+        rows = db.session.query(
+            Production.date_produced, Production.product_id, func.sum(Production.quantity_produced)
+        ).group_by(Production.date_produced, Production.product_id).all()
+        return {(day, product_id): total for day, product_id, total in rows}
+
+    def test_rollup_tracks_every_write(self):
+        """Test create, update, delete and bulk ingestion keep the rollup exact."""
+        first = ProductionService.create_production(self.widget_id, 5, "2024-03-01")
+        second = ProductionService.create_production(self.widget_id, 7, "2024-03-01")
+        ProductionService.create_production(self.gadget_id, 2, "2024-03-01")
+        self.assertEqual(self.rollup()[(date(2024, 3, 1), self.widget_id)], 12)
+
+        ProductionService.update_production(first.id, quantity_produced=9)
+        ProductionService.update_production(second.id, date_produced="2024-03-02")
+        ProductionService.delete_production(first.id)
+        ProductionService.ingest_productions(iter([
+            (2, {"product_id": self.gadget_id, "quantity_produced": 4, "date_produced": date(2024, 3, 1)}, {}),
+            (3, {"product_id": self.gadget_id, "quantity_produced": 1, "date_produced": date(2024, 3, 1)}, {}),
+        ]))
+
+        self.assertEqual(self.rollup(), self.raw())
+        self.assertEqual(self.rollup()[(date(2024, 3, 1), self.gadget_id)], 7)
+        self.assertNotIn((date(2024, 3, 1), self.widget_id), self.rollup())
+
+    def test_backfill_rebuilds_rollup(self):
+        """Test the backfill recomputes the rollup from raw history."""
+        db.session.add_all([
+            Production(product_id=self.widget_id, quantity_produced=3, date_produced=date(2024, 3, 1)),
+            Production(product_id=self.widget_id, quantity_produced=4, date_produced=date(2024, 3, 1)),
+            Production(product_id=self.gadget_id, quantity_produced=6, date_produced=date(2024, 3, 2)),
+        ])
+        db.session.commit()  # Bypasses the service, so the rollup is stale
+
+        result = ProductionService.backfill_daily_rollup(batch_size=1)
+        self.assertEqual(result["products"], 2)
+        self.assertEqual(self.rollup(), self.raw())
+
+    def test_efficiency_reads_rollup(self):
+        """Test production efficiency totals come from the rollup."""
+        ProductionService.create_production(self.widget_id, 5, "2024-03-01")
+        ProductionService.create_production(self.widget_id, 6, "2024-03-01")
+        ProductionService.create_production(self.gadget_id, 8, "2024-03-02")
+        self.assertEqual(evaluate_production_efficiency(date(2024, 3, 1)), [{"product": "Widget", "total_produced": 11}])
+
+    def test_production_series_buckets_and_zero_fill(self):
+        """Test series are bucketed, zero-filled and column-oriented."""
+        ProductionService.create_production(self.widget_id, 5, "2024-02-27")
+        ProductionService.create_production(self.widget_id, 6, "2024-03-04")
+        ProductionService.create_production(self.gadget_id, 8, "2024-03-05")
+
+        daily = production_series(date(2024, 3, 3), date(2024, 3, 5))
+        self.assertEqual(daily["buckets"], ["2024-03-03", "2024-03-04", "2024-03-05"])
+        self.assertEqual(daily["products"], ["Widget", "Gadget"])
+        self.assertEqual(daily["values"], [[0, 6, 0], [0, 0, 8]])
+        self.assertEqual(daily["totals"], [0, 6, 8])
+
+        weekly = production_series(date(2024, 2, 26), date(2024, 3, 10), bucket='week', product_id=self.widget_id)
+        self.assertEqual(weekly["buckets"], ["2024-02-26", "2024-03-04"])
+        self.assertEqual(weekly["values"], [[5, 6]])
+
+        monthly = production_series(date(2024, 1, 15), date(2024, 3, 31), bucket='month')
+        self.assertEqual(monthly["buckets"], ["2024-01-01", "2024-02-01", "2024-03-01"])
+        self.assertEqual(monthly["totals"], [0, 5, 14])
+
+
+class TestCustomerStats(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with two customers and a product."""
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        alice = Customer(name="Alice", email="alice@example.com", phone="5550000001")
+        bob = Customer(name="Bob", email="bob@example.com", phone="5550000002")
+        product = Product(name="Widget", price=10.0, stock_quantity=1000)
+        db.session.add_all([alice, bob, product])
+        db.session.commit()
+        self.alice_id, self.bob_id, self.product_id = alice.id, bob.id, product.id
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def stats(self):
+        """Returns customer_stats rows as {customer_id: (count, value, first, last)}."""
+        db.session.expire_all()
+        return {
+            row.customer_id: (row.order_count, row.lifetime_value, row.first_order_at, row.last_order_at)
+            for row in CustomerStats.query.all()
+        }
+
+    def raw(self):
+        """Aggregates the orders table directly, for comparison."""
+        rows = db.session.query(
+            Order.customer_id, func.count(Order.id), func.sum(Order.total_price),
+            func.min(Order.created_at), func.max(Order.created_at)
+        ).group_by(Order.customer_id).all()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def test_stats_track_every_write(self):
+        """Test create, bulk create, update and delete keep customer_stats exact."""
+        first = OrderService.create_order(self.alice_id, self.product_id, 2)
+        OrderService.create_orders_bulk([
+            (0, {"customer_id": self.alice_id, "product_id": self.product_id, "quantity": 3}),
+            (1, {"customer_id": self.bob_id, "product_id": self.product_id, "quantity": 1}),
+        ])
+        self.assertEqual(self.stats()[self.alice_id][:2], (2, 50.0))
+
+        OrderService.update_order(first.id, quantity=5)
+        self.assertEqual(self.stats()[self.alice_id][:2], (2, 80.0))
+
+        bob_order = Order.query.filter_by(customer_id=self.bob_id).one()
+        OrderService.delete_order(bob_order.id)
+        self.assertEqual(self.stats()[self.bob_id], (0, 0.0, None, None))
+
+        db.session.execute(
+            Order.__table__.update().where(Order.id == first.id).values(created_at=datetime(2020, 1, 1))
+        )
+        db.session.commit()
+        CustomerService.rebuild_customer_stats(batch_size=1)
+        self.assertEqual({k: v for k, v in self.stats().items() if v[0]}, self.raw())
+
+    def test_lifetime_value_threshold(self):
+        """Test the threshold query reads customer_stats, highest value first."""
+        OrderService.create_order(self.alice_id, self.product_id, 20)
+        OrderService.create_order(self.bob_id, self.product_id, 150)
+        self.assertEqual(customer_lifetime_value(threshold=100), [
+            {"customer": "Bob", "lifetime_value": 1500.0},
+            {"customer": "Alice", "lifetime_value": 200.0},
+        ])
+        self.assertEqual(customer_lifetime_value(threshold=1000), [{"customer": "Bob", "lifetime_value": 1500.0}])
+
+
+class TestProductSalesRollup(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with one customer and three products."""
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        customer = Customer(name="Alice", email="alice@example.com", phone="5550000001")
+        products = [Product(name=name, price=1.0, stock_quantity=1000) for name in ("Anvil", "Bolt", "Cog")]
+        db.session.add_all([customer] + products)
+        db.session.commit()
+        self.customer_id = customer.id
+        self.anvil, self.bolt, self.cog = (product.id for product in products)
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def order(self, product_id, quantity, day):
+        """Inserts an order dated `day` directly, bypassing the read models."""
+        db.session.add(Order(customer_id=self.customer_id, product_id=product_id, quantity=quantity,
+                             total_price=float(quantity), created_at=datetime.combine(day, datetime.min.time())))
+        db.session.commit()
+
+    def test_rollup_tracks_order_writes(self):
+        """Test order create, update and delete keep today's sales rollup exact."""
+        order = OrderService.create_order(self.customer_id, self.anvil, 3)
+        OrderService.create_order(self.customer_id, self.anvil, 2)
+        OrderService.update_order(order.id, quantity=7)
+        OrderService.delete_order(order.id)
+        row = ProductSalesDailyRollup.query.one()
+        self.assertEqual((row.product_id, row.quantity_sold, row.order_count), (self.anvil, 2, 1))
+
+    def test_top_k_window_with_ties(self):
+        """Test top-K ranks only days in the window and keeps ties at the cut-off."""
+        self.order(self.anvil, 50, date(2024, 1, 1))  # Outside the window
+        self.order(self.bolt, 5, date(2024, 2, 1))
+        self.order(self.cog, 3, date(2024, 2, 2))
+        self.order(self.cog, 2, date(2024, 2, 3))
+        self.order(self.anvil, 1, date(2024, 2, 3))
+        ProductService.backfill_sales_rollup(batch_size=2)
+
+        data, totals = top_selling_products(limit=1, since=date(2024, 2, 1), until=date(2024, 2, 28))
+        self.assertEqual([(item["rank"], item["product"], item["tied"]) for item in data],
+                         [(1, "Bolt", True), (1, "Cog", True)])
+        self.assertEqual(totals, {"total_sold": 11, "revenue": 11.0, "products": 3})
+
+        data, _ = top_selling_products(limit=2)
+        self.assertEqual([item["product"] for item in data], ["Anvil", "Bolt", "Cog"])
+
+    def test_top_k_ranks_only_live_products(self):
+        """Test a soft-deleted product leaves no gap in the ranks and no share in the totals."""
+        self.order(self.anvil, 9, date(2024, 2, 1))
+        self.order(self.bolt, 5, date(2024, 2, 1))
+        self.order(self.cog, 3, date(2024, 2, 1))
+        ProductService.backfill_sales_rollup()
+        db.session.get(Product, self.anvil).soft_delete()
+
+        data, totals = top_selling_products(limit=10)
+        self.assertEqual([(item["rank"], item["product"]) for item in data], [(1, "Bolt"), (2, "Cog")])
+        self.assertEqual(totals, {"total_sold": 8, "revenue": 8.0, "products": 2})
+
+
+class TestEmployeePerformance(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with three employees (two namesakes) and a product."""
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        employees = [
+            Employee(name=name, position="Operator", email=f"{index}@example.com", phone=f"555000000{index}")
+            for index, name in enumerate(("Sam", "Sam", "Kim"))
+        ]
+        product = Product(name="Widget", price=1.0, stock_quantity=0)
+        db.session.add_all(employees + [product])
+        db.session.commit()
+        self.first_sam, self.second_sam, self.kim = (employee.id for employee in employees)
+        self.product_id = product.id
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_ranks_by_employee_id_within_window(self):
+        """Test namesakes stay apart, the window is honoured and ties share a rank."""
+        ProductionService.create_production(self.product_id, 5, "2024-03-01", employee_id=self.first_sam)
+        ProductionService.create_production(self.product_id, 7, "2024-03-02", employee_id=self.second_sam)
+        ProductionService.create_production(self.product_id, 40, "2024-01-01", employee_id=self.kim)  # Outside
+        ProductionService.create_production(self.product_id, 9, "2024-03-01")  # Unattributed
+        ProductionService.ingest_productions(iter([
+            (2, {"product_id": self.product_id, "quantity_produced": 2, "date_produced": date(2024, 3, 3),
+                 "employee_id": self.kim}, {}),
+            (3, {"product_id": self.product_id, "quantity_produced": 1, "date_produced": date(2024, 3, 3),
+                 "employee_id": 999}, {}),
+        ]))
+        production = Production.query.filter_by(employee_id=self.first_sam).one()
+        ProductionService.update_production(production.id, quantity_produced=2)
+
+        data, totals = analyze_employee_performance(since=date(2024, 3, 1), until=date(2024, 3, 31))
+        self.assertEqual([(item["rank"], item["employee_id"], item["total_quantity"]) for item in data],
+                         [(1, self.second_sam, 7), (2, self.first_sam, 2), (2, self.kim, 2)])
+        self.assertEqual(totals, {"total_quantity": 11, "employees": 3})
+
+        data, _ = analyze_employee_performance(limit=1)
+        self.assertEqual([(item["employee"], item["total_quantity"]) for item in data], [("Kim", 42)])
+
+        with self.assertRaises(Exception):
+            ProductionService.create_production(self.product_id, 1, "2024-03-01", employee_id=999)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from sqlalchemy import func, select, text
+from app import create_app
+from config import TestingConfig
+from models import (
+    db, Customer, Order, Product, Production, CustomerStats, ProductSalesDailyRollup, ProductionDailyRollup,
+    with_deleted
+)
+from services.customer_service import CustomerService
+from services.order_service import OrderService
+from services.product_service import ProductService
+from services.production_service import ProductionService
+from utils.utils import encode_token
+
+
+class TestSoftDelete(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with two products, one of them soft-deleted, and one order each."""
+        class SoftDeleteConfig(TestingConfig):
+            RATELIMIT_ENABLED = False
+
+        self.app = create_app(SoftDeleteConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        customer = Customer(name="Alice", email="alice@example.com", phone="5550000001")
+        live = Product(name="Live Widget", price=2.0, stock_quantity=10)
+        dead = Product(name="Dead Widget", price=3.0, stock_quantity=10)
+        db.session.add_all([customer, live, dead])
+        db.session.commit()
+        db.session.add_all([
+            Order(customer_id=customer.id, product_id=live.id, quantity=1, total_price=2.0),
+            Order(customer_id=customer.id, product_id=dead.id, quantity=1, total_price=3.0),
+        ])
+        db.session.commit()
+        dead.soft_delete()
+        db.session.get(Order, 2).soft_delete()
+        db.session.expunge_all()
+        self.headers = {"Authorization": f"Bearer {encode_token('1', 'admin')}"}
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_reads_hide_deleted_rows_unless_included(self):
+        """Test queries, statements and relationship loads skip deleted rows, with an explicit opt-out."""
+        self.assertEqual([product.name for product in Product.query.all()], ["Live Widget"])
+        self.assertEqual(with_deleted(Product.query).count(), 2)
+        self.assertEqual(db.session.scalar(select(func.sum(Order.total_price))), 2.0)
+        self.assertEqual(db.session.scalar(
+            select(func.sum(Order.total_price)).execution_options(include_deleted=True)), 5.0)
+        self.assertEqual(len(Customer.query.one().orders), 1)
+
+    def test_listing_include_deleted(self):
+        """Test listings and their totals exclude deleted rows unless include_deleted=true."""
+        client = self.app.test_client()
+        body = client.get('/products', headers=self.headers).get_json()
+        self.assertEqual(([product["name"] for product in body["products"]], body["total"]), (["Live Widget"], 1))
+
+        body = client.get('/products?include_deleted=true', headers=self.headers).get_json()
+        self.assertEqual(body["total"], 2)
+        self.assertEqual(sorted(product["name"] for product in body["products"]), ["Dead Widget", "Live Widget"])
+
+    def test_deleted_rows_keep_unique_values_and_stock(self):
+        """Test uniqueness checks still see deleted rows and stock reconciliation counts them."""
+        db.session.get(Customer, 1).soft_delete()
+        with self.assertRaises(ValueError):
+            CustomerService.create_customer("Alice Again", "alice@example.com", "5550000002")
+
+        result = ProductService.reconcile_stock(dry_run=True)
+        self.assertEqual(result["checked"], 2)
+
+    def read_models(self):
+        """Reads customer_stats and both daily rollups (rows with a zero count are inert)."""
+        db.session.expire_all()
+        stats = db.session.get(CustomerStats, 1)
+        sales = db.session.execute(
+            select(ProductSalesDailyRollup.day, ProductSalesDailyRollup.product_id,
+                   ProductSalesDailyRollup.quantity_sold, ProductSalesDailyRollup.revenue)
+            .where(ProductSalesDailyRollup.order_count != 0)
+            .order_by(ProductSalesDailyRollup.day, ProductSalesDailyRollup.product_id)
+        ).all()
+        production = db.session.execute(
+            select(ProductionDailyRollup.day, ProductionDailyRollup.product_id,
+                   ProductionDailyRollup.quantity_produced, ProductionDailyRollup.record_count)
+            .where(ProductionDailyRollup.record_count != 0)
+            .order_by(ProductionDailyRollup.day, ProductionDailyRollup.product_id)
+        ).all()
+        return (stats.order_count, stats.lifetime_value, stats.first_order_at, stats.last_order_at), sales, production
+
+    def rebuild_read_models(self):
+        """Rebuilds every read model from the raw history."""
+        CustomerService.rebuild_customer_stats()
+        ProductService.backfill_sales_rollup()
+        ProductionService.backfill_daily_rollup()
+
+    def test_soft_delete_and_restore_keep_read_models_in_step_with_rebuilds(self):
+        """Test soft deletion and restore move the read models exactly as far as a rebuild would."""
+        self.rebuild_read_models()
+        OrderService.create_order(1, 1, 2)
+        order_id = OrderService.create_order(1, 1, 3).id
+        ProductionService.create_production(1, 4, "2024-03-01")
+        production_id = ProductionService.create_production(1, 6, "2024-03-02").id
+
+        db.session.get(Order, order_id).soft_delete()
+        db.session.get(Production, production_id).soft_delete()
+        incremental = self.read_models()
+        self.assertEqual(incremental[0][:2], (2, 6.0))  # Order 1 and the live new order
+        self.assertEqual([row.quantity_produced for row in incremental[2]], [4])
+        self.rebuild_read_models()
+        self.assertEqual(self.read_models(), incremental)
+
+        with_deleted(Order.query).filter_by(id=order_id).one().restore()
+        with_deleted(Production.query).filter_by(id=production_id).one().restore()
+        incremental = self.read_models()
+        self.assertEqual(incremental[0][:2], (3, 12.0))
+        self.assertEqual([row.quantity_produced for row in incremental[2]], [4, 6])
+        self.rebuild_read_models()
+        self.assertEqual(self.read_models(), incremental)
+
+    def test_live_listing_uses_partial_index(self):
+        """Test the default order listing reads the live-rows partial index."""
+        plan = db.session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM orders WHERE orders.deleted_at IS NULL ORDER BY created_at, id"
+        )).all()
+        self.assertIn("ix_orders_live_created_at_id", plan[-1][-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+from datetime import date
+from sqlalchemy import update
+from app import create_app
+from config import TestingConfig
+from models import db, Customer, Product
+from services.order_service import OrderService
+from services.product_service import ProductService
+from services.production_service import ProductionService, CustomException
+from benchmarks.stock_concurrency import run_benchmark
+
+
+class TestStockReservation(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory database with one customer and one product."""
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        customer = Customer(name="Alice", email="alice@example.com", phone="5550000001")
+        product = Product(name="Widget", price=2.0, stock_quantity=5)
+        db.session.add_all([customer, product])
+        db.session.commit()
+        self.customer_id, self.product_id = customer.id, product.id
+
+    def tearDown(self):
+        """Drop the database and pop the app context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def stock(self):
+        """Reads the product's current stock from the database."""
+        db.session.expire_all()
+        return db.session.get(Product, self.product_id).stock_quantity
+
+    def test_create_order_decrements_stock(self):
+        """Test creating an order takes its quantity from stock."""
+        OrderService.create_order(self.customer_id, self.product_id, 3)
+        self.assertEqual(self.stock(), 2)
+
+    def test_create_order_insufficient_stock(self):
+        """Test an order larger than the stock is rejected and nothing changes."""
+        with self.assertRaises(ValueError) as context:
+            OrderService.create_order(self.customer_id, self.product_id, 6)
+        self.assertIn("Insufficient stock", str(context.exception))
+        self.assertEqual(self.stock(), 5)
+
+    def test_update_and_delete_adjust_stock(self):
+        """Test updates reserve/release the difference and deletes release all."""
+        order = OrderService.create_order(self.customer_id, self.product_id, 2)
+        OrderService.update_order(order.id, quantity=4)
+        self.assertEqual(self.stock(), 1)
+        OrderService.update_order(order.id, quantity=1)
+        self.assertEqual(self.stock(), 4)
+        OrderService.delete_order(order.id)
+        self.assertEqual(self.stock(), 5)
+
+    def test_production_replenishes_stock(self):
+        """Test production create/update/delete apply stock deltas."""
+        production = ProductionService.create_production(self.product_id, 10, "2024-03-01")
+        self.assertEqual(self.stock(), 15)
+        ProductionService.update_production(production.id, quantity_produced=4)
+        self.assertEqual(self.stock(), 9)
+        ProductionService.delete_production(production.id)
+        self.assertEqual(self.stock(), 5)
+
+    def test_delete_sold_production_rejected(self):
+        """Test removing production whose units were already sold is rejected."""
+        production = ProductionService.create_production(self.product_id, 3, "2024-03-01")
+        OrderService.create_order(self.customer_id, self.product_id, 7)
+        with self.assertRaises(CustomException):
+            ProductionService.delete_production(production.id)
+        self.assertEqual(self.stock(), 1)
+
+    def test_reconcile_stock(self):
+        """Test reconciliation recomputes stock from opening stock plus production minus orders."""
+        ProductionService.create_production(self.product_id, 10, "2024-03-01")
+        OrderService.create_order(self.customer_id, self.product_id, 4)
+        result = ProductService.reconcile_stock(batch_size=1, dry_run=False)
+        self.assertEqual(result["corrections"], [])  # Opening stock of 5 is preserved: 5 + 10 - 4
+        self.assertEqual(self.stock(), 11)
+
+        db.session.execute(update(Product).values(stock_quantity=20))  # Simulate drift
+        db.session.commit()
+        self.assertEqual(ProductService.reconcile_stock()["drifted"], 1)  # Dry run by default
+        self.assertEqual(self.stock(), 20)
+        result = ProductService.reconcile_stock(dry_run=False)
+        self.assertEqual(result["corrections"], [{"product_id": self.product_id, "old": 20, "new": 11}])
+        self.assertEqual(self.stock(), 11)
+
+    def test_reconcile_stock_skips_products_without_opening_stock(self):
+        """Test products with no recorded opening stock are reported and left untouched."""
+        db.session.execute(update(Product).values(opening_stock=None))
+        db.session.commit()
+        result = ProductService.reconcile_stock(dry_run=False)
+        self.assertEqual((result["checked"], result["skipped"], result["drifted"]), (1, 1, 0))
+        self.assertEqual(self.stock(), 5)
+
+    def test_bulk_ingestion_replenishes_stock(self):
+        """Test chunked bulk ingestion inserts valid rows and adds them to stock."""
+        records = [
+            (2, {"product_id": self.product_id, "quantity_produced": 4, "date_produced": date(2024, 3, 1)}, {}),
+            (3, {"product_id": 999, "quantity_produced": 1, "date_produced": date(2024, 3, 1)}, {}),
+            (4, None, {"_line": ["Invalid JSON."]}),
+            (5, {"product_id": self.product_id, "quantity_produced": 6, "date_produced": date(2024, 3, 2)}, {}),
+        ]
+        chunks = ProductionService.ingest_productions(iter(records), chunk_size=3)
+        self.assertEqual([(c["inserted"], c["rejected"]) for c in chunks], [(1, 2), (1, 0)])
+        self.assertEqual(chunks[0]["errors"][0], {"line": 3, "errors": {"product_id": ["Product not found."]}})
+        self.assertEqual(self.stock(), 15)
+
+    def test_concurrent_orders_never_oversell(self):
+        """Test concurrent orders neither oversell nor lose updates."""
+        result = run_benchmark(threads=6, orders_per_thread=10, stock=25)
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(result["created"], 25)
+        self.assertTrue(result["no_oversell"])
+        self.assertTrue(result["no_lost_updates"])
+
+    def test_benchmark_refuses_unconfirmed_database(self):
+        """Test the benchmark will not drop tables in a database it was pointed at without confirmation."""
+        with self.assertRaises(ValueError) as context:
+            run_benchmark(threads=1, orders_per_thread=1, database_url='sqlite:///factory.db')
+        self.assertIn("--i-know-this-drops-tables", str(context.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
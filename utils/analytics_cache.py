@@ -0,0 +1,367 @@
+import hashlib
+import inspect
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from flask import current_app, has_app_context, g
+from models import db
+from cache import cache
+from utils.table_versions import add_bump_listener
+from utils.db_routing import use_primary
+
+logger = logging.getLogger(__name__)
+
+# Cache key namespaces
+_RESULT_PREFIX = 'analytics'
+_LATEST_PREFIX = 'analytics-latest'
+_TOKEN_PREFIX = 'table-token'
+
+# Hit/miss/coalesced counters per cached function (process-local)
+_stats = {}
+_stats_lock = threading.Lock()
+
+# In-flight computations by cache key (process-local single-flight)
+_flights = {}
+_flights_lock = threading.Lock()
+
+# Background refresh pool for stale-while-revalidate, created on first use
+_executor = None
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+# Response cache status, most significant last
+_STATUS_ORDER = ('HIT', 'MISS', 'STALE')
+
+
+# ---------------------------
+# Metrics
+# ---------------------------
+def _count(name, outcome):
+    """Increments one counter for a cached function."""
+    with _stats_lock:
+        counters = _stats.setdefault(name, {"hits": 0, "misses": 0, "coalesced": 0, "stale": 0, "refreshes": 0})
+        counters[outcome] = counters.get(outcome, 0) + 1
+
+
+def cache_stats():
+    """Returns a snapshot of the per-function counters and overall totals."""
+    with _stats_lock:
+        functions = {name: dict(counters) for name, counters in _stats.items()}
+    totals = {}
+    for counters in functions.values():
+        for outcome, value in counters.items():
+            totals[outcome] = totals.get(outcome, 0) + value
+    lookups = sum(totals.get(outcome, 0) for outcome in ("hits", "misses", "coalesced", "stale"))
+    totals["hit_ratio"] = round(totals.get("hits", 0) / lookups, 4) if lookups else None
+    with _flights_lock:
+        in_flight = len(_flights)
+    with _refresh_lock:
+        refreshing = len(_refreshing)
+    return {"functions": functions, "totals": totals, "in_flight": in_flight, "refreshing": refreshing}
+
+
+def reset_cache_stats():
+    """Clears all counters."""
+    with _stats_lock:
+        _stats.clear()
+
+
+# ---------------------------
+# Table Tokens (shared invalidation)
+# ---------------------------
+def _token_key(table_name):
+    return f"{_TOKEN_PREFIX}:{table_name}"
+
+
+def _new_token():
+    """A unique token that also records when the table was written."""
+    return f"{time.time():.3f}:{uuid.uuid4().hex}"
+
+
+def _written_within(tokens, seconds):
+    """True if any token was issued (i.e. its table written) in the last `seconds`."""
+    cutoff = time.time() - seconds
+    for token in tokens:
+        issued, _, _ = str(token).partition(':')
+        try:
+            if float(issued) > cutoff:
+                return True
+        except ValueError:
+            continue
+    return False
+
+
+def _table_tokens(table_names):
+    """
+    Reads the current invalidation token of each table from the cache backend.
+
+    Tokens live next to the cached results, so every process sharing a backend
+    sees the same tokens. A missing token (never written, or evicted) is replaced
+    with a fresh one via add(), so old entries can never match again.
+    """
+    keys = [_token_key(name) for name in table_names]
+    tokens = list(cache.get_many(*keys))
+    for position, token in enumerate(tokens):
+        if token is None:
+            cache.add(keys[position], _new_token(), timeout=0)
+            tokens[position] = cache.get(keys[position])
+    return tokens
+
+
+def _rotate_tokens(table_names):
+    """Bump listener: gives each written table a new token, orphaning its entries."""
+    if not has_app_context() or 'cache' not in current_app.extensions:
+        return
+    try:
+        cache.set_many({_token_key(name): _new_token() for name in table_names}, timeout=0)
+    except Exception as e:  # A cache outage must not fail the write that triggered it
+        logger.error(f"Error rotating analytics cache tokens: {str(e)}")
+
+
+def register_cache_invalidation():
+    """Hooks token rotation into the table version counters."""
+    add_bump_listener(_rotate_tokens)
+
+
+# ---------------------------
+# Single-flight Coalescing
+# ---------------------------
+class _Flight:
+    """One in-progress computation that concurrent identical calls wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def _single_flight(key, name, compute):
+    """
+    Runs `compute` once per key at a time within this process.
+
+    The first caller (the leader) computes; identical calls arriving while it
+    runs wait for its result, or re-raise its exception, instead of issuing the
+    same query again. A follower that waits longer than
+    ANALYTICS_SINGLE_FLIGHT_TIMEOUT computes on its own.
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        if flight.done.wait(current_app.config.get('ANALYTICS_SINGLE_FLIGHT_TIMEOUT', 30)):
+            _count(name, "coalesced")
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        logger.warning(f"Single-flight wait timed out for {name}; computing independently.")
+        _count(name, "misses")
+        return compute()
+
+    _count(name, "misses")
+    try:
+        flight.value = compute()
+        return flight.value
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+
+
+# ---------------------------
+# Stale-while-revalidate
+# ---------------------------
+def record_data_age(age, status):
+    """Tracks the oldest data and most significant cache status used by this request."""
+    g.analytics_data_age = max(g.get('analytics_data_age', 0), age)
+    current = g.get('analytics_cache_status')
+    if current is None or _STATUS_ORDER.index(status) > _STATUS_ORDER.index(current):
+        g.analytics_cache_status = status
+
+
+def _record_response(computed_at, status):
+    """Records the age of one cached result used by this request."""
+    record_data_age(max(0, int(time.time() - computed_at)), status)
+
+
+def _max_stale():
+    """Seconds of staleness this request accepts (set per request, else ANALYTICS_MAX_STALE)."""
+    return g.get('analytics_max_stale', current_app.config.get('ANALYTICS_MAX_STALE', 0))
+
+
+def _get_executor():
+    """Returns the shared refresh pool, sized by ANALYTICS_REFRESH_WORKERS."""
+    global _executor
+    with _refresh_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('ANALYTICS_REFRESH_WORKERS', 2),
+                thread_name_prefix='analytics-refresh'
+            )
+        return _executor
+
+
+def _schedule_refresh(key, name, refresh):
+    """
+    Recomputes an entry in the background, at most once at a time per key.
+
+    The task runs in a fresh app context (and therefore its own scoped DB
+    session), which is removed when the task finishes.
+    """
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    app = current_app._get_current_object()
+    read_replica = g.get('db_read_replica')
+
+    def task():
+        try:
+            with app.app_context():
+                g.db_read_replica = read_replica
+                try:
+                    refresh()
+                    _count(name, "refreshes")
+                finally:
+                    db.session.remove()
+        except Exception as e:
+            logger.error(f"Background refresh of {name} failed: {str(e)}")
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+    try:
+        _get_executor().submit(task)
+    except Exception as e:
+        with _refresh_lock:
+            _refreshing.discard(key)
+        logger.error(f"Could not schedule refresh of {name}: {str(e)}")
+
+
+# ---------------------------
+# Decorator
+# ---------------------------
+def _normalized_args(signature, args, kwargs):
+    """Binds arguments to the signature with defaults applied, as a stable string."""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return repr(sorted(bound.arguments.items()))
+
+
+def _make_key(name, signature, args, kwargs, tokens):
+    """Builds a backend-safe key from the function, its normalized arguments and table tokens."""
+    normalized = _normalized_args(signature, args, kwargs) + repr(tokens)
+    return f"{_RESULT_PREFIX}:{name}:{hashlib.sha1(normalized.encode()).hexdigest()}"
+
+
+def _latest_key(name, signature, args, kwargs):
+    """Key of the most recent result for these arguments, regardless of table tokens."""
+    normalized = _normalized_args(signature, args, kwargs)
+    return f"{_LATEST_PREFIX}:{name}:{hashlib.sha1(normalized.encode()).hexdigest()}"
+
+
+def cached_analytics(*table_names, timeout=None):
+    """
+    Caches an analytics query's result until one of its tables is written.
+
+    Entries are keyed by the function, its arguments (defaults applied, so
+    equivalent calls share an entry) and the current token of every table the
+    query reads. Commits that write one of those tables rotate its token, so
+    later calls miss and recompute; the orphaned entries simply age out.
+    Concurrent misses for the same key are coalesced into one computation.
+    Results computed within READ_YOUR_WRITES_SECONDS of a write to one of the
+    tables are read from the primary, never from a lagging replica.
+
+    When the request accepts stale data (`max_stale` seconds), a miss is served
+    from the most recent result for the same arguments if it is young enough,
+    and the fresh value is recomputed on the background refresh pool.
+
+    Args:
+        *table_names (str): Tables the query reads.
+        timeout (int): Seconds an entry lives (default: CACHE_DEFAULT_TIMEOUT).
+
+    Returns:
+        callable: Decorator. The undecorated function stays available as `.uncached`.
+    """
+    def decorator(func):
+        name = func.__name__
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not has_app_context():
+                return func(*args, **kwargs)
+            if not current_app.config.get('ANALYTICS_CACHE_ENABLED', True):
+                # No caching, but identical concurrent calls still share one computation
+                key = _make_key(name, signature, args, kwargs, ())
+                return _single_flight(key, name, lambda: func(*args, **kwargs))
+
+            try:
+                tokens = _table_tokens(table_names)
+                key = _make_key(name, signature, args, kwargs, tokens)
+                latest_key = _latest_key(name, signature, args, kwargs)
+                entry = cache.get(key)
+            except Exception as e:  # Fall back to the database if the backend is down
+                logger.error(f"Analytics cache unavailable: {str(e)}")
+                return func(*args, **kwargs)
+
+            if entry is not None:
+                _count(name, "hits")
+                _record_response(entry["computed_at"], 'HIT')
+                return entry["value"]
+
+            def compute(entry_key=key, tokens=tokens):
+                # A replica may not have caught up with a recent write yet; results
+                # cached under the new tokens must come from the primary
+                if _written_within(tokens, current_app.config.get('READ_YOUR_WRITES_SECONDS', 5)):
+                    with use_primary():
+                        value = func(*args, **kwargs)
+                else:
+                    value = func(*args, **kwargs)
+                entry = {"value": value, "computed_at": time.time()}
+                try:
+                    cache.set(entry_key, entry, timeout=timeout)
+                    cache.set(latest_key, entry, timeout=current_app.config.get('ANALYTICS_MAX_STALE_LIMIT', 3600))
+                except Exception as e:
+                    logger.error(f"Error storing analytics cache entry: {str(e)}")
+                return entry
+
+            max_stale = _max_stale()
+            if max_stale:
+                try:
+                    latest = cache.get(latest_key)
+                except Exception as e:  # Compute instead if the backend is down
+                    logger.error(f"Analytics cache unavailable: {str(e)}")
+                    latest = None
+                if latest is not None and time.time() - latest["computed_at"] <= max_stale:
+                    def refresh():
+                        try:
+                            fresh_tokens = _table_tokens(table_names)
+                            fresh_key = _make_key(name, signature, args, kwargs, fresh_tokens)
+                        except Exception as e:  # Refresh under the request's key if the backend is down
+                            logger.error(f"Analytics cache unavailable: {str(e)}")
+                            _single_flight(key, name, compute)
+                            return
+                        _single_flight(fresh_key, name, lambda: compute(fresh_key, fresh_tokens))
+
+                    _count(name, "stale")
+                    _schedule_refresh(key, name, refresh)
+                    _record_response(latest["computed_at"], 'STALE')
+                    return latest["value"]
+
+            entry = _single_flight(key, name, compute)
+            _record_response(entry["computed_at"], 'MISS')
+            return entry["value"]
+
+        wrapper.uncached = func
+        wrapper.tables = table_names
+        return wrapper
+    return decorator
@@ -0,0 +1,82 @@
+from datetime import datetime
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import aliased
+from models import db, Order, Production, OrderArchive, ProductionArchive
+
+# Hot model -> (archive model, date column deciding a row's age)
+ARCHIVES = {
+    Order: (OrderArchive, 'created_at'),
+    Production: (ProductionArchive, 'date_produced'),
+}
+
+
+# ---------------------------
+# Archive Horizon
+# ---------------------------
+def archived_through(model):
+    """
+    Returns the newest date moved to the model's archive table (None if nothing is archived).
+
+    One MAX over the archive's leading date index.
+    """
+    archive, date_field = ARCHIVES[model]
+    return db.session.execute(
+        select(func.max(getattr(archive, date_field))).execution_options(include_deleted=True)
+    ).scalar()
+
+
+def needs_archive(model, since=None):
+    """
+    True if a window starting at `since` can reach archived rows.
+
+    Args:
+        model: Order or Production.
+        since (date | datetime): Window start, inclusive (None: all history).
+    """
+    horizon = archived_through(model)
+    if horizon is None:
+        return False
+    if since is None:
+        return True
+    if isinstance(horizon, datetime) and not isinstance(since, datetime):
+        since = datetime.combine(since, datetime.min.time())
+    elif isinstance(since, datetime) and not isinstance(horizon, datetime):
+        since = since.date()
+    return since <= horizon
+
+
+# ---------------------------
+# Read Sources
+# ---------------------------
+def combined_source(model):
+    """
+    Returns an alias of `model` over its hot rows UNION ALL its archived rows.
+
+    The alias has every column of the model, so statements written against
+    the model work unchanged against the alias.
+    """
+    archive, _ = ARCHIVES[model]
+    names = [column.key for column in model.__table__.columns]
+    rows = union_all(
+        select(*(getattr(model, name) for name in names)),
+        select(*(getattr(archive, name) for name in names)),
+    ).subquery(f"{model.__tablename__}_all")
+    return aliased(model, rows)
+
+
+def archive_source(model, since=None):
+    """
+    Returns the entity to read `model` rows from for a window starting at `since`.
+
+    Windows newer than everything archived read the hot table alone, so the
+    archive costs nothing for recent data; older or unbounded windows read
+    hot and archived rows together (`combined_source`).
+
+    Args:
+        model: Order or Production.
+        since (date | datetime): Window start, inclusive (None: all history).
+
+    Returns:
+        The model itself, or an alias of it over hot and archived rows.
+    """
+    return combined_source(model) if needs_archive(model, since) else model
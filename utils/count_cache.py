@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from models import db
+from models.soft_delete import INCLUDE_DELETED
+from utils.table_versions import get_version
+
+logger = logging.getLogger(__name__)
+
+# Supported `meta` modes for listing totals
+META_MODES = ('exact', 'approximate')
+
+# Cached totals: (table, filter key, table version) -> (total, stored at)
+_counts = OrderedDict()
+_lock = threading.Lock()
+
+
+# ---------------------------
+# Exact Counts (Cached)
+# ---------------------------
+def _includes_deleted(query):
+    return bool(query.get_execution_options().get(INCLUDE_DELETED, False))
+
+
+def _filter_key(query):
+    """Builds a stable key for the WHERE clause, bound parameters and soft-delete scope of a query."""
+    scope = 'all' if _includes_deleted(query) else 'live'
+    whereclause = query.whereclause
+    if whereclause is None:
+        return scope
+    compiled = whereclause.compile()
+    return f"{scope}|{compiled}|{sorted(compiled.params.items(), key=lambda item: item[0])}"
+
+
+def _count_query(query):
+    """Runs COUNT(*) over the query's rows without its ORDER BY."""
+    subquery = query.order_by(None).statement.subquery()
+    return db.session.execute(
+        select(func.count()).select_from(subquery),
+        execution_options={INCLUDE_DELETED: _includes_deleted(query)}
+    ).scalar() or 0
+
+
+def cached_count(query, table_name):
+    """
+    Returns the row count of a query, reusing a cached total while the table is unchanged.
+
+    Entries are keyed by table, filter and the table's write version, so any
+    committed write to the table makes older totals unreachable.
+
+    Args:
+        query: Listing query (ORDER BY is ignored).
+        table_name (str): Table whose writes invalidate the total.
+
+    Returns:
+        int: Total matching rows.
+    """
+    ttl = current_app.config.get('COUNT_CACHE_TTL', 300)
+    max_entries = current_app.config.get('COUNT_CACHE_MAX_ENTRIES', 1024)
+    key = (table_name, _filter_key(query), get_version(table_name))
+    now = time.monotonic()
+
+    with _lock:
+        entry = _counts.get(key)
+        if entry and now - entry[1] < ttl:
+            _counts.move_to_end(key)
+            return entry[0]
+
+    total = _count_query(query)
+
+    with _lock:
+        _counts[key] = (total, now)
+        _counts.move_to_end(key)
+        while len(_counts) > max_entries:
+            _counts.popitem(last=False)
+    return total
+
+
+def clear_count_cache():
+    """Drops every cached total."""
+    with _lock:
+        _counts.clear()
+
+
+# ---------------------------
+# Approximate Counts
+# ---------------------------
+def estimated_count(query, table_name):
+    """
+    Returns an estimated row count from database table statistics.
+
+    Statistics only describe whole tables (soft-deleted rows included), so
+    filtered queries and databases without usable statistics fall back to
+    the cached exact count. The statistics probe runs in a savepoint, so a
+    failed probe does not abort the caller's transaction.
+
+    Args:
+        query: Listing query.
+        table_name (str): Table being listed.
+
+    Returns:
+        tuple: (total, is_estimate).
+    """
+    if query.whereclause is None:
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'mysql':
+            sql = text("SELECT TABLE_ROWS FROM information_schema.TABLES "
+                       "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table")
+        elif dialect == 'postgresql':
+            sql = text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table")
+        elif dialect == 'sqlite':
+            sql = text("SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = :table LIMIT 1")
+        else:
+            sql = None
+
+        if sql is not None:
+            try:
+                with db.session.begin_nested():
+                    estimate = db.session.execute(sql, {"table": table_name}).scalar()
+            except DBAPIError as e:  # e.g. sqlite_stat1 missing until ANALYZE runs
+                logger.info(f"No table statistics for {table_name}, counting exactly: {str(e.orig)}")
+                estimate = None
+            if estimate is not None and estimate >= 0:
+                return int(estimate), True
+
+    return cached_count(query, table_name), False
@@ -0,0 +1,123 @@
+import logging
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from cache import cache
+from utils.table_versions import add_bump_listener
+from utils.utils import decode_token
+
+logger = logging.getLogger(__name__)
+
+# Name of the read-replica bind in SQLALCHEMY_BINDS
+REPLICA_BIND = 'replica'
+
+# Cache key namespace for clients pinned to the primary after a write
+_PIN_PREFIX = 'primary-pin'
+
+
+# ---------------------------
+# Routing Session
+# ---------------------------
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to the replica bind when the current
+    request opted in (see `prefer_replica`), and everything else to the primary.
+
+    Reads stay on the primary while the session holds unflushed changes or is
+    flushing, and whenever `use_primary` is active.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause):
+        if clause is None or not getattr(clause, 'is_select', False):
+            return False
+        if not has_app_context() or not g.get('db_read_replica') or g.get('db_force_primary'):
+            return False
+        if self._flushing or self.new or self.dirty or self.deleted:
+            return False
+        return REPLICA_BIND in self._db.engines
+
+
+# ---------------------------
+# Read-your-writes Pinning
+# ---------------------------
+def _client_key():
+    """Identifies the caller: the JWT subject when present, else the remote address."""
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        payload = decode_token(header.split(' ', 1)[1])
+        if isinstance(payload, dict) and payload.get('sub') is not None:
+            return f"{_PIN_PREFIX}:user:{payload['sub']}"
+    return f"{_PIN_PREFIX}:addr:{request.remote_addr}"
+
+
+def replica_configured():
+    """True when a replica bind is configured for the current app."""
+    return bool(current_app.config.get('SQLALCHEMY_BINDS', {}).get(REPLICA_BIND))
+
+
+def _pin_client(table_names):
+    """Bump listener: keeps the writing client on the primary for READ_YOUR_WRITES_SECONDS."""
+    if not has_request_context() or not replica_configured():
+        return
+    g.db_read_replica = False  # Later reads in this request see the write too
+    try:
+        cache.set(_client_key(), True, timeout=current_app.config.get('READ_YOUR_WRITES_SECONDS', 5))
+    except Exception as e:  # A cache outage must not fail the write that triggered it
+        logger.error(f"Error pinning client to the primary: {str(e)}")
+
+
+def _reset_routing():
+    """Starts every request reading from the primary until a view opts in."""
+    g.pop('db_read_replica', None)
+    g.pop('db_force_primary', None)
+
+
+def register_read_routing(app):
+    """Pins clients to the primary after each committed write."""
+    app.before_request(_reset_routing)
+    add_bump_listener(_pin_client)
+
+
+# ---------------------------
+# Per-request Routing
+# ---------------------------
+def prefer_replica():
+    """
+    Routes this request's reads to the replica, unless the client wrote recently.
+
+    Has no effect without a configured replica bind.
+    """
+    if not replica_configured():
+        return
+    try:
+        pinned = cache.get(_client_key()) is not None
+    except Exception as e:
+        logger.error(f"Error reading primary pin: {str(e)}")
+        pinned = True  # Unknown: read from the primary to be safe
+    g.db_read_replica = not pinned
+
+
+def replica_reads(f):
+    """View decorator: reads in the view go to the replica (see `prefer_replica`)."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        prefer_replica()
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+@contextmanager
+def use_primary():
+    """Forces reads inside the block onto the primary."""
+    previous = g.get('db_force_primary')
+    g.db_force_primary = True
+    try:
+        yield
+    finally:
+        g.db_force_primary = previous
@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from flask import Response, stream_with_context
+
+# Supported export formats and their content types
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+
+def _plain(value):
+    """Converts temporal values to ISO strings for serialization."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+# ---------------------------
+# Row Formatters
+# ---------------------------
+def ndjson_lines(rows, columns):
+    """Yields one JSON document per row."""
+    for row in rows:
+        yield json.dumps({column: _plain(value) for column, value in zip(columns, row)}) + '\n'
+
+
+def csv_lines(rows, columns):
+    """Yields a CSV header followed by one line per row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerow([_plain(value) for value in row])
+        yield buffer.getvalue()
+
+
+# ---------------------------
+# Streaming Response
+# ---------------------------
+def export_response(rows, columns, export_format, filename):
+    """
+    Wraps a row iterator in a streamed NDJSON or CSV response.
+
+    Rows are consumed lazily while the response is written, so memory stays
+    flat regardless of how many rows the query returns.
+
+    Args:
+        rows (iterable): Row tuples in `columns` order.
+        columns (list): Column names.
+        export_format (str): 'ndjson' or 'csv'.
+        filename (str): Download name without extension.
+
+    Returns:
+        Response: Streaming response.
+
+    Raises:
+        ValueError: If the export format is not supported.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid format. Allowed: {list(EXPORT_FORMATS)}")
+
+    lines = ndjson_lines(rows, columns) if export_format == 'ndjson' else csv_lines(rows, columns)
+    return Response(
+        stream_with_context(lines),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}.{export_format}"}
+    )
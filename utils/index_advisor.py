@@ -0,0 +1,239 @@
+import json
+import logging
+import re
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Engine
+from models import db
+from models.soft_delete import PARTIAL_INDEX_DIALECTS
+
+logger = logging.getLogger(__name__)
+
+# Statement shapes already written by this process
+_seen = set()
+_seen_lock = threading.Lock()
+
+# Collapses expanded IN lists so "IN (?, ?)" and "IN (?, ?, ?)" share one shape
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,?)+\)")
+
+# Column references: table.column
+_COLUMN = r"\"?(\w+)\"?\.\"?(\w+)\"?"
+_PREDICATE = re.compile(_COLUMN + r"\s*(=|!=|<>|>=|<=|>|<|\bIN\b|\bBETWEEN\b|\bIS\b|\bLIKE\b)", re.IGNORECASE)
+_JOIN_RIGHT = re.compile(r"=\s*" + _COLUMN)
+_REFERENCE = re.compile(_COLUMN)
+_LIVE_ROWS = r"\"?{table}\"?\.\"?deleted_at\"?\s+IS\s+NULL"
+_CLAUSES = re.compile(r"\b(SELECT|FROM|WHERE|ON|GROUP BY|ORDER BY|HAVING|LIMIT|OFFSET|JOIN|UNION)\b", re.IGNORECASE)
+
+# Most columns worth suggesting in one composite index
+MAX_INDEX_COLUMNS = 3
+
+
+# ---------------------------
+# Recording Query Shapes
+# ---------------------------
+def shape_of(statement):
+    """Normalizes a statement to its shape (whitespace and IN-list lengths collapsed)."""
+    return _IN_LIST.sub("(...)", " ".join(statement.split()))
+
+
+def _plain(value):
+    """Converts a bound parameter to a JSON-serializable value."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _record_shape(conn, cursor, statement, parameters, context, executemany):
+    """Engine listener: appends each new SELECT shape, with sample parameters, to INDEX_ADVISOR_FILE."""
+    if executemany or not has_app_context() or not current_app.config.get('INDEX_ADVISOR_ENABLED'):
+        return
+    if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return
+    shape = shape_of(statement)
+    with _seen_lock:
+        if shape in _seen:
+            return
+        _seen.add(shape)
+        if isinstance(parameters, dict):
+            sample = {key: _plain(value) for key, value in parameters.items()}
+        else:
+            sample = [_plain(value) for value in (parameters or ())]
+        try:
+            with open(current_app.config['INDEX_ADVISOR_FILE'], 'a') as shapes_file:
+                shapes_file.write(json.dumps({
+                    "dialect": conn.dialect.name, "statement": statement, "parameters": sample
+                }) + '\n')
+        except Exception as e:  # Recording must never break the query
+            logger.error(f"Error recording query shape: {str(e)}")
+
+
+def register_index_advisor():
+    """Installs the shape recorder (active only while INDEX_ADVISOR_ENABLED is set)."""
+    if not event.contains(Engine, 'before_cursor_execute', _record_shape):
+        event.listen(Engine, 'before_cursor_execute', _record_shape)
+
+
+def load_shapes(path):
+    """Reads recorded shapes, one per distinct statement shape, in first-seen order."""
+    shapes = {}
+    with open(path) as shapes_file:
+        for line in shapes_file:
+            if line.strip():
+                record = json.loads(line)
+                shapes.setdefault(shape_of(record["statement"]), record)
+    return list(shapes.values())
+
+
+# ---------------------------
+# EXPLAIN
+# ---------------------------
+def _walk_pg_plan(node, scans):
+    if node.get("Node Type") == "Seq Scan":
+        scans.append((node.get("Relation Name"), f"Seq Scan on {node.get('Relation Name')}"))
+    for child in node.get("Plans", []):
+        _walk_pg_plan(child, scans)
+
+
+def full_scans(connection, statement, parameters):
+    """
+    Runs EXPLAIN for one statement and lists the tables it reads in full.
+
+    Returns:
+        tuple: (list of (table, plan detail) full scans, list of plan lines).
+    """
+    dialect = connection.dialect.name
+    params = parameters if isinstance(parameters, dict) else tuple(parameters)
+    scans, plan = [], []
+    if dialect == 'sqlite':
+        for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params):
+            detail = row[-1]
+            plan.append(detail)
+            # A SCAN without SEARCH reads every row, also when it walks an index for ORDER BY
+            match = re.match(r"SCAN (?:TABLE )?(\w+)(?: USING (?:COVERING )?INDEX \w+)?$", detail)
+            if match:
+                scans.append((match.group(1), detail))
+    elif dialect == 'postgresql':
+        document = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", params).scalar()
+        document = json.loads(document) if isinstance(document, str) else document
+        plan.append(json.dumps(document))
+        _walk_pg_plan(document[0]["Plan"], scans)
+    elif dialect in ('mysql', 'mariadb'):
+        for row in connection.exec_driver_sql(f"EXPLAIN {statement}", params).mappings():
+            plan.append(f"{row.get('table')}: type={row.get('type')} key={row.get('key')}")
+            if row.get('type') == 'ALL':
+                scans.append((row.get('table'), f"type=ALL on {row.get('table')}"))
+    else:
+        raise ValueError(f"EXPLAIN is not supported for dialect '{dialect}'.")
+    return scans, plan
+
+
+# ---------------------------
+# Index Suggestions
+# ---------------------------
+def _clauses(statement):
+    """Splits a statement into (keyword, text) clauses such as WHERE, ON and ORDER BY."""
+    parts = _CLAUSES.split(statement)
+    return [(parts[i].upper(), parts[i + 1]) for i in range(1, len(parts) - 1, 2)]
+
+
+def suggest_index(statement, table):
+    """
+    Proposes a composite index for a fully scanned table from the statement's predicates.
+
+    Columns follow the equality, sort, range rule: equality and join columns
+    first, then GROUP BY / ORDER BY columns, then the first range column.
+
+    Returns:
+        list: Column names (empty when nothing in the statement is indexable).
+    """
+    equality, sort, ranges = [], [], []
+    for keyword, text in _clauses(statement):
+        if keyword in ('WHERE', 'ON', 'HAVING'):
+            for owner, column, operator in _PREDICATE.findall(text):
+                if owner != table:
+                    continue
+                operator = operator.upper()
+                (equality if operator in ('=', 'IN', 'IS') else ranges).append(column)
+            if keyword == 'ON':
+                equality.extend(column for owner, column in _JOIN_RIGHT.findall(text) if owner == table)
+        elif keyword in ('GROUP BY', 'ORDER BY'):
+            sort.extend(column for owner, column in _REFERENCE.findall(text) if owner == table)
+    columns = list(dict.fromkeys(equality + sort + ranges[:1]))
+    return columns[:MAX_INDEX_COLUMNS]
+
+
+def _reads_live_rows(statement, table):
+    """True if the statement carries the soft-delete filter for the table."""
+    return re.search(_LIVE_ROWS.format(table=table), statement, re.IGNORECASE) is not None
+
+
+def _covered(existing, columns):
+    """True if an existing index already leads with the suggested columns."""
+    return any(index[:len(columns)] == columns for index in existing)
+
+
+def advise(shapes):
+    """
+    EXPLAINs recorded shapes and reports full scans with suggested indexes.
+
+    Args:
+        shapes (list): Records from `load_shapes`.
+
+    Returns:
+        dict: {"analyzed", "findings": [{"statement", "table", "plan", "suggestion"}],
+            "suggestions": {index name: CREATE INDEX statement}, "errors"}.
+    """
+    inspector = inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    existing = {
+        table: [index["column_names"] for index in inspector.get_indexes(table)]
+        + [inspector.get_pk_constraint(table).get("constrained_columns") or []]
+        for table in tables
+    }
+
+    report = {"analyzed": 0, "findings": [], "suggestions": {}, "errors": []}
+    with db.engine.connect() as connection:
+        for record in shapes:
+            if record.get("dialect") not in (None, connection.dialect.name):
+                continue  # Recorded against another database
+            try:
+                scans, plan = full_scans(connection, record["statement"], record["parameters"])
+            except Exception as e:
+                report["errors"].append({"statement": record["statement"], "error": str(e)})
+                continue
+            report["analyzed"] += 1
+            for table, detail in scans:
+                if table not in tables:
+                    continue  # Subquery or CTE
+                columns = suggest_index(record["statement"], table)
+                partial = connection.dialect.name in PARTIAL_INDEX_DIALECTS and _reads_live_rows(
+                    record["statement"], table)
+                if partial:  # Index live rows only instead of leading with deleted_at
+                    columns = [column for column in columns if column != 'deleted_at']
+                suggestion = None
+                if columns and not _covered(existing[table], columns):
+                    name = f"ix_{table}_{'_'.join(columns)}{'_live' if partial else ''}"
+                    suggestion = f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"
+                    if partial:
+                        suggestion += " WHERE deleted_at IS NULL"
+                    report["suggestions"][name] = suggestion
+                report["findings"].append({
+                    "statement": " ".join(record["statement"].split()),
+                    "table": table,
+                    "plan": detail,
+                    "suggestion": suggestion
+                })
+    return report
+
+
+def reset_recorded_shapes():
+    """Forgets which shapes this process has written, so they are recorded again."""
+    with _seen_lock:
+        _seen.clear()
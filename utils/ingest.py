@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+from itertools import islice
+from utils.export import EXPORT_FORMATS
+
+# Content types accepted for each upload format (first entry is canonical)
+INGEST_CONTENT_TYPES = {
+    'ndjson': (EXPORT_FORMATS['ndjson'], 'application/jsonl', 'application/x-jsonlines'),
+    'csv': (EXPORT_FORMATS['csv'], 'application/csv')
+}
+
+
+# ---------------------------
+# Format Resolution
+# ---------------------------
+def resolve_ingest_format(explicit, mimetype):
+    """
+    Picks the upload format from ?format= or, failing that, the Content-Type.
+
+    Raises:
+        ValueError: If neither names a supported format.
+    """
+    if explicit:
+        explicit = explicit.lower()
+        if explicit not in INGEST_CONTENT_TYPES:
+            raise ValueError(f"Invalid format. Allowed: {list(INGEST_CONTENT_TYPES)}")
+        return explicit
+    for name, content_types in INGEST_CONTENT_TYPES.items():
+        if mimetype in content_types:
+            return name
+    raise ValueError(
+        f"Unsupported Content-Type. Use {[types[0] for types in INGEST_CONTENT_TYPES.values()]} "
+        f"or ?format={'|'.join(INGEST_CONTENT_TYPES)}."
+    )
+
+
+# ---------------------------
+# Incremental Parsing
+# ---------------------------
+def _text_stream(stream):
+    """Wraps a binary (possibly raw) request stream for line-by-line text reads."""
+    if not isinstance(stream, io.BufferedIOBase):
+        stream = io.BufferedReader(stream)
+    return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+
+def iter_records(stream, ingest_format):
+    """
+    Parses an upload one line at a time without reading the whole body.
+
+    Yields:
+        tuple: (line number, record dict or None, parse error or None).
+    """
+    text = _text_stream(stream)
+    if ingest_format == 'csv':
+        reader = csv.DictReader(text)
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except (csv.Error, UnicodeDecodeError) as e:
+                yield reader.line_num, None, f"Malformed CSV: {str(e)}"
+                return
+            if None in record:
+                yield reader.line_num, None, "Too many columns."
+            else:
+                yield reader.line_num, record, None
+        return
+
+    line_number = 0
+    while True:
+        try:
+            line = text.readline()
+        except UnicodeDecodeError as e:
+            yield line_number + 1, None, f"Invalid UTF-8: {str(e)}"
+            return
+        if not line:
+            return
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, None, "Invalid JSON."
+            continue
+        if isinstance(record, dict):
+            yield line_number, record, None
+        else:
+            yield line_number, None, "Each line must be a JSON object."
+
+
+def chunked(iterable, size):
+    """Yields successive lists of at most `size` items."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,275 @@
+from flask import current_app, request
+from itsdangerous import URLSafeSerializer, BadSignature
+from datetime import date, datetime
+from math import ceil
+from utils.count_cache import META_MODES, cached_count, estimated_count
+from models.soft_delete import with_deleted
+
+# Supported pagination modes
+PAGINATION_MODES = ('offset', 'cursor', 'after_id')
+
+# Upper bound for records per page
+MAX_PER_PAGE = 100
+
+# Salt used to sign cursors so they cannot be forged or reused across features
+CURSOR_SALT = 'pagination-cursor'
+
+
+class PaginationError(ValueError):
+    """Raised for invalid pagination parameters or cursors."""
+
+
+# ---------------------------
+# Cursor Signing
+# ---------------------------
+def _serializer():
+    """Returns a serializer bound to the application's secret key."""
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt=CURSOR_SALT)
+
+
+def encode_cursor(sort_by, sort_order, value, last_id):
+    """
+    Encodes the sort position of the last row of a page into a signed, opaque cursor.
+
+    Args:
+        sort_by (str): Sort column name.
+        sort_order (str): 'asc' or 'desc'.
+        value: Sort column value of the last row.
+        last_id (int): Primary key of the last row (tie-breaker).
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    return _serializer().dumps({"s": sort_by, "o": sort_order, "v": value, "id": last_id})
+
+
+def decode_cursor(cursor, column, sort_by, sort_order):
+    """
+    Validates a cursor and returns the sort value and id it points past.
+
+    Args:
+        cursor (str): Cursor previously returned as `next_cursor`.
+        column: Model column the cursor value belongs to.
+        sort_by (str): Sort column requested for this page.
+        sort_order (str): Sort order requested for this page.
+
+    Returns:
+        tuple: (sort value, last id).
+
+    Raises:
+        PaginationError: If the cursor is tampered with, malformed or issued for another sort.
+    """
+    try:
+        payload = _serializer().loads(cursor)
+        value, last_id = payload["v"], int(payload["id"])
+    except (BadSignature, KeyError, TypeError, ValueError):
+        raise PaginationError("Invalid cursor.")
+
+    if payload.get("s") != sort_by or payload.get("o") != sort_order:
+        raise PaginationError("Cursor does not match the requested sort.")
+
+    # Restore temporal values serialized as ISO strings
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = None
+    if value is not None and python_type in (datetime, date):
+        try:
+            value = python_type.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise PaginationError("Invalid cursor.")
+    return value, last_id
+
+
+# ---------------------------
+# Mode Resolution
+# ---------------------------
+def resolve_mode(mode=None, cursor=None, after_id=None):
+    """Determines the pagination mode from explicit mode and supplied position arguments."""
+    if cursor is not None:
+        return 'cursor'
+    if after_id is not None:
+        return 'after_id'
+    mode = (mode or 'offset').lower()
+    if mode not in PAGINATION_MODES:
+        raise PaginationError(f"Invalid pagination mode. Allowed: {list(PAGINATION_MODES)}")
+    return mode
+
+
+# ---------------------------
+# Pagination Engine
+# ---------------------------
+def paginate(query, model, sortable_fields, sort_by, sort_order='asc', page=1, per_page=10,
+             include_meta=True, mode=None, cursor=None, after_id=None, meta='exact', include_deleted=False):
+    """
+    Paginates a query in offset, keyset (cursor) or seek-after-id mode.
+
+    - offset: classic page/per_page with `total` and `pages` metadata. Totals come
+      from the count cache (`meta='exact'`) or table statistics (`meta='approximate'`).
+    - cursor: keyset seek on (sort column, id); constant cost per page, no COUNT(*).
+    - after_id: seek on the primary key only (`id > after_id ORDER BY id`), for bulk walks.
+
+    Args:
+        query: Base query (e.g. `Order.query`).
+        model: Mapped model class that owns the sort column and `id`.
+        sortable_fields (list): Allowed sort columns.
+        sort_by (str): Column to sort by.
+        sort_order (str): 'asc' or 'desc' (default: 'asc').
+        page (int): Page number for offset mode (default: 1).
+        per_page (int): Records per page (default: 10, max: 100).
+        include_meta (bool): Include pagination metadata (default: True).
+        mode (str): 'offset', 'cursor' or 'after_id'; inferred from cursor/after_id when given.
+        cursor (str): Opaque cursor from the previous page's `next_cursor`.
+        after_id (int): Last id seen, for after_id mode.
+        meta (str): 'exact' (cached COUNT) or 'approximate' (table statistics) totals.
+        include_deleted (bool): Also list soft-deleted rows (default: False).
+
+    Returns:
+        dict: `items` plus mode-specific metadata (`total`/`pages`/`page`/`per_page`
+        and `total_approximate`, `next_cursor` or `next_after_id`).
+
+    Raises:
+        PaginationError: If inputs or cursor are invalid.
+    """
+    try:
+        page = max(1, int(page))
+        per_page = min(max(1, int(per_page)), MAX_PER_PAGE)
+    except (TypeError, ValueError):
+        raise PaginationError("Invalid pagination parameters.")
+
+    if sort_by not in sortable_fields:
+        raise PaginationError(f"Invalid sort_by field. Allowed: {sortable_fields}")
+
+    sort_order = (sort_order or 'asc').lower()
+    if sort_order not in ('asc', 'desc'):
+        raise PaginationError("Invalid sort_order. Allowed: ['asc', 'desc']")
+
+    mode = resolve_mode(mode, cursor, after_id)
+    if include_deleted:
+        query = with_deleted(query)
+    sort_column = getattr(model, sort_by)
+    descending = sort_order == 'desc'
+    # id breaks ties, so rows sharing a sort value keep one stable order across pages
+    if descending:
+        ordering = (sort_column.desc(), model.id.desc())
+    else:
+        ordering = (sort_column.asc(), model.id.asc())
+
+    # Offset mode
+    if mode == 'offset':
+        pagination = query.order_by(*ordering).paginate(
+            page=page, per_page=per_page, error_out=False, count=False
+        )
+        response = {"items": pagination.items}
+        if include_meta:
+            meta = (meta or 'exact').lower()
+            if meta not in META_MODES:
+                raise PaginationError(f"Invalid meta mode. Allowed: {list(META_MODES)}")
+
+            table_name = model.__table__.name
+            if meta == 'approximate':
+                total, is_estimate = estimated_count(query, table_name)
+            else:
+                total, is_estimate = cached_count(query, table_name), False
+
+            response.update({
+                "total": total,
+                "pages": ceil(total / per_page) if total else 0,
+                "page": page,
+                "per_page": per_page
+            })
+            if is_estimate:
+                response["total_approximate"] = True
+        return response
+
+    # Seek-after-id mode
+    if mode == 'after_id':
+        if after_id is not None:
+            try:
+                after_id = int(after_id)
+            except (TypeError, ValueError):
+                raise PaginationError("Invalid after_id.")
+            query = query.filter(model.id > after_id)
+        rows = query.order_by(model.id.asc()).limit(per_page + 1).all()
+        items = rows[:per_page]
+        response = {
+            "items": items,
+            "next_after_id": items[-1].id if len(rows) > per_page else None
+        }
+        if include_meta:
+            response["per_page"] = per_page
+        return response
+
+    # Cursor (keyset) mode
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_column, sort_by, sort_order)
+        if descending:
+            query = query.filter((sort_column < value) | ((sort_column == value) & (model.id < last_id)))
+        else:
+            query = query.filter((sort_column > value) | ((sort_column == value) & (model.id > last_id)))
+
+    query = query.order_by(*ordering)
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor(sort_by, sort_order, getattr(last, sort_by), last.id)
+
+    response = {"items": items, "next_cursor": next_cursor}
+    if include_meta:
+        response["per_page"] = per_page
+    return response
+
+
+# ---------------------------
+# Blueprint Helpers
+# ---------------------------
+def pagination_args(default_sort_by):
+    """
+    Reads the shared pagination query parameters from the current request.
+
+    Query Parameters:
+    - page (int), per_page (int), sort_by (str), sort_order (str), include_meta (bool)
+    - pagination (str): 'offset', 'cursor' or 'after_id' (default: 'offset')
+    - cursor (str): Opaque `next_cursor` from the previous page.
+    - after_id (int): Last id seen, for after_id mode.
+    - meta (str): 'exact' or 'approximate' totals (default: 'exact').
+    - include_deleted (bool): Also list soft-deleted rows (default: false).
+
+    Returns:
+        dict: Keyword arguments for a service `get_paginated_*` method.
+
+    Raises:
+        PaginationError: If page/per_page are out of range.
+    """
+    page = request.args.get('page', default=1, type=int)
+    per_page = request.args.get('per_page', default=10, type=int)
+    if page < 1 or per_page < 1 or per_page > MAX_PER_PAGE:
+        raise PaginationError("Invalid pagination parameters.")
+
+    return {
+        "page": page,
+        "per_page": per_page,
+        "sort_by": request.args.get('sort_by', default=default_sort_by, type=str),
+        "sort_order": request.args.get('sort_order', default='asc', type=str),
+        "include_meta": request.args.get('include_meta', default='true', type=str).lower() == 'true',
+        "mode": request.args.get('pagination', default=None, type=str),
+        "cursor": request.args.get('cursor', default=None, type=str),
+        "after_id": request.args.get('after_id', default=None, type=int),
+        "meta": request.args.get('meta', default='exact', type=str),
+        "include_deleted": request.args.get('include_deleted', default='false', type=str).lower() == 'true'
+    }
+
+
+def paginated_response(key, schema, data):
+    """Builds the JSON body for a paginated listing from a service result."""
+    response = {key: schema.dump(data["items"])}
+    for field in ("total", "total_approximate", "pages", "page", "per_page", "next_cursor", "next_after_id"):
+        if field in data:
+            response[field] = data[field]
+    return response
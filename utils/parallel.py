@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, g
+from models import db
+from utils.analytics_cache import record_data_age
+
+logger = logging.getLogger(__name__)
+
+# Bounded pool shared by all requests, created on first use
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Returns the shared query pool, sized by ANALYTICS_DASHBOARD_WORKERS."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('ANALYTICS_DASHBOARD_WORKERS', 4),
+                thread_name_prefix='analytics-query'
+            )
+        return _executor
+
+
+# ---------------------------
+# Parallel Query Execution
+# ---------------------------
+def run_in_parallel(tasks):
+    """
+    Runs independent read-only callables concurrently on the bounded query pool.
+
+    Each callable runs in its own app context, so it gets its own scoped DB
+    session (removed when it finishes) and its own `g`. The caller's analytics
+    staleness policy and read routing are copied in, and each task's data age and cache status
+    are merged back into the caller's `g` afterwards.
+
+    Args:
+        tasks (dict): {name: zero-argument callable}.
+
+    Returns:
+        dict: {name: {"result": value} or {"error": message}, plus "elapsed_ms"}.
+    """
+    app = current_app._get_current_object()
+    max_stale = g.get('analytics_max_stale')
+    read_replica = g.get('db_read_replica')
+
+    def run(name, task):
+        started = time.perf_counter()
+        outcome = {}
+        with app.app_context():
+            if max_stale is not None:
+                g.analytics_max_stale = max_stale
+            g.db_read_replica = read_replica
+            try:
+                outcome["result"] = task()
+            except Exception as e:
+                logger.error(f"Error running {name}: {str(e)}")
+                outcome["error"] = str(e)
+            finally:
+                db.session.remove()
+            outcome["data_age"] = g.get('analytics_data_age')
+            outcome["cache_status"] = g.get('analytics_cache_status')
+        outcome["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return outcome
+
+    executor = _get_executor()
+    futures = {name: executor.submit(run, name, task) for name, task in tasks.items()}
+    outcomes = {name: future.result() for name, future in futures.items()}
+
+    for outcome in outcomes.values():
+        data_age, cache_status = outcome.pop("data_age"), outcome.pop("cache_status")
+        if data_age is not None and cache_status is not None:
+            record_data_age(data_age, cache_status)
+    return outcomes
@@ -0,0 +1,162 @@
+import logging
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# SQLite checks the deadline every this many virtual machine instructions
+_SQLITE_PROGRESS_STEPS = 1000
+
+# Driver error codes for a statement cancelled by its timeout
+_PG_QUERY_CANCELED = '57014'
+_MYSQL_EXECUTION_TIME_EXCEEDED = 3024
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when an analytics query runs past its wall-clock budget and is cancelled."""
+
+    def __init__(self, name, timeout_ms):
+        self.name = name
+        self.timeout_ms = timeout_ms
+        super().__init__(
+            f"{name} did not finish within its {timeout_ms} ms budget and was cancelled. "
+            f"Retry shortly or narrow the request."
+        )
+
+
+class QueryBudget:
+    """Wall-clock deadline and row cap for the queries of one analytics endpoint."""
+
+    def __init__(self, name, timeout_ms=None, max_rows=None):
+        self.name = name
+        self.timeout_ms = timeout_ms
+        self.max_rows = max_rows
+        self.deadline = time.monotonic() + timeout_ms / 1000 if timeout_ms else None
+        self.connections = []  # SQLite connections with a progress handler to remove
+
+    def remaining_ms(self):
+        """Milliseconds left before the deadline (None when there is no timeout)."""
+        if self.deadline is None:
+            return None
+        return (self.deadline - time.monotonic()) * 1000
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def row_limit(self):
+        """Rows to request so that going over max_rows is detectable (None: unlimited)."""
+        return self.max_rows + 1 if self.max_rows else None
+
+    def truncate(self, rows):
+        """
+        Caps a result list at max_rows.
+
+        Returns:
+            tuple: (rows, truncated).
+        """
+        if self.max_rows and len(rows) > self.max_rows:
+            return rows[:self.max_rows], True
+        return rows, False
+
+
+# ---------------------------
+# Budget Lookup
+# ---------------------------
+def get_budget(name):
+    """Returns {"timeout_ms", "max_rows"} for an endpoint, falling back to the 'default' budget."""
+    budgets = current_app.config.get('ANALYTICS_QUERY_BUDGETS', {})
+    budget = dict(budgets.get('default', {}))
+    budget.update(budgets.get(name, {}))
+    return {"timeout_ms": budget.get('timeout_ms'), "max_rows": budget.get('max_rows')}
+
+
+# ---------------------------
+# Enforcement
+# ---------------------------
+def _apply_timeout(conn, cursor, statement, parameters, context, executemany):
+    """
+    Engine listener: bounds each statement run under a budget by the time left.
+
+    PostgreSQL gets SET LOCAL statement_timeout, MySQL a MAX_EXECUTION_TIME
+    hint on SELECTs, and SQLite a progress handler that interrupts the
+    statement once the deadline passes. Other dialects are only checked
+    between statements.
+    """
+    budget = g.get('query_budget') if has_app_context() else None
+    if budget is None or budget.deadline is None:
+        return statement, parameters
+
+    remaining = budget.remaining_ms()
+    if remaining <= 0:
+        raise QueryBudgetExceeded(budget.name, budget.timeout_ms)
+
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        dbapi_connection = conn.connection.dbapi_connection
+        if dbapi_connection not in budget.connections:
+            dbapi_connection.set_progress_handler(lambda: int(budget.expired()), _SQLITE_PROGRESS_STEPS)
+            budget.connections.append(dbapi_connection)
+    elif dialect == 'postgresql':
+        cursor.execute(f"SET LOCAL statement_timeout = {max(int(remaining), 1)}")
+    elif dialect == 'mysql' and statement.lstrip()[:6].upper() == 'SELECT':
+        statement = f"SELECT /*+ MAX_EXECUTION_TIME({max(int(remaining), 1)}) */" + statement.lstrip()[6:]
+    return statement, parameters
+
+
+def _is_cancellation(error):
+    """True if a database error reports a statement cancelled by a timeout or interrupt."""
+    orig = getattr(error, 'orig', None)
+    if getattr(orig, 'pgcode', None) == _PG_QUERY_CANCELED:
+        return True
+    if orig is not None and orig.args and orig.args[0] == _MYSQL_EXECUTION_TIME_EXCEEDED:
+        return True
+    return 'interrupted' in str(orig)
+
+
+def register_query_budgets():
+    """Installs the statement timeout listener on every engine."""
+    if not event.contains(Engine, 'before_cursor_execute', _apply_timeout):
+        event.listen(Engine, 'before_cursor_execute', _apply_timeout, retval=True)
+
+
+@contextmanager
+def query_budget(name):
+    """
+    Runs the block under the named endpoint's budget from ANALYTICS_QUERY_BUDGETS.
+
+    Every statement executed in the block is cancelled by the database once
+    the wall-clock timeout is spent; the block then raises QueryBudgetExceeded.
+    The row cap is applied by the caller through `row_limit` and `truncate`.
+
+    Args:
+        name (str): Endpoint name (key in ANALYTICS_QUERY_BUDGETS).
+
+    Yields:
+        QueryBudget: The active budget.
+
+    Raises:
+        QueryBudgetExceeded: If the queries ran out of time.
+    """
+    budget = QueryBudget(name, **get_budget(name))
+    previous = g.get('query_budget')
+    g.query_budget = budget
+    try:
+        yield budget
+    except DBAPIError as e:
+        if budget.expired() or _is_cancellation(e):
+            db.session.rollback()
+            logger.warning(f"Query budget exceeded for {name} ({budget.timeout_ms} ms).")
+            raise QueryBudgetExceeded(name, budget.timeout_ms) from e
+        raise
+    finally:
+        g.query_budget = previous
+        for dbapi_connection in budget.connections:
+            try:
+                dbapi_connection.set_progress_handler(None, 0)
+            except Exception as e:
+                logger.error(f"Error clearing SQLite progress handler: {str(e)}")
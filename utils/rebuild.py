@@ -0,0 +1,61 @@
+from sqlalchemy import select, delete, insert
+from models import db
+from utils.table_versions import mark_tables_changed
+
+
+def _parent_key(parent_model, target_table):
+    """Returns the target column holding the parent's id (its foreign key to the parent table)."""
+    for column in target_table.c:
+        if any(key.references(parent_model.__table__) for key in column.foreign_keys):
+            return column
+    raise ValueError(f"{target_table.name} has no foreign key to {parent_model.__tablename__}.")
+
+
+def rebuild_in_batches(parent_model, target_table, select_for_ids, batch_size=1000):
+    """
+    Rebuilds a derived table from source rows, one batch of parents at a time.
+
+    Works through `parent_model` ids in order; each batch deletes its rows
+    from `target_table` and re-inserts them with one INSERT ... SELECT, then
+    commits, so no transaction spans the whole table. Soft-deleted parents
+    are rebuilt too.
+
+    Args:
+        parent_model: Model whose ids partition the rebuild (target rows reference it).
+        target_table (Table): Table to rebuild.
+        select_for_ids (callable): Takes a list of parent ids and returns the SELECT
+            of their target rows, with columns labelled as the target columns.
+        batch_size (int): Parents rebuilt per transaction.
+
+    Returns:
+        tuple: (parents processed, rows written).
+
+    Raises:
+        Exception: Whatever the failing batch raised, after rolling it back
+            (earlier batches stay committed).
+    """
+    key = _parent_key(parent_model, target_table)
+    parents = rows = 0
+    last_id = 0
+    while True:
+        ids = db.session.scalars(
+            select(parent_model.id).where(parent_model.id > last_id).order_by(parent_model.id).limit(batch_size)
+            .execution_options(include_deleted=True)
+        ).all()
+        if not ids:
+            break
+        last_id = ids[-1]
+
+        try:
+            db.session.execute(delete(target_table).where(key.in_(ids)))
+            rebuilt = select_for_ids(ids)
+            result = db.session.execute(insert(target_table).from_select(rebuilt.selected_columns.keys(), rebuilt))
+            mark_tables_changed(db.session, target_table.name)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        parents += len(ids)
+        rows += max(result.rowcount, 0)
+    return parents, rows
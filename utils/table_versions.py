@@ -0,0 +1,84 @@
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Per-table write version counters (process-local)
+_versions = {}
+_lock = threading.Lock()
+
+# Session.info key holding tables written since the last commit
+_PENDING_KEY = 'changed_tables'
+
+# Callbacks notified with the table names whenever versions are bumped
+_bump_listeners = []
+
+
+# ---------------------------
+# Version Counters
+# ---------------------------
+def get_version(table_name):
+    """Returns the current write version of a table (0 if never written)."""
+    return _versions.get(table_name, 0)
+
+
+def get_versions(*table_names):
+    """Returns a tuple of write versions for the given tables."""
+    return tuple(get_version(name) for name in table_names)
+
+
+def bump_version(*table_names):
+    """Increments the write version of each given table."""
+    with _lock:
+        for name in table_names:
+            _versions[name] = _versions.get(name, 0) + 1
+    for listener in list(_bump_listeners):
+        listener(table_names)
+
+
+def add_bump_listener(listener):
+    """
+    Registers a callback invoked with the bumped table names after each bump,
+    e.g. to propagate invalidation to caches shared between processes.
+    """
+    if listener not in _bump_listeners:
+        _bump_listeners.append(listener)
+
+
+def mark_tables_changed(session, *table_names):
+    """
+    Records tables written outside the ORM unit of work (e.g. Core bulk inserts
+    or UPDATE statements) so their versions are bumped when the session commits.
+    """
+    session.info.setdefault(_PENDING_KEY, set()).update(table_names)
+
+
+# ---------------------------
+# Session Event Listeners
+# ---------------------------
+def _collect_changed_tables(session, flush_context, instances):
+    """Remembers which tables the flush touched; versions move only on commit."""
+    tables = session.info.setdefault(_PENDING_KEY, set())
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(instance, '__table__', None)
+        if table is not None:
+            tables.add(table.name)
+
+
+def _bump_on_commit(session):
+    """Bumps versions for every table written in the committed transaction."""
+    tables = session.info.pop(_PENDING_KEY, None)
+    if tables:
+        bump_version(*tables)
+
+
+def _discard_on_rollback(session):
+    """Forgets pending table changes when the transaction is rolled back."""
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_version_listeners():
+    """Installs the session listeners that keep table versions current."""
+    if not event.contains(Session, 'before_flush', _collect_changed_tables):
+        event.listen(Session, 'before_flush', _collect_changed_tables)
+        event.listen(Session, 'after_commit', _bump_on_commit)
+        event.listen(Session, 'after_rollback', _discard_on_rollback)
@@ -0,0 +1,101 @@
+from sqlalchemy import update, insert, case, literal
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from utils.table_versions import mark_tables_changed
+
+
+def _merge(rows, key_columns, value_columns, minimums=(), maximums=()):
+    """Combines rows sharing a key so each key is written once per statement."""
+    merged = {}
+    for row in rows:
+        key = tuple(row[column] for column in key_columns)
+        if key not in merged:
+            merged[key] = dict(row)
+            continue
+        target = merged[key]
+        for column in value_columns:
+            target[column] += row[column]
+        for column in minimums:
+            if target[column] is None or (row[column] is not None and row[column] < target[column]):
+                target[column] = row[column]
+        for column in maximums:
+            if target[column] is None or (row[column] is not None and row[column] > target[column]):
+                target[column] = row[column]
+    return list(merged.values())
+
+
+def _extreme(current, new, keep_new_if):
+    """CASE expression keeping the smaller/larger of a stored and incoming value (NULLs ignored)."""
+    return case(
+        (current.is_(None), new),
+        (keep_new_if(new, current), new),
+        else_=current
+    )
+
+
+# ---------------------------
+# Counter Upserts
+# ---------------------------
+def upsert_increments(session, table, key_columns, rows, minimums=(), maximums=()):
+    """
+    Adds each row's values onto the matching row of a counter table, inserting
+    it when the key is new. Columns named in `minimums`/`maximums` keep the
+    smaller/larger of the stored and incoming value instead of being summed.
+
+    Uses the dialect's native upsert (ON CONFLICT / ON DUPLICATE KEY UPDATE) as
+    one executemany, so it is atomic per row under concurrent writers. Other
+    dialects fall back to UPDATE-then-INSERT per key.
+
+    Args:
+        session (Session): Session whose transaction the write joins.
+        table (Table): Counter table; key_columns must be its primary key.
+        key_columns (list): Names of the key columns.
+        rows (list): Dicts holding the key columns and the increments.
+        minimums (tuple): Columns holding a running minimum (e.g. first seen).
+        maximums (tuple): Columns holding a running maximum (e.g. last seen).
+    """
+    if not rows:
+        return
+    value_columns = [
+        column for column in rows[0]
+        if column not in key_columns and column not in minimums and column not in maximums
+    ]
+    rows = _merge(rows, key_columns, value_columns, minimums, maximums)
+
+    def assignments(incoming):
+        """Builds the SET clause given a function returning each incoming value."""
+        values = {column: table.c[column] + incoming(column) for column in value_columns}
+        values.update({
+            column: _extreme(table.c[column], incoming(column), lambda new, current: new < current)
+            for column in minimums
+        })
+        values.update({
+            column: _extreme(table.c[column], incoming(column), lambda new, current: new > current)
+            for column in maximums
+        })
+        return values
+
+    dialect = session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        stmt = (sqlite_insert if dialect == 'sqlite' else postgresql_insert)(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_=assignments(lambda column: stmt.excluded[column])
+        )
+        session.execute(stmt, rows)
+    elif dialect in ('mysql', 'mariadb'):
+        stmt = mysql_insert(table)
+        stmt = stmt.on_duplicate_key_update(assignments(lambda column: stmt.inserted[column]))
+        session.execute(stmt, rows)
+    else:
+        for row in rows:
+            result = session.execute(
+                update(table)
+                .where(*(table.c[column] == row[column] for column in key_columns))
+                .values(assignments(lambda column: literal(row[column], table.c[column].type)))
+            )
+            if result.rowcount == 0:
+                session.execute(insert(table).values(row))
+
+    mark_tables_changed(session, table.name)
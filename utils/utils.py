@@ -13,6 +13,25 @@ def error_response(message, status_code=400):
     return jsonify({"error": message}), status_code
 
 
+# ---------------------------
+# Expand Parameter Parsing
+# ---------------------------
+def parse_expand(value, allowed):
+    """
+    Parses a comma-separated ?expand= value into a tuple of relationship names.
+
+    Raises:
+        ValueError: If an unknown relationship is requested.
+    """
+    if not value:
+        return ()
+    expand = tuple(dict.fromkeys(part.strip() for part in value.split(',') if part.strip()))
+    invalid = [part for part in expand if part not in allowed]
+    if invalid:
+        raise ValueError(f"Invalid expand value(s): {invalid}. Allowed: {list(allowed)}")
+    return expand
+
+
 # ---------------------------
 # JWT Token Handling
 # ---------------------------